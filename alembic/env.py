@@ -51,6 +51,11 @@ from app.models.appointment import Appointment  # noqa: F401, E402
 from app.models.note import Note  # noqa: F401, E402
 from app.models.clinic_settings import ClinicSettings  # noqa: F401, E402
 from app.models.appointment_block import AppointmentBlock  # noqa: F401, E402
+from app.models.patient_stats import PatientStats  # noqa: F401, E402
+from app.models.appointment_series import AppointmentSeries, AppointmentSeriesException  # noqa: F401, E402
+from app.models.agenda_version import AgendaVersion  # noqa: F401, E402
+from app.models.cache_version import CacheVersion  # noqa: F401, E402
+from app.models.revoked_token import RevokedToken  # noqa: F401, E402
 
 # ✅ LA LINEA CLAVE
 target_metadata = Base.metadata
@@ -0,0 +1,70 @@
+"""add patient_stats table
+
+Revision ID: 20261019_patient_stats
+Revises: 20260305_note_optional
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_patient_stats"
+down_revision = "20260305_note_optional"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "patient_stats",
+        sa.Column("patient_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("sessions_attended", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("no_shows", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("notes_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_visit", sa.DateTime(), nullable=True),
+        sa.Column("next_visit", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["patient_id"], ["patients.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("patient_id"),
+    )
+    op.create_index("ix_patient_stats_user_sessions", "patient_stats", ["user_id", "sessions_attended"])
+    op.create_index("ix_patient_stats_user_no_shows", "patient_stats", ["user_id", "no_shows"])
+    op.create_index("ix_patient_stats_user_notes", "patient_stats", ["user_id", "notes_count"])
+    op.create_index("ix_patient_stats_user_last_visit", "patient_stats", ["user_id", "last_visit"])
+    op.create_index("ix_patient_stats_user_next_visit", "patient_stats", ["user_id", "next_visit"])
+
+    # Backfill inicial (mismo cálculo que app/core/patient_stats.py)
+    op.execute("""
+        INSERT INTO patient_stats (
+            patient_id, user_id, sessions_attended, no_shows, notes_count,
+            last_visit, next_visit, updated_at
+        )
+        SELECT
+            p.id,
+            p.user_id,
+            (SELECT count(*) FROM appointments a
+              WHERE a.patient_id = p.id AND a.is_active = true AND a.status = 'completed'),
+            (SELECT count(*) FROM appointments a
+              WHERE a.patient_id = p.id AND a.is_active = true AND a.status = 'no_show'),
+            (SELECT count(*) FROM notes n
+              WHERE n.patient_id = p.id AND n.is_active = true),
+            (SELECT max(a.start_time) FROM appointments a
+              WHERE a.patient_id = p.id AND a.is_active = true AND a.status = 'completed'),
+            (SELECT min(a.start_time) FROM appointments a
+              WHERE a.patient_id = p.id AND a.is_active = true AND a.status = 'scheduled'
+                AND a.start_time > (now() AT TIME ZONE 'utc')),
+            (now() AT TIME ZONE 'utc')
+        FROM patients p
+    """)
+
+
+def downgrade():
+    op.drop_index("ix_patient_stats_user_next_visit", table_name="patient_stats")
+    op.drop_index("ix_patient_stats_user_last_visit", table_name="patient_stats")
+    op.drop_index("ix_patient_stats_user_notes", table_name="patient_stats")
+    op.drop_index("ix_patient_stats_user_no_shows", table_name="patient_stats")
+    op.drop_index("ix_patient_stats_user_sessions", table_name="patient_stats")
+    op.drop_table("patient_stats")
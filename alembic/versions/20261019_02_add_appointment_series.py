@@ -0,0 +1,78 @@
+"""add appointment_series and appointment_series_exceptions
+
+Revision ID: 20261019_appointment_series
+Revises: 20261019_patient_stats
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_appointment_series"
+down_revision = "20261019_patient_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "appointment_series",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("patient_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("start_time", sa.DateTime(), nullable=False),
+        sa.Column("last_start_time", sa.DateTime(), nullable=False),
+        sa.Column("duration_minutes", sa.Integer(), nullable=False),
+        sa.Column("frequency", sa.String(), nullable=False),
+        sa.Column("occurrences", sa.Integer(), nullable=True),
+        sa.Column("until", sa.Date(), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("created_by", sa.Integer(), nullable=True),
+        sa.Column("updated_by", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["patient_id"], ["patients.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["created_by"], ["users.id"]),
+        sa.ForeignKeyConstraint(["updated_by"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_appointment_series_id"), "appointment_series", ["id"], unique=False)
+    op.create_index(
+        "ix_appointment_series_user_range",
+        "appointment_series",
+        ["user_id", "start_time", "last_start_time"],
+    )
+    op.create_index("ix_appointment_series_patient", "appointment_series", ["patient_id"])
+
+    op.create_table(
+        "appointment_series_exceptions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("series_id", sa.Integer(), nullable=False),
+        sa.Column("occurrence_start", sa.DateTime(), nullable=False),
+        sa.Column("appointment_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("created_by", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["series_id"], ["appointment_series.id"]),
+        sa.ForeignKeyConstraint(["appointment_id"], ["appointments.id"]),
+        sa.ForeignKeyConstraint(["created_by"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("series_id", "occurrence_start", name="uq_series_exception_occurrence"),
+    )
+    op.create_index(
+        op.f("ix_appointment_series_exceptions_id"),
+        "appointment_series_exceptions",
+        ["id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_appointment_series_exceptions_id"), table_name="appointment_series_exceptions")
+    op.drop_table("appointment_series_exceptions")
+    op.drop_index("ix_appointment_series_patient", table_name="appointment_series")
+    op.drop_index("ix_appointment_series_user_range", table_name="appointment_series")
+    op.drop_index(op.f("ix_appointment_series_id"), table_name="appointment_series")
+    op.drop_table("appointment_series")
@@ -0,0 +1,42 @@
+"""add partial indexes for hot filters (WHERE is_active)
+
+Revision ID: 20261019_hot_indexes
+Revises: 20261019_appointment_series
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261019_hot_indexes"
+down_revision = "20261019_appointment_series"
+branch_labels = None
+depends_on = None
+
+
+# (nombre, tabla, columnas, predicado) — deben coincidir con los Index() de app/models
+INDEXES = [
+    ("ix_appointments_user_start_active", "appointments", "user_id, start_time", "is_active"),
+    ("ix_appointments_patient_start_active", "appointments", "patient_id, start_time", "is_active"),
+    ("ix_appointments_scheduled_start", "appointments", "start_time", "is_active AND status = 'scheduled'"),
+    ("ix_notes_patient_created_active", "notes", "patient_id, created_at", "is_active"),
+    ("ix_notes_user_created_active", "notes", "user_id, created_at", "is_active"),
+    ("ix_appointment_blocks_user_start_active", "appointment_blocks", "user_id, start_time", "is_active"),
+    ("ix_patients_user_active", "patients", "user_id, id", "is_active"),
+]
+
+
+def upgrade():
+    # CONCURRENTLY no puede correr dentro de una transacción
+    with op.get_context().autocommit_block():
+        for name, table, columns, predicate in INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} ({columns}) WHERE {predicate}"
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
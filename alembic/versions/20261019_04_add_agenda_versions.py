@@ -0,0 +1,29 @@
+"""add agenda_versions (versión por agenda para ETags)
+
+Revision ID: 20261019_agenda_versions
+Revises: 20261019_hot_indexes
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_agenda_versions"
+down_revision = "20261019_hot_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "agenda_versions",
+        sa.Column("agenda_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("agenda_id"),
+    )
+
+
+def downgrade():
+    op.drop_table("agenda_versions")
@@ -0,0 +1,30 @@
+"""add cache_versions (bus de invalidación de caches en proceso)
+
+Revision ID: 20261019_cache_versions
+Revises: 20261019_agenda_versions
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_cache_versions"
+down_revision = "20261019_agenda_versions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cache_versions",
+        sa.Column("entity", sa.String(length=64), nullable=False),
+        sa.Column("key", sa.String(length=128), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("entity", "key"),
+    )
+
+
+def downgrade():
+    op.drop_table("cache_versions")
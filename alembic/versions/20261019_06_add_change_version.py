@@ -0,0 +1,51 @@
+"""add change_version (cursor de /sync/changes) a pacientes, citas, notas y bloqueos
+
+Revision ID: 20261019_change_version
+Revises: 20261019_cache_versions
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_change_version"
+down_revision = "20261019_cache_versions"
+branch_labels = None
+depends_on = None
+
+
+# (tabla, índice) — deben coincidir con los Index() de app/models
+TABLES = [
+    ("patients", "ix_patients_user_change_version"),
+    ("appointments", "ix_appointments_user_change_version"),
+    ("notes", "ix_notes_user_change_version"),
+    ("appointment_blocks", "ix_appointment_blocks_user_change_version"),
+]
+
+
+def upgrade():
+    # DEFAULT constante: Postgres 11+ no reescribe la tabla; filas existentes = 0
+    # (entran en la sincronización completa, no en los deltas)
+    for table, _ in TABLES:
+        op.add_column(
+            table,
+            sa.Column("change_version", sa.BigInteger(), nullable=False, server_default="0"),
+        )
+
+    # CONCURRENTLY no puede correr dentro de una transacción
+    with op.get_context().autocommit_block():
+        for table, name in TABLES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} (user_id, change_version)"
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for _, name in reversed(TABLES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+    for table, _ in reversed(TABLES):
+        op.drop_column(table, "change_version")
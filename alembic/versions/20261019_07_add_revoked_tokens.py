@@ -0,0 +1,38 @@
+"""add revoked_tokens (lista de revocación de access / refresh tokens)
+
+Revision ID: 20261019_revoked_tokens
+Revises: 20261019_change_version
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_revoked_tokens"
+down_revision = "20261019_change_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("jti", sa.String(length=64), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ux_revoked_tokens_jti", "revoked_tokens", ["jti"],
+        unique=True, postgresql_where=sa.text("jti IS NOT NULL"),
+    )
+    op.create_index("ix_revoked_tokens_expires_at", "revoked_tokens", ["expires_at"])
+
+
+def downgrade():
+    op.drop_index("ix_revoked_tokens_expires_at", table_name="revoked_tokens")
+    op.drop_index("ux_revoked_tokens_jti", table_name="revoked_tokens")
+    op.drop_table("revoked_tokens")
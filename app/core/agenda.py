@@ -0,0 +1,35 @@
+# app/core/agenda.py
+"""
+Agenda (user_id de la psicóloga) que lee / escribe cada usuario.
+
+Una sola regla para los routers, el ETag (app/core/conditional_get.py), /sync/changes
+y SSE (app/core/agenda_version.agenda_id_for_user): si difieren, el ETag sigue otra
+agenda que la de las filas devueltas y un 304 sirve una respuesta vieja.
+"""
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.caches import active_psychologist_ids
+from app.models.user import User
+
+
+def get_owner_user_id(db: Session) -> int:
+    """
+    Id de la psicóloga activa dueña de la agenda (la app asume una por clínica).
+    ✅ Cacheado en proceso (app/core/caches.py), invalidado entre workers.
+    """
+    owner_ids = active_psychologist_ids(db)
+    if not owner_ids:
+        raise HTTPException(status_code=500, detail="No existe psicóloga activa en el sistema.")
+    return owner_ids[0]
+
+
+def get_target_user_id(db: Session, current_user: User) -> int:
+    """
+    psychologist -> su propia agenda
+    assistant    -> agenda de la psicóloga dueña
+    admin        -> su propia agenda (los listados de admin no filtran por agenda)
+    """
+    if current_user.role == "assistant":
+        return get_owner_user_id(db)
+    return current_user.id
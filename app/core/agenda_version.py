@@ -0,0 +1,157 @@
+# app/core/agenda_version.py
+"""
+Versión monótona por agenda (tabla agenda_versions).
+
+- Cualquier flush que toque citas, bloqueos, series, notas o pacientes incrementa la
+  versión de su agenda (user_id); ClinicSettings incrementa la fila 0 (global).
+  Se hace en before_flush => MISMA transacción que la escritura: si hay rollback,
+  la versión tampoco cambia.
+- Una sola vez por transacción y agenda (los flushes siguientes no vuelven a escribir).
+- Escrituras que no pasan por el flush (UPDATE/INSERT en lote: batch-status, series
+  materializadas, sweeper de no-shows) llaman bump_agenda_versions() explícitamente.
+- Cada fila escrita de AGENDA_MODELS con change_version guarda la versión nueva de su
+  agenda (en lote: stamp_change_versions). El lock de la fila de agenda_versions se
+  mantiene hasta el commit => dentro de una agenda las versiones siguen el orden de
+  commit y "change_version > cursor" no se salta filas.
+
+Lectores: app/core/conditional_get.py (ETag / If-None-Match), app/routers/sync.py (deltas).
+"""
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.agenda import get_target_user_id
+from app.models.agenda_version import AgendaVersion
+from app.models.appointment import Appointment
+from app.models.appointment_block import AppointmentBlock
+from app.models.appointment_series import AppointmentSeries
+from app.models.clinic_settings import ClinicSettings
+from app.models.note import Note
+from app.models.patient import Patient
+from app.models.user import User
+
+# Fila de agenda_versions para la configuración clínica (afecta a todas las agendas)
+GLOBAL_AGENDA_ID = 0
+
+# Modelos con user_id = dueño de la agenda
+AGENDA_MODELS = (Appointment, AppointmentBlock, AppointmentSeries, Note, Patient)
+
+_BUMPED_KEY = "agenda_versions_bumped"
+
+
+# =========================
+# Escritura
+# =========================
+def bump_agenda_versions(db: Session, agenda_ids: Iterable[Optional[int]]) -> Dict[int, int]:
+    """
+    ✅ version = version + 1 para cada agenda (upsert; crea la fila si no existe).
+    Corre en la conexión de la transacción actual; ids ordenados => mismo orden de locks
+    entre transacciones concurrentes (sin deadlocks).
+    Devuelve {agenda_id: versión nueva} (la misma para toda la transacción).
+    """
+    bumped = db.info.setdefault(_BUMPED_KEY, {})
+    wanted = {aid for aid in agenda_ids if aid is not None}
+    ids = sorted(wanted - bumped.keys())
+    if ids:
+        table = AgendaVersion.__table__
+        now = datetime.utcnow()
+        stmt = insert(table).values([{"agenda_id": aid, "version": 1, "updated_at": now} for aid in ids])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.agenda_id],
+            set_={"version": table.c.version + 1, "updated_at": stmt.excluded.updated_at},
+        ).returning(table.c.agenda_id, table.c.version)
+        # Core sobre la conexión: válido dentro de before_flush (no dispara otro flush)
+        bumped.update(db.connection().execute(stmt).all())
+    return {aid: bumped[aid] for aid in wanted}
+
+
+def stamp_change_versions(db: Session, model, ids: Iterable[int]) -> None:
+    """
+    ✅ Para escrituras en lote (no pasan por el flush): change_version = versión de la
+    agenda de cada fila en esta transacción. Llamar DESPUÉS de bump_agenda_versions.
+    """
+    ids = list(ids)
+    if not ids:
+        return
+    db.execute(
+        update(model)
+        .where(model.id.in_(ids), model.user_id == AgendaVersion.agenda_id)
+        .values(change_version=AgendaVersion.version)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _agenda_writes_in_flush(session: Session) -> Tuple[set, list]:
+    """(agendas afectadas, objetos de agenda a estampar con change_version)"""
+    ids, stamped = set(), []
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            # setattr con el mismo valor: no hay UPDATE
+            continue
+        if isinstance(obj, ClinicSettings):
+            ids.add(GLOBAL_AGENDA_ID)
+        elif isinstance(obj, AGENDA_MODELS):
+            ids.add(obj.user_id)
+            # si cambió de agenda, la anterior también cambia
+            ids.update(inspect(obj).attrs.user_id.history.deleted)
+            if obj not in session.deleted and hasattr(obj, "change_version"):
+                stamped.append(obj)
+    return ids, stamped
+
+
+def _before_flush(session: Session, flush_context, instances) -> None:
+    ids, stamped = _agenda_writes_in_flush(session)
+    versions = bump_agenda_versions(session, ids)
+    for obj in stamped:
+        if obj.user_id is not None:
+            # cambiar atributos en before_flush: entran en este mismo flush
+            obj.change_version = versions[obj.user_id]
+
+
+def _after_transaction_end(session: Session, transaction) -> None:
+    # commit / rollback (o fin de savepoint): la próxima escritura vuelve a incrementar
+    session.info.pop(_BUMPED_KEY, None)
+
+
+def install_agenda_versioning() -> None:
+    """Registra los listeners en Session (cubre también el sync_session de AsyncSession)."""
+    if not event.contains(Session, "before_flush", _before_flush):
+        event.listen(Session, "before_flush", _before_flush)
+        event.listen(Session, "after_transaction_end", _after_transaction_end)
+
+
+# =========================
+# Lectura
+# =========================
+async def agenda_id_for_user(db: AsyncSession, current_user: User) -> Optional[int]:
+    """
+    Agenda que lee el usuario: get_target_user_id de los routers (app/core/agenda.py).
+    None para admin: sus listados no filtran por agenda.
+    """
+    if current_user.role == "admin":
+        return None
+    # ids de psicólogas activas cacheados: normalmente sin query
+    return await db.run_sync(get_target_user_id, current_user)
+
+
+async def read_agenda_versions(db: AsyncSession, agenda_id: Optional[int]) -> Tuple[int, int]:
+    """
+    (versión de la agenda, versión global) en 1 query; 0 si la fila no existe.
+    agenda_id=None (admin: ve todas las agendas) => suma de todas las versiones,
+    que también crece con cualquier escritura.
+    """
+    if agenda_id is None:
+        total = (await db.execute(select(func.coalesce(func.sum(AgendaVersion.version), 0)))).scalar()
+        return int(total), 0
+
+    result = await db.execute(
+        select(AgendaVersion.agenda_id, AgendaVersion.version)
+        .where(AgendaVersion.agenda_id.in_((agenda_id, GLOBAL_AGENDA_ID)))
+    )
+    versions = dict(result.all())
+    return versions.get(agenda_id, 0), versions.get(GLOBAL_AGENDA_ID, 0)
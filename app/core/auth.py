@@ -1,11 +1,16 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
 from typing import List, Callable
 import os
 
-from app.db.deps import get_db
+from app.db.deps import get_db, get_async_db
+from app.core.config import ALLOW_LEGACY_TOKENS
+from app.core.revocation import REVOCATION_LIST
+from app.core.security import ACCESS_TOKEN_TYPE
 from app.models.user import User
 
 # ✅ Control de registro público (para /auth/register si lo usas)
@@ -19,39 +24,116 @@ SECRET_KEY = os.getenv("JWT_SECRET", "dev_only_change_me")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 
 
+class Principal:
+    """
+    ✅ Usuario autenticado armado con los claims del access token, sin leer users.
+    Expone lo que los routers usan de current_user (id, email, role, owner_user_id,
+    is_active). Un cambio en esos datos revoca los tokens (app/core/revocation.py),
+    así que los claims nunca quedan viejos.
+    """
+    __slots__ = ("id", "email", "role", "owner_user_id", "is_active", "jti")
+
+    def __init__(self, claims: dict):
+        self.id = claims["uid"]
+        self.email = claims["sub"]
+        self.role = claims.get("role")
+        self.owner_user_id = claims.get("owner")
+        self.is_active = True
+        self.jti = claims["jti"]
+
+
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ):
     """
-    🔐 Verifica que el usuario exista usando el token.
+    🔐 Verifica el token.
 
-    ✅ Modo nuevo: token = JWT => se decodifica y se saca el email de 'sub'
-    ✅ Modo viejo (compatibilidad): token = email => se busca directo
+    ✅ Access token (con jti): claims + lista de revocación en memoria => sin query
+    ✅ Modo viejo (compatibilidad, ALLOW_LEGACY_TOKENS): JWT sin "typ" con exp vigente => se busca en users
     """
+    return authenticate_token(db, token)
+
+
+def authenticate_token(db: Session, token: str):
+    payload = _decode(token)
+    if _is_issued_token(payload):
+        if REVOCATION_LIST.stale:
+            REVOCATION_LIST.refresh(db)
+        return _principal_from_claims(payload)
 
-    email = None
+    user = db.query(User).filter(User.email == _legacy_email(payload)).first()
+    return _ensure_active_user(user)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    🔐 Igual que get_current_user pero con AsyncSession (para endpoints async def).
+    Comparte la sesión con el endpoint (misma dependencia get_async_db por request).
+    """
+    return await authenticate_token_async(db, token)
 
-    # --- 1) Intentar decodificar como JWT ---
+
+async def authenticate_token_async(db: AsyncSession, token: str):
+    """
+    Token -> usuario activo (401 si no). Para endpoints que no reciben el token por
+    header, como /events/stream (EventSource no permite headers => ?token=).
+    """
+    payload = _decode(token)
+    if _is_issued_token(payload):
+        if REVOCATION_LIST.stale:
+            await db.run_sync(REVOCATION_LIST.refresh)
+        return _principal_from_claims(payload)
+
+    result = await db.execute(select(User).where(User.email == _legacy_email(payload)))
+    return _ensure_active_user(result.scalars().first())
+
+
+def _decode(token: str) -> dict:
+    # require_exp: un JWT sin exp no vale nunca (los viejos sí lo traían, 30 días)
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"require_exp": True})
     except JWTError:
-        email = None
+        raise _unauthorized()
 
-    # --- 2) Fallback (modo viejo): token era el email ---
-    if not email:
-        email = token
 
-    user = db.query(User).filter(User.email == email).first()
+def _is_issued_token(payload: dict) -> bool:
+    # "typ" lo ponen todos los tokens de create_token_pair (app/core/security.py)
+    return "typ" in payload
 
-    if not user or not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token inválido o usuario inactivo",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
 
+def _principal_from_claims(payload: dict) -> Principal:
+    # un refresh token no sirve como access token
+    if payload["typ"] != ACCESS_TOKEN_TYPE or "jti" not in payload or "uid" not in payload:
+        raise _unauthorized()
+    if REVOCATION_LIST.is_revoked(payload["jti"], payload["uid"], payload.get("iat", 0)):
+        raise _unauthorized()
+    return Principal(payload)
+
+
+def _legacy_email(payload: dict) -> str:
+    # JWT del formato viejo (sin "typ"): email en 'sub', válido hasta su exp.
+    # 🔥 No se puede revocar: ALLOW_LEGACY_TOKENS=false lo corta
+    email = payload.get("sub")
+    if not ALLOW_LEGACY_TOKENS or not email:
+        raise _unauthorized()
+    return email
+
+
+def _unauthorized() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token inválido o usuario inactivo",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _ensure_active_user(user):
+    if not user or not user.is_active:
+        raise _unauthorized()
     return user
 
 
@@ -65,6 +147,16 @@ def require_admin(user: User = Depends(get_current_user)):
     return user
 
 
+async def require_admin_async(user: User = Depends(get_current_user_async)):
+    """🚨 Igual que require_admin pero sin ocupar el threadpool"""
+    if user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permisos de administrador"
+        )
+    return user
+
+
 def require_roles(roles: List[str]) -> Callable:
     """
     ✅ Valida que el usuario tenga uno de los roles permitidos.
@@ -80,3 +172,19 @@ def require_roles(roles: List[str]) -> Callable:
         return user
 
     return _checker
+
+
+def require_roles_async(roles: List[str]) -> Callable:
+    """
+    ✅ Igual que require_roles pero sobre get_current_user_async.
+    """
+    # async def: un checker sync se ejecutaría en el threadpool
+    async def _checker(user: User = Depends(get_current_user_async)):
+        if user.role not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="No tienes permisos para esta acción"
+            )
+        return user
+
+    return _checker
@@ -0,0 +1,75 @@
+# app/core/caches.py
+"""
+Caches en proceso de lecturas calientes que casi nunca cambian.
+Se invalidan entre workers con app/db/invalidation.py (NOTIFY + polling de respaldo).
+
+- clinic_settings: configuración clínica (se lee en cada cálculo de slots / disponibilidad).
+- agenda_owner: psicólogas activas (get_target_user_id del assistant en cada request).
+"""
+from typing import Callable, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.db.invalidation import ALL_KEYS, INVALIDATION_BUS, LocalCache
+from app.models.clinic_settings import ClinicSettings
+from app.models.user import User
+
+CLINIC_SETTINGS_ENTITY = "clinic_settings"
+AGENDA_OWNER_ENTITY = "agenda_owner"
+
+_GLOBAL_KEY = "global"
+
+CLINIC_SETTINGS_CACHE = INVALIDATION_BUS.register(LocalCache(CLINIC_SETTINGS_ENTITY))
+AGENDA_OWNER_CACHE = INVALIDATION_BUS.register(LocalCache(AGENDA_OWNER_ENTITY))
+
+
+# =========================
+# clinic_settings
+# =========================
+def _settings_snapshot(settings: ClinicSettings) -> ClinicSettings:
+    """
+    Copia transient (sin sesión) con los valores de las columnas: se comparte entre
+    requests/threads sin arrastrar la sesión que la cargó. Solo lectura.
+    """
+    columns = {c.key: getattr(settings, c.key) for c in inspect(ClinicSettings).column_attrs}
+    return ClinicSettings(**columns)
+
+
+def cached_clinic_settings(loader: Callable[[], ClinicSettings]) -> ClinicSettings:
+    """✅ loader = get_settings del router (crea la fila default si no existe)."""
+    return CLINIC_SETTINGS_CACHE.get_or_load(_GLOBAL_KEY, lambda: _settings_snapshot(loader()))
+
+
+# =========================
+# agenda_owner
+# =========================
+def active_psychologist_ids(db: Session) -> Tuple[int, ...]:
+    """✅ ids de psicólogas activas ordenados (el primero es la dueña de la agenda)."""
+    def _load():
+        rows = (
+            db.query(User.id)
+            .filter(User.role == "psychologist", User.is_active == True)
+            .order_by(User.id.asc())
+            .all()
+        )
+        return tuple(r.id for r in rows)
+
+    return AGENDA_OWNER_CACHE.get_or_load(_GLOBAL_KEY, _load)
+
+
+def _user_owner_key(user: User):
+    state = inspect(user)
+    if state.deleted or state.attrs.role.history.has_changes() or state.attrs.is_active.history.has_changes():
+        # alta/baja/cambio de rol o activación: puede cambiar la dueña de la agenda
+        return ALL_KEYS
+    return None
+
+
+INVALIDATION_BUS.watch(ClinicSettings, CLINIC_SETTINGS_ENTITY)
+INVALIDATION_BUS.watch(User, AGENDA_OWNER_ENTITY, _user_owner_key)
+
+
+def install_cache_invalidation() -> None:
+    """Listeners del bus en Session (los watches de arriba ya quedaron registrados al importar)."""
+    INVALIDATION_BUS.install()
@@ -0,0 +1,297 @@
+# app/core/compression.py
+"""
+Compresión de respuestas HTTP (gzip siempre; brotli / zstd si el paquete está instalado).
+
+- CompressionMiddleware: middleware ASGI puro (como HttpMetricsMiddleware).
+- Negociación por Accept-Encoding (respeta q=0); preferencia del servidor: zstd > br > gzip.
+- Umbral COMPRESSION_MIN_SIZE: se juntan los primeros chunks hasta saber si la
+  respuesta lo supera; las respuestas chicas salen tal cual.
+- StreamingResponse: cada chunk se comprime y se hace flush al momento (el cliente
+  recibe datos incrementalmente; no se bufferiza el cuerpo completo).
+- No se tocan: text/event-stream (SSE), respuestas ya codificadas, tipos no textuales,
+  Cache-Control: no-transform, 204/304.
+- Métricas (REGISTRY): bytes antes/después y ratio por encoding, y respuestas omitidas
+  por motivo.
+
+brotli / zstd son opcionales: `pip install brotli zstandard` para habilitarlos.
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import (
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MIN_SIZE,
+    COMPRESSION_ZSTD_LEVEL,
+)
+from app.core.metrics import REGISTRY
+
+try:
+    import brotli
+except ImportError:  # opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # opcional
+    zstandard = None
+
+
+RATIO_BUCKETS = (0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 0.75, 1.0)
+
+COMPRESSION_BYTES_IN = REGISTRY.counter(
+    "http_compression_bytes_in_total", "Bytes de respuesta antes de comprimir", ("encoding",)
+)
+COMPRESSION_BYTES_OUT = REGISTRY.counter(
+    "http_compression_bytes_out_total", "Bytes de respuesta enviados ya comprimidos", ("encoding",)
+)
+COMPRESSION_RATIO = REGISTRY.histogram(
+    "http_compression_ratio", "Tamaño comprimido / original por respuesta", ("encoding",), buckets=RATIO_BUCKETS
+)
+COMPRESSION_SKIPPED = REGISTRY.counter(
+    "http_compression_skipped_total", "Respuestas que no se comprimieron", ("reason",)
+)
+
+# Tipos que vale la pena comprimir (el resto: imágenes, pdf, zip... ya vienen comprimidos)
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/problem+json",
+    "image/svg+xml",
+)
+
+
+# =========================
+# Compresores (interfaz común: compress(chunk) -> bytes con flush, finish() -> bytes)
+# =========================
+class _GzipCompressor:
+    def __init__(self):
+        # wbits 16 + 15 => contenedor gzip
+        self._obj = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self):
+        self._obj = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self):
+        self._obj = zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def available_encodings() -> tuple:
+    """Encodings soportados en este proceso, en orden de preferencia del servidor."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return tuple(encodings)
+
+
+COMPRESSORS = {"gzip": _GzipCompressor, "br": _BrotliCompressor, "zstd": _ZstdCompressor}
+
+
+def choose_encoding(accept_encoding: str, available: tuple) -> Optional[str]:
+    """
+    Elige el encoding a partir de Accept-Encoding: el primero de `available`
+    (preferencia del servidor) que el cliente acepte con q > 0. "*" acepta cualquiera.
+    """
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.strip()] = q
+
+    for encoding in available:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > 0:
+            return encoding
+    return None
+
+
+def _skip_reason(message: dict) -> Optional[str]:
+    """Motivo para no comprimir, mirando solo el http.response.start."""
+    if message["status"] in (204, 304) or message["status"] < 200:
+        return "no_body"
+
+    headers = Headers(raw=message["headers"])
+    if "content-encoding" in headers:
+        return "already_encoded"
+    if "no-transform" in headers.get("cache-control", ""):
+        return "no_transform"
+
+    content_type = headers.get("content-type", "").lower()
+    if content_type.startswith("text/event-stream"):
+        # SSE: cada evento tiene que llegar en cuanto se emite
+        return "event_stream"
+    if not content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.split(";")[0].endswith("+json"):
+        return "content_type"
+    return None
+
+
+# =========================
+# Middleware
+# =========================
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, encodings: Optional[tuple] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = encodings if encodings is not None else available_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""), self.encodings)
+        responder = _CompressionResponder(self.app, encoding, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    """
+    Estado de UNA respuesta:
+    - se retiene http.response.start hasta ver suficiente cuerpo para decidir
+    - modo "passthrough" (sin comprimir) o "compress" (streaming con flush por chunk)
+    """
+
+    def __init__(self, app, encoding: Optional[str], minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+
+        self.start_message = None
+        self.pending = []
+        self.pending_size = 0
+        self.mode = None  # None = decidiendo, "passthrough", "compress"
+        self.compressor = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            reason = _skip_reason(message)
+            if reason is not None:
+                COMPRESSION_SKIPPED.inc(reason=reason)
+                self.mode = "passthrough"
+                await self.send(message)
+                return
+            self.start_message = message
+            return
+
+        if message_type != "http.response.body" or self.mode == "passthrough":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.mode == "compress":
+            await self._send_compressed(body, more_body)
+            return
+
+        # Decidiendo: juntar chunks hasta el umbral o el final del cuerpo
+        if body:
+            self.pending.append(body)
+            self.pending_size += len(body)
+
+        if self.pending_size < self.minimum_size:
+            if more_body:
+                return
+            COMPRESSION_SKIPPED.inc(reason="below_threshold")
+            await self._flush_passthrough(more_body=False)
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers.add_vary_header("Accept-Encoding")
+
+        if self.encoding is None:
+            COMPRESSION_SKIPPED.inc(reason="not_accepted")
+            await self._flush_passthrough(more_body)
+            return
+
+        self.mode = "compress"
+        self.compressor = COMPRESSORS[self.encoding]()
+        headers["Content-Encoding"] = self.encoding
+        pending = b"".join(self.pending)
+        self.pending = []
+
+        if not more_body:
+            # Cuerpo completo en mano: un solo mensaje con Content-Length real
+            self.bytes_in = len(pending)
+            compressed = self.compressor.compress(pending) + self.compressor.finish()
+            self.bytes_out = len(compressed)
+            headers["Content-Length"] = str(len(compressed))
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": compressed, "more_body": False})
+            self._observe()
+            return
+
+        # Streaming: el largo final no se conoce
+        del headers["Content-Length"]
+        await self.send(self.start_message)
+        await self._send_compressed(pending, more_body=True)
+
+    async def _flush_passthrough(self, more_body: bool) -> None:
+        self.mode = "passthrough"
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": b"".join(self.pending), "more_body": more_body})
+        self.pending = []
+
+    async def _send_compressed(self, body: bytes, more_body: bool) -> None:
+        self.bytes_in += len(body)
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        self.bytes_out += len(chunk)
+
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+        if not more_body:
+            self._observe()
+
+    def _observe(self) -> None:
+        COMPRESSION_BYTES_IN.inc(self.bytes_in, encoding=self.encoding)
+        COMPRESSION_BYTES_OUT.inc(self.bytes_out, encoding=self.encoding)
+        if self.bytes_in:
+            COMPRESSION_RATIO.observe(self.bytes_out / self.bytes_in, encoding=self.encoding)
@@ -0,0 +1,115 @@
+# app/core/conditional_get.py
+"""
+GET condicional por versión de agenda (ETag débil + If-None-Match -> 304).
+
+- conditional_get(): dependencia para los GET de /calendar, /dashboard, /appointments
+  y /patients. Resuelve la agenda del usuario, lee su versión (1 query) y, si el
+  If-None-Match del cliente coincide, responde 304 ANTES de que corran las queries
+  del endpoint.
+- El ETag se arma con (agenda, versión, versión global, usuario, ruta, query params)
+  y opcionalmente un bucket de tiempo para endpoints que dependen de "ahora"
+  (dashboard, disponibilidad): aunque la agenda no cambie, el ETag rota cada N segundos.
+- ConditionalGetHeadersMiddleware agrega el ETag a la respuesta 200 (también a las
+  que devuelven un Response directo, como fast_list_response o el CSV en streaming).
+"""
+import hashlib
+import time
+from typing import Callable, Optional
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import MutableHeaders
+
+from app.core.agenda_version import agenda_id_for_user, read_agenda_versions
+from app.core.auth import get_current_user_async
+from app.core.config import AGENDA_ETAG_ENABLED
+from app.core.metrics import REGISTRY
+from app.db.deps import get_async_db
+from app.models.user import User
+
+CONDITIONAL_GET = REGISTRY.counter(
+    "http_conditional_get_total", "GET con ETag de agenda: not_modified (304) o miss", ("result",)
+)
+
+# Clave de request.state / scope["state"] donde la dependencia deja el ETag
+STATE_KEY = "agenda_etag"
+
+# Revalidar siempre (no-cache), pero el navegador puede guardar la respuesta (private)
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(agenda_id: Optional[int], version: int, global_version: int, key: str) -> str:
+    digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    agenda = "all" if agenda_id is None else agenda_id
+    return f'W/"{agenda}.{version}.{global_version}.{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil (RFC 9110): se ignora el prefijo W/."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def conditional_get(time_bucket_seconds: int = 0) -> Callable:
+    """
+    ✅ Dependencia de GET condicional.
+    Uso:
+        @router.get("/events", dependencies=[Depends(conditional_get())])
+        @router.get("/upcoming", dependencies=[Depends(conditional_get(AGENDA_ETAG_TIME_BUCKET_SECONDS))])
+    """
+    async def _dependency(
+        request: Request,
+        db: AsyncSession = Depends(get_async_db),
+        current_user: User = Depends(get_current_user_async),
+    ) -> Optional[str]:
+        if not AGENDA_ETAG_ENABLED:
+            return None
+
+        agenda_id = await agenda_id_for_user(db, current_user)
+        version, global_version = await read_agenda_versions(db, agenda_id)
+        # commit (expire_on_commit=False): libera la conexión sin expirar current_user
+        await db.commit()
+
+        query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+        key = f"{current_user.id}:{current_user.role}:{request.url.path}?{query}"
+        if time_bucket_seconds:
+            key += f"@{int(time.time() // time_bucket_seconds)}"
+        etag = make_etag(agenda_id, version, global_version, key)
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            CONDITIONAL_GET.inc(result="not_modified")
+            raise HTTPException(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+        CONDITIONAL_GET.inc(result="miss")
+        setattr(request.state, STATE_KEY, etag)
+        return etag
+
+    return _dependency
+
+
+# =========================
+# Middleware: ETag en la respuesta 200
+# =========================
+class ConditionalGetHeadersMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                etag = scope.get("state", {}).get(STATE_KEY)
+                if etag:
+                    headers = MutableHeaders(raw=message["headers"])
+                    headers.setdefault("ETag", etag)
+                    headers.setdefault("Cache-Control", CACHE_CONTROL)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
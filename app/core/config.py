@@ -0,0 +1,144 @@
+# app/core/config.py
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+# =========================
+# Sweeper de no-shows (app/core/no_show_sweeper.py)
+# =========================
+# Apagado por defecto: se activa por entorno en el/los workers que lo deban correr
+NO_SHOW_SWEEPER_ENABLED = _env_bool("NO_SHOW_SWEEPER_ENABLED", False)
+
+# Minutos después del FIN de la cita antes de marcarla no-show
+NO_SHOW_GRACE_MINUTES = _env_int("NO_SHOW_GRACE_MINUTES", 120)
+
+# Cada cuánto corre el barrido
+NO_SHOW_SWEEP_INTERVAL_SECONDS = _env_int("NO_SHOW_SWEEP_INTERVAL_SECONDS", 300)
+
+
+# =========================
+# Pools (ajustables por instancia de Railway)
+# =========================
+# Conexiones por proceso = DB_POOL_SIZE + DB_MAX_OVERFLOW (x2 con el engine async)
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 10)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 20)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)
+
+# Threads de anyio para endpoints/dependencias sync (default de anyio: 40)
+THREADPOOL_SIZE = _env_int("THREADPOOL_SIZE", 40)
+
+
+# =========================
+# Métricas HTTP (app/core/http_metrics.py)
+# =========================
+# Con varios workers de uvicorn: directorio compartido donde cada worker vuelca sus métricas
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR") or None
+METRICS_FLUSH_SECONDS = _env_int("METRICS_FLUSH_SECONDS", 5)
+
+
+# =========================
+# Instrumentación SQL por request (app/db/instrumentation.py)
+# =========================
+# Headers Server-Timing / X-DB-Queries + aviso de sentencias repetidas (N+1)
+DB_INSTRUMENTATION_ENABLED = _env_bool("DB_INSTRUMENTATION_ENABLED", True)
+DB_REPEATED_STATEMENT_THRESHOLD = _env_int("DB_REPEATED_STATEMENT_THRESHOLD", 5)
+
+
+# =========================
+# Registro de sentencias por fingerprint (app/db/slow_queries.py)
+# =========================
+# Solo se registran sentencias que duren al menos esto (0 = todas)
+SLOW_QUERY_RECORD_MS = _env_int("SLOW_QUERY_RECORD_MS", 0)
+SLOW_QUERY_TOP_K = _env_int("SLOW_QUERY_TOP_K", 200)
+
+# EXPLAIN (ANALYZE, BUFFERS) muestreado de SELECTs lentos (re-ejecuta la consulta)
+SLOW_QUERY_EXPLAIN_ENABLED = _env_bool("SLOW_QUERY_EXPLAIN_ENABLED", False)
+SLOW_QUERY_EXPLAIN_MS = _env_int("SLOW_QUERY_EXPLAIN_MS", 500)
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0.1"))
+
+
+# =========================
+# Compresión de respuestas (app/core/compression.py)
+# =========================
+COMPRESSION_ENABLED = _env_bool("COMPRESSION_ENABLED", True)
+# Respuestas más chicas que esto no se comprimen (caben en un paquete; el header cuesta más)
+COMPRESSION_MIN_SIZE = _env_int("COMPRESSION_MIN_SIZE", 1024)
+# Niveles pensados para contenido dinámico (rápidos, no máximos)
+COMPRESSION_GZIP_LEVEL = _env_int("COMPRESSION_GZIP_LEVEL", 6)
+COMPRESSION_BROTLI_QUALITY = _env_int("COMPRESSION_BROTLI_QUALITY", 4)
+COMPRESSION_ZSTD_LEVEL = _env_int("COMPRESSION_ZSTD_LEVEL", 3)
+
+# =========================
+# GET condicional por versión de agenda (app/core/conditional_get.py)
+# =========================
+AGENDA_ETAG_ENABLED = _env_bool("AGENDA_ETAG_ENABLED", True)
+# Endpoints que dependen de "ahora" (dashboard, disponibilidad): el ETag rota cada N segundos
+AGENDA_ETAG_TIME_BUCKET_SECONDS = _env_int("AGENDA_ETAG_TIME_BUCKET_SECONDS", 60)
+
+# =========================
+# Eventos de agenda / SSE (app/core/events.py, app/db/notify.py)
+# =========================
+# Thread LISTEN por worker + /events/stream
+EVENTS_ENABLED = _env_bool("EVENTS_ENABLED", True)
+# Eventos pendientes por cliente SSE; si se llena, el cliente recibe "resync"
+EVENTS_QUEUE_SIZE = _env_int("EVENTS_QUEUE_SIZE", 256)
+# Comentario keepalive para proxies que cortan conexiones inactivas
+EVENTS_KEEPALIVE_SECONDS = _env_int("EVENTS_KEEPALIVE_SECONDS", 15)
+
+# =========================
+# Caches en proceso + bus de invalidación (app/db/invalidation.py)
+# =========================
+# Red de seguridad: ninguna entrada vive más que esto aunque se pierda una invalidación
+CACHE_TTL_SECONDS = _env_int("CACHE_TTL_SECONDS", 300)
+# Si el LISTEN no está conectado, cada cuánto se comparan las versiones de cache_versions
+INVALIDATION_POLL_SECONDS = _env_int("INVALIDATION_POLL_SECONDS", 5)
+# false => solo polling (p.ej. detrás de un pooler en modo transacción, sin LISTEN)
+INVALIDATION_LISTEN_ENABLED = _env_bool("INVALIDATION_LISTEN_ENABLED", True)
+
+# =========================
+# Login: bcrypt fuera del threadpool + rate limit (app/core/password_hashing.py, app/core/rate_limit.py)
+# =========================
+# Costo de bcrypt; hashes con menos rounds se re-hashean al hacer login correcto
+BCRYPT_ROUNDS = _env_int("BCRYPT_ROUNDS", 12)
+# Threads dedicados a bcrypt (libera el GIL => ~1 por CPU) y cola máxima antes de 503
+PASSWORD_HASH_WORKERS = _env_int("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+PASSWORD_HASH_MAX_PENDING = _env_int("PASSWORD_HASH_MAX_PENDING", 32)
+
+# Token bucket en memoria por IP y por email (por worker); se rechaza ANTES de hashear
+LOGIN_RATE_LIMIT_ENABLED = _env_bool("LOGIN_RATE_LIMIT_ENABLED", True)
+LOGIN_RATE_IP_BURST = _env_int("LOGIN_RATE_IP_BURST", 20)
+LOGIN_RATE_IP_PER_MINUTE = _env_int("LOGIN_RATE_IP_PER_MINUTE", 30)
+LOGIN_RATE_EMAIL_BURST = _env_int("LOGIN_RATE_EMAIL_BURST", 5)
+LOGIN_RATE_EMAIL_PER_MINUTE = _env_int("LOGIN_RATE_EMAIL_PER_MINUTE", 5)
+# Proxies de confianza delante de la app (Railway: 1). La IP del rate limit sale de
+# X-Forwarded-For contando esa cantidad de saltos desde la derecha; 0 => IP del socket
+TRUSTED_PROXY_HOPS = _env_int("TRUSTED_PROXY_HOPS", 1)
+
+# =========================
+# Tokens: access cortos + refresh revocables (app/core/security.py, app/core/revocation.py)
+# =========================
+# Vida del access token; después el cliente usa el refresh token (POST /auth/refresh)
+ACCESS_TOKEN_EXPIRE_MINUTES = _env_int("ACCESS_TOKEN_EXPIRE_MINUTES", 15)
+REFRESH_TOKEN_EXPIRE_DAYS = _env_int("REFRESH_TOKEN_EXPIRE_DAYS", 30)
+# JWT del formato viejo (sin "typ"/"jti", 30 días) aceptados hasta su exp. No pasan por la
+# lista de revocación: logout / cambio de contraseña no los invalidan => false para cortarlos
+ALLOW_LEGACY_TOKENS = _env_bool("ALLOW_LEGACY_TOKENS", True)
+# Ids de revoked_tokens saltados en una relectura (transacción aún sin commit) se
+# vuelven a pedir durante este tiempo
+REVOCATION_GAP_SECONDS = _env_int("REVOCATION_GAP_SECONDS", 60)
@@ -1,12 +1,11 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.db.deps import get_db
 from app.models.user import User
-from app.core.security import SECRET_KEY, ALGORITHM
+from app.core.auth import authenticate_token
 
 
 # 🔐 Define de dónde FastAPI obtiene el token
@@ -19,36 +18,10 @@ def get_current_user(
     db: Session = Depends(get_db)
 ) -> User:  # 👈 buena práctica tipar retorno
     """
-    Decodifica el JWT y devuelve el usuario autenticado.
+    Verifica el token y devuelve el usuario autenticado (misma verificación que
+    app/core/auth.py: claims del access token + lista de revocación en memoria).
     """
-
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Token inválido o expirado",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
-    try:
-        # 🔎 Decodificamos el token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str | None = payload.get("sub")
-
-        if email is None:
-            raise credentials_exception
-
-    except JWTError:
-        raise credentials_exception
-
-    # 🔎 Buscamos el usuario en la base de datos
-    user = db.query(User).filter(User.email == email).first()
-
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Usuario no encontrado"
-        )
-
-    return user
+    return authenticate_token(db, token)
 
 
 # 🎭 CONTROL DE ROLES (RBAC - Role Based Access Control)
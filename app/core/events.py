@@ -0,0 +1,146 @@
+# app/core/events.py
+"""
+Eventos de cambios de agenda para /events/stream (SSE).
+
+Flujo:
+    router (antes del commit) -> publish_agenda_event(db, ...) -> pg_notify en la transacción
+    commit -> Postgres entrega a TODOS los workers -> PgListener (thread) -> AGENDA_HUB.dispatch
+    -> colas asyncio de los clientes SSE de esa agenda (en el event loop)
+
+Eventos compactos (el cliente vuelve a pedir lo que le interesa):
+    {"type": "appointment.created", "agenda_id": 2, "id": 10, "start_time": "...", "status": "scheduled"}
+    {"type": "appointment.status_changed", "agenda_id": 2, "ids": [10, 11], "status": "no_show"}
+"""
+import asyncio
+import itertools
+import logging
+from typing import Dict, Iterable, Optional, Set
+
+import orjson
+from sqlalchemy.orm import Session
+
+from app.core.config import EVENTS_QUEUE_SIZE
+from app.core.metrics import REGISTRY
+from app.db.notify import notify
+
+logger = logging.getLogger(__name__)
+
+AGENDA_EVENTS_CHANNEL = "agenda_events"
+
+# Tipos de evento
+APPOINTMENT_CREATED = "appointment.created"
+APPOINTMENT_UPDATED = "appointment.updated"
+APPOINTMENT_STATUS_CHANGED = "appointment.status_changed"
+SERIES_CREATED = "series.created"
+SERIES_CANCELLED = "series.cancelled"
+BLOCK_ADDED = "block.added"
+BLOCK_UPDATED = "block.updated"
+BLOCK_REMOVED = "block.removed"
+
+# Lotes grandes: se mandan los primeros N ids y "truncated" (cabe en el payload de NOTIFY)
+MAX_IDS_PER_EVENT = 500
+
+AGENDA_EVENTS_PUBLISHED = REGISTRY.counter(
+    "agenda_events_published_total", "Eventos de agenda emitidos (NOTIFY)", ("type",)
+)
+AGENDA_EVENTS_DELIVERED = REGISTRY.counter(
+    "agenda_events_delivered_total", "Eventos entregados a colas de clientes SSE", ()
+)
+AGENDA_EVENTS_DROPPED = REGISTRY.counter(
+    "agenda_events_dropped_total", "Eventos descartados por cola llena (cliente lento)", ()
+)
+SSE_SUBSCRIBERS = REGISTRY.gauge(
+    "sse_subscribers", "Clientes conectados a /events/stream", ()
+)
+
+
+# =========================
+# Emisión (desde los routers, dentro de la transacción)
+# =========================
+def publish_agenda_event(db: Session, agenda_id: int, event_type: str, ids: Optional[Iterable[int]] = None, **data) -> None:
+    """
+    ✅ Encola el evento con pg_notify: se entrega SOLO si la transacción hace commit.
+    Llamar antes de db.commit(), con los ids ya asignados (después de un flush).
+    """
+    event = {"type": event_type, "agenda_id": agenda_id}
+    if ids is not None:
+        ids = sorted(set(ids))
+        if not ids:
+            return
+        event["ids"] = ids[:MAX_IDS_PER_EVENT]
+        if len(ids) > MAX_IDS_PER_EVENT:
+            event["truncated"] = True
+    event.update(data)
+
+    notify(db, AGENDA_EVENTS_CHANNEL, orjson.dumps(event).decode())
+    AGENDA_EVENTS_PUBLISHED.inc(type=event_type)
+
+
+# =========================
+# Pub/sub en proceso
+# =========================
+class Subscription:
+    __slots__ = ("agenda_id", "queue", "lagged")
+
+    def __init__(self, agenda_id: Optional[int], maxsize: int):
+        self.agenda_id = agenda_id          # None = todas las agendas (admin)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.lagged = False                 # se perdieron eventos: el cliente debe resincronizar
+
+
+class AgendaEventHub:
+    """
+    Suscriptores por agenda. Todo corre en el event loop; el thread LISTEN entra
+    por dispatch_threadsafe (call_soon_threadsafe).
+    """
+
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._by_agenda: Dict[Optional[int], Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._seq = itertools.count(1)
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def subscribe(self, agenda_id: Optional[int]) -> Subscription:
+        sub = Subscription(agenda_id, self.queue_size)
+        self._by_agenda.setdefault(agenda_id, set()).add(sub)
+        SSE_SUBSCRIBERS.inc()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._by_agenda.get(sub.agenda_id)
+        if subs and sub in subs:
+            subs.discard(sub)
+            if not subs:
+                del self._by_agenda[sub.agenda_id]
+            SSE_SUBSCRIBERS.dec()
+
+    def dispatch(self, payload: str) -> None:
+        try:
+            event = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            logger.warning("Evento de agenda inválido: %r", payload[:200])
+            return
+
+        # id por proceso (para el campo id: de SSE; no es global entre workers)
+        event_id = next(self._seq)
+        targets = self._by_agenda.get(event.get("agenda_id"), set()) | self._by_agenda.get(None, set())
+        for sub in targets:
+            try:
+                sub.queue.put_nowait((event_id, event))
+                AGENDA_EVENTS_DELIVERED.inc()
+            except asyncio.QueueFull:
+                sub.lagged = True
+                AGENDA_EVENTS_DROPPED.inc()
+
+    def dispatch_threadsafe(self, payload: str) -> None:
+        """Handler del PgListener (corre en su thread)."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self.dispatch, payload)
+
+
+AGENDA_HUB = AgendaEventHub()
@@ -0,0 +1,53 @@
+# app/core/fast_json.py
+from functools import lru_cache
+from typing import Any, Iterable, List, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+# =========================
+# Fast path para listas grandes
+# =========================
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """
+    TypeAdapter(List[model]) cacheado por modelo: construirlo compila el schema
+    (caro), así que se hace una sola vez por proceso.
+    """
+    return TypeAdapter(List[model])
+
+
+def fast_list_response(model: Type[BaseModel], rows: Iterable[Any], status_code: int = 200) -> Response:
+    """
+    ✅ Respuesta de lista SIN el doble trabajo del camino normal de FastAPI.
+
+    Camino normal: el endpoint arma un dict por fila -> FastAPI valida cada dict contra
+    response_model -> model_dump(mode="json") a objetos Python -> json.dumps.
+
+    Fast path: las filas (Row de SQLAlchemy con columnas etiquetadas como los campos del
+    modelo, u objetos con esos atributos) se validan UNA vez con from_attributes y
+    pydantic-core las escribe directo a bytes JSON (dump_json, en Rust).
+
+    Como devuelve un Response, FastAPI no vuelve a validar: el response_model del
+    decorador queda solo para OpenAPI. Solo usar si las filas cubren todos los campos
+    requeridos del modelo.
+    """
+    adapter = list_adapter(model)
+    body = adapter.dump_json(adapter.validate_python(list(rows), from_attributes=True))
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+@lru_cache(maxsize=None)
+def model_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def fast_model_response(model: Type[BaseModel], data: Any, status_code: int = 200) -> Response:
+    """
+    ✅ Igual que fast_list_response para respuestas compuestas: `data` es un dict cuyos
+    campos de lista traen Row de SQLAlchemy (se validan con from_attributes).
+    """
+    adapter = model_adapter(model)
+    body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    return Response(content=body, status_code=status_code, media_type="application/json")
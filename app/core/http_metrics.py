@@ -0,0 +1,211 @@
+# app/core/http_metrics.py
+"""
+Métricas HTTP por ruta (path con plantilla, p.ej. /appointments/{appointment_id}).
+
+- HttpMetricsMiddleware: middleware ASGI puro (sin BaseHTTPMiddleware) que mide latencia,
+  cuenta status codes y lleva el número de requests en vuelo.
+- Registro sin locks: solo el event loop escribe (un único writer por proceso),
+  el scrape/flush lee copias de los dicts.
+- Modo multiproceso (METRICS_MULTIPROC_DIR): cada worker vuelca su snapshot a
+  <dir>/http_<pid>.json cada METRICS_FLUSH_SECONDS y el scrape suma todos los archivos.
+"""
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+from app.core.config import METRICS_FLUSH_SECONDS, METRICS_MULTIPROC_DIR
+from app.core.metrics import _format_labels, _format_value
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Requests que no matchean ninguna ruta se agrupan (evita cardinalidad infinita con URLs raras)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class HttpMetrics:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # (method, route) -> [bucket_counts..., +Inf, sum]
+        self.latency: Dict[tuple, list] = {}
+        # (method, route, status) -> count
+        self.requests: Dict[tuple, int] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route)
+        hist = self.latency.get(key)
+        if hist is None:
+            hist = [0] * (len(self.buckets) + 2)
+            self.latency[key] = hist
+        # índice del primer bucket >= seconds (len(buckets) = +Inf)
+        hist[bisect_left(self.buckets, seconds)] += 1
+        hist[-1] += seconds
+
+        rkey = (method, route, status)
+        self.requests[rkey] = self.requests.get(rkey, 0) + 1
+
+    # -------------------------
+    # Snapshot / multiproceso
+    # -------------------------
+    def snapshot(self) -> dict:
+        # dict()/list() se copian sin ceder el GIL: lectura consistente sin lock
+        return {
+            "pid": os.getpid(),
+            "buckets": list(self.buckets),
+            "latency": [[m, r, list(h)] for (m, r), h in dict(self.latency).items()],
+            "requests": [[m, r, s, c] for (m, r, s), c in dict(self.requests).items()],
+            "in_flight": self.in_flight,
+        }
+
+    def flush(self, directory: str) -> None:
+        path = os.path.join(directory, f"http_{os.getpid()}.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)  # atómico: el scrape nunca lee un archivo a medias
+
+    def render(self, directory: Optional[str] = None) -> str:
+        snapshots = [self.snapshot()]
+        if directory:
+            snapshots.extend(_read_other_workers(directory))
+        return _render_snapshots(snapshots, self.buckets)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_other_workers(directory: str) -> List[dict]:
+    own = f"http_{os.getpid()}.json"
+    out = []
+    for name in os.listdir(directory):
+        if not name.startswith("http_") or not name.endswith(".json") or name == own:
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                snap = json.load(f)
+        except (OSError, ValueError):
+            continue
+        # contadores de workers muertos se conservan (son monótonos); su in_flight no
+        if not _pid_alive(snap.get("pid", 0)):
+            snap["in_flight"] = 0
+        out.append(snap)
+    return out
+
+
+def _render_snapshots(snapshots: List[dict], buckets: tuple) -> str:
+    latency: Dict[tuple, list] = {}
+    requests: Dict[tuple, int] = {}
+    in_flight = 0
+
+    for snap in snapshots:
+        if tuple(snap["buckets"]) != tuple(buckets):
+            continue  # worker con otra configuración de buckets: no se puede sumar
+        for method, route, hist in snap["latency"]:
+            acc = latency.setdefault((method, route), [0] * len(hist))
+            for i, v in enumerate(hist):
+                acc[i] += v
+        for method, route, status, count in snap["requests"]:
+            key = (method, route, status)
+            requests[key] = requests.get(key, 0) + count
+        in_flight += snap["in_flight"]
+
+    names = ("method", "route")
+    lines = [
+        "# HELP http_request_duration_seconds Latencia de requests HTTP por ruta",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for key, hist in sorted(latency.items()):
+        cumulative = 0
+        for upper, count in zip(buckets, hist):
+            cumulative += count
+            lines.append(f"http_request_duration_seconds_bucket{_format_labels(names, key, ('le', _format_value(upper)))} {cumulative}")
+        total = cumulative + hist[len(buckets)]
+        lines.append(f"http_request_duration_seconds_bucket{_format_labels(names, key, ('le', '+Inf'))} {total}")
+        lines.append(f"http_request_duration_seconds_sum{_format_labels(names, key)} {_format_value(hist[-1])}")
+        lines.append(f"http_request_duration_seconds_count{_format_labels(names, key)} {total}")
+
+    lines += [
+        "# HELP http_requests_total Requests HTTP por ruta y status",
+        "# TYPE http_requests_total counter",
+    ]
+    for key, count in sorted(requests.items()):
+        lines.append(f"http_requests_total{_format_labels(('method', 'route', 'status'), key)} {count}")
+
+    lines += [
+        "# HELP http_requests_in_flight Requests HTTP en curso",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {in_flight}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+HTTP_METRICS = HttpMetrics()
+
+
+class HttpMetricsMiddleware:
+    """
+    Middleware ASGI puro: ~1 perf_counter por borde + 2 updates de dict por request.
+    La ruta se lee de scope["route"] (la pone el router de Starlette al hacer match).
+    """
+
+    def __init__(self, app, metrics: HttpMetrics = HTTP_METRICS):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            metrics.observe(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_code,
+                time.perf_counter() - start,
+            )
+
+
+def render_http_metrics() -> str:
+    return HTTP_METRICS.render(METRICS_MULTIPROC_DIR)
+
+
+async def run_flusher(stop: asyncio.Event) -> None:
+    """
+    Tarea del lifespan (solo con METRICS_MULTIPROC_DIR): vuelca el snapshot de este worker.
+    Corre en el mismo event loop que escribe las métricas.
+    """
+    os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+    while True:
+        HTTP_METRICS.flush(METRICS_MULTIPROC_DIR)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=METRICS_FLUSH_SECONDS)
+            break
+        except asyncio.TimeoutError:
+            continue
+    HTTP_METRICS.flush(METRICS_MULTIPROC_DIR)
@@ -0,0 +1,26 @@
+# app/core/local_time.py
+"""
+Hora local del consultorio.
+
+start_time de citas, series y bloqueos se guarda naive en hora local
+(America/Mexico_City): es lo que manda el frontend y lo que validan los horarios
+de atención. Todo "ahora" o datetime aware que se compare con esas columnas pasa
+por aquí (el servidor en Railway corre en UTC).
+"""
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+LOCAL_TZ = ZoneInfo("America/Mexico_City")
+
+
+def local_now() -> datetime:
+    """✅ Ahora en hora local, naive (comparable con start_time)."""
+    return datetime.now(LOCAL_TZ).replace(tzinfo=None)
+
+
+def to_local_naive(dt: Optional[datetime]) -> Optional[datetime]:
+    """Aware => se convierte a hora local y se quita tzinfo. Naive => ya es hora local."""
+    if dt is None or dt.tzinfo is None:
+        return dt
+    return dt.astimezone(LOCAL_TZ).replace(tzinfo=None)
@@ -0,0 +1,207 @@
+# app/core/no_show_sweeper.py
+import logging
+import secrets
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, insert, text, update
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    NO_SHOW_GRACE_MINUTES,
+    NO_SHOW_SWEEP_INTERVAL_SECONDS,
+)
+from app.core.agenda_version import bump_agenda_versions, stamp_change_versions
+from app.core.events import publish_agenda_event, APPOINTMENT_STATUS_CHANGED
+from app.core.local_time import local_now
+from app.core.patient_stats import refresh_patient_stats
+from app.core.recurrence import iter_virtual_occurrences
+from app.core.security import get_password_hash
+from app.models.appointment import Appointment
+from app.models.appointment_series import AppointmentSeriesException
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Llave fija del advisory lock (pg_try_advisory_xact_lock): 1 solo worker barre a la vez
+SWEEPER_LOCK_KEY = 703_101
+
+SYSTEM_USER_EMAIL = "system@psych-saas.local"
+
+
+def get_system_user_id(db: Session) -> int:
+    """
+    Usuario "system" para auditoría (updated_by / created_by).
+    Se crea inactivo y con password aleatoria: no puede iniciar sesión
+    ni cuenta como psicóloga activa para get_owner_user_id.
+    """
+    user_id = db.query(User.id).filter(User.email == SYSTEM_USER_EMAIL).scalar()
+    if user_id is not None:
+        return user_id
+
+    user = User(
+        email=SYSTEM_USER_EMAIL,
+        password=get_password_hash(secrets.token_urlsafe(32)),
+        role="system",
+        is_active=False,
+    )
+    db.add(user)
+    db.flush()
+    return user.id
+
+
+def sweep_no_shows(db: Session, grace_minutes: int = NO_SHOW_GRACE_MINUTES) -> Optional[dict]:
+    """
+    ✅ Marca como no_show las citas 'scheduled' cuyo fin + gracia ya pasó.
+    - 1 UPDATE ... RETURNING para las citas reales
+    - las ocurrencias virtuales vencidas de series se materializan ya como no_show
+    - refresca patient_stats de los pacientes tocados
+    Devuelve None si otro worker tiene el lock.
+    """
+    locked = db.execute(
+        text("SELECT pg_try_advisory_xact_lock(:key)"),
+        {"key": SWEEPER_LOCK_KEY}
+    ).scalar()
+    if not locked:
+        db.rollback()
+        return None
+
+    now = datetime.utcnow()
+    # start_time es hora local naive (America/Mexico_City): el corte también
+    cutoff = local_now() - timedelta(minutes=grace_minutes)
+    system_user_id = get_system_user_id(db)
+
+    # start_time < cutoff usa el índice; la 2a condición exige que también haya TERMINADO
+    swept = db.execute(
+        update(Appointment)
+        .where(
+            Appointment.is_active == True,
+            Appointment.status == "scheduled",
+            Appointment.start_time < cutoff,
+            Appointment.start_time + func.make_interval(0, 0, 0, 0, 0, Appointment.duration_minutes) < cutoff,
+        )
+        .values(status="no_show", updated_by=system_user_id, updated_at=now)
+        .returning(Appointment.id, Appointment.patient_id, Appointment.user_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    patient_ids = {patient_id for _, patient_id, _ in swept}
+    # agenda -> ids de citas que pasaron a no_show (para el evento de cada agenda)
+    changed = {}
+    for appt_id, _, user_id in swept:
+        changed.setdefault(user_id, []).append(appt_id)
+
+    # Series: ocurrencias sin fila que ya vencieron -> fila no_show + excepción
+    overdue = [
+        occ for occ in iter_virtual_occurrences(db, window_end=cutoff)
+        if occ.start_time + timedelta(minutes=occ.duration_minutes) < cutoff
+    ]
+
+    if overdue:
+        appt_ids = db.scalars(
+            # mismo orden que las filas enviadas (insertmanyvalues no lo garantiza sin esto)
+            insert(Appointment).returning(Appointment.id, sort_by_parameter_order=True),
+            [
+                {
+                    "patient_id": occ.patient_id,
+                    "user_id": occ.user_id,
+                    "start_time": occ.start_time,
+                    "duration_minutes": occ.duration_minutes,
+                    "status": "no_show",
+                    "notes": occ.notes,
+                    "created_by": system_user_id,
+                    "updated_by": system_user_id,
+                    "updated_at": now,
+                }
+                for occ in overdue
+            ],
+        ).all()
+
+        db.execute(
+            insert(AppointmentSeriesException),
+            [
+                {
+                    "series_id": occ.series_id,
+                    "occurrence_start": occ.start_time,
+                    "appointment_id": appt_id,
+                    "created_by": system_user_id,
+                }
+                for occ, appt_id in zip(overdue, appt_ids)
+            ],
+        )
+        patient_ids.update(occ.patient_id for occ in overdue)
+        for occ, appt_id in zip(overdue, appt_ids):
+            changed.setdefault(occ.user_id, []).append(appt_id)
+
+    # UPDATE / INSERT en lote: no pasan por el flush => versión de agenda a mano
+    bump_agenda_versions(db, changed)
+    stamp_change_versions(db, Appointment, [i for ids in changed.values() for i in ids])
+    for agenda_id, appt_ids_changed in changed.items():
+        publish_agenda_event(db, agenda_id, APPOINTMENT_STATUS_CHANGED, ids=appt_ids_changed, status="no_show")
+    refresh_patient_stats(db, patient_ids)
+    db.commit()
+
+    return {
+        "appointments": len(swept),
+        "series_occurrences": len(overdue),
+        "patients": len(patient_ids),
+    }
+
+
+# =========================
+# Scheduler en proceso (arranca/para con el lifespan de la app)
+# =========================
+class NoShowSweeper:
+    def __init__(self, session_factory, interval_seconds: int = NO_SHOW_SWEEP_INTERVAL_SECONDS):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Optional[dict]:
+        db = self.session_factory()
+        try:
+            return sweep_no_shows(db)
+        except Exception:
+            db.rollback()
+            logger.exception("Falló el barrido de no-shows")
+            return None
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            result = self.run_once()
+            if result and (result["appointments"] or result["series_occurrences"]):
+                logger.info("no-show sweeper: %s", result)
+
+            # wait() devuelve True cuando se pide detener -> sale sin esperar el intervalo completo
+            if self._stop.wait(self.interval_seconds):
+                break
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="no-show-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+
+if __name__ == "__main__":
+    # Barrido manual / cron: python -m app.core.no_show_sweeper
+    import app.main  # noqa: F401  (registra todos los modelos)
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"no-show sweeper: {sweep_no_shows(session)}")
+    finally:
+        session.close()
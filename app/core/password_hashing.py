@@ -0,0 +1,87 @@
+# app/core/password_hashing.py
+"""
+bcrypt fuera del threadpool de requests.
+
+- Executor propio (PASSWORD_HASH_WORKERS threads): bcrypt libera el GIL mientras
+  calcula, así que threads bastan (no hace falta un pool de procesos) y el event
+  loop sigue atendiendo. Con el threadpool de anyio compartido, una ráfaga de
+  logins ocupaba los 40 threads y frenaba todos los endpoints sync.
+- Cola acotada: más de PASSWORD_HASH_MAX_PENDING verificaciones en curso/espera
+  => PasswordHasherBusy (el endpoint responde 503 con Retry-After) en vez de
+  acumular trabajo que el cliente ya abandonó.
+- verify_and_update: si el hash guardado usa menos rounds que BCRYPT_ROUNDS,
+  devuelve el hash nuevo para guardarlo (upgrade transparente del costo).
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from app.core.config import PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_WORKERS
+from app.core.metrics import REGISTRY
+from app.core.security import pwd_context
+
+PASSWORD_HASH_PENDING = REGISTRY.gauge(
+    "password_hash_pending", "Verificaciones bcrypt en curso o en cola", ()
+)
+PASSWORD_HASH_REJECTED = REGISTRY.counter(
+    "password_hash_rejected_total", "Verificaciones rechazadas por cola llena", ()
+)
+PASSWORD_HASH_SECONDS = REGISTRY.histogram(
+    "password_hash_seconds", "Tiempo de bcrypt (sin contar la cola)", ("op",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+PASSWORD_REHASHED = REGISTRY.counter(
+    "password_rehashed_total", "Hashes actualizados al costo actual en el login", ()
+)
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    async def _run(self, op: str, fn: Callable, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                PASSWORD_HASH_REJECTED.inc()
+                raise PasswordHasherBusy()
+            self._pending += 1
+            PASSWORD_HASH_PENDING.set(self._pending)
+
+        def _timed():
+            t0 = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                PASSWORD_HASH_SECONDS.observe(time.perf_counter() - t0, op=op)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, _timed)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                PASSWORD_HASH_PENDING.set(self._pending)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """(válida, hash nuevo o None)"""
+        ok, new_hash = await self._run("verify", pwd_context.verify_and_update, plain_password, hashed_password)
+        if new_hash:
+            PASSWORD_REHASHED.inc()
+        return ok, new_hash
+
+    async def hash(self, plain_password: str) -> str:
+        return await self._run("hash", pwd_context.hash, plain_password)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+PASSWORD_HASHER = PasswordHasher()
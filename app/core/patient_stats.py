@@ -0,0 +1,119 @@
+# app/core/patient_stats.py
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment
+from app.models.note import Note
+from app.models.patient import Patient
+from app.models.patient_stats import PatientStats
+
+
+STATS_COLUMNS = [
+    "patient_id",
+    "user_id",
+    "sessions_attended",
+    "no_shows",
+    "notes_count",
+    "last_visit",
+    "next_visit",
+    "updated_at",
+]
+
+
+def _stats_select(now: datetime):
+    """
+    SELECT que calcula las estadísticas de cada paciente.
+    Se usa tanto para el refresh incremental (WHERE patient_id IN ...)
+    como para el rebuild completo.
+    """
+    appt_base = [Appointment.patient_id == Patient.id, Appointment.is_active == True]
+
+    sessions_attended = (
+        select(func.count(Appointment.id))
+        .where(*appt_base, Appointment.status == "completed")
+        .scalar_subquery()
+    )
+    no_shows = (
+        select(func.count(Appointment.id))
+        .where(*appt_base, Appointment.status == "no_show")
+        .scalar_subquery()
+    )
+    last_visit = (
+        select(func.max(Appointment.start_time))
+        .where(*appt_base, Appointment.status == "completed")
+        .scalar_subquery()
+    )
+    next_visit = (
+        select(func.min(Appointment.start_time))
+        .where(*appt_base, Appointment.status == "scheduled", Appointment.start_time > now)
+        .scalar_subquery()
+    )
+    notes_count = (
+        select(func.count(Note.id))
+        .where(Note.patient_id == Patient.id, Note.is_active == True)
+        .scalar_subquery()
+    )
+
+    return select(
+        Patient.id,
+        Patient.user_id,
+        sessions_attended,
+        no_shows,
+        notes_count,
+        last_visit,
+        next_visit,
+        literal(now),
+    )
+
+
+def _upsert(db: Session, values_select) -> int:
+    stmt = insert(PatientStats).from_select(STATS_COLUMNS, values_select)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PatientStats.patient_id],
+        set_={col: stmt.excluded[col] for col in STATS_COLUMNS if col != "patient_id"},
+    )
+    return len(db.execute(stmt.returning(PatientStats.patient_id)).all())
+
+
+def refresh_patient_stats(db: Session, patient_ids: Iterable[Optional[int]]) -> None:
+    """
+    ✅ Recalcula las estadísticas SOLO de los pacientes indicados.
+    Se llama antes del commit de cada escritura para que quede en la misma transacción.
+    """
+    ids = {pid for pid in patient_ids if pid is not None}
+    if not ids:
+        return
+
+    # autoflush está apagado: mandamos los cambios pendientes antes de agregar
+    db.flush()
+    _upsert(db, _stats_select(datetime.utcnow()).where(Patient.id.in_(ids)))
+
+
+def rebuild_patient_stats(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    ✅ Rebuild completo (o de una agenda).
+    También corrige next_visit, que envejece con el tiempo aunque no haya escrituras.
+    """
+    values = _stats_select(datetime.utcnow())
+    if user_id is not None:
+        values = values.where(Patient.user_id == user_id)
+
+    count = _upsert(db, values)
+    db.commit()
+    return count
+
+
+if __name__ == "__main__":
+    # Job de rebuild: python -m app.core.patient_stats
+    import app.main  # noqa: F401  (registra todos los modelos)
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"patient_stats reconstruidas: {rebuild_patient_stats(session)}")
+    finally:
+        session.close()
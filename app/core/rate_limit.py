@@ -0,0 +1,97 @@
+# app/core/rate_limit.py
+"""
+Token bucket en memoria (por worker).
+
+Cada llave (IP, email, ...) tiene `capacity` tokens que se recargan a
+`refill_per_minute`; cada intento consume 1. Sin tokens => se rechaza con el
+tiempo de espera hasta el siguiente token (Retry-After).
+
+Las llaves viven en un OrderedDict LRU acotado a `max_keys`: un ataque con
+muchas IPs/emails distintos no hace crecer la memoria sin límite.
+
+La IP por cliente sale de client_ip(): detrás del proxy de Railway el socket
+siempre es el proxy (todos los clientes compartirían un bucket).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from starlette.requests import Request
+
+from app.core.config import (
+    LOGIN_RATE_EMAIL_BURST,
+    LOGIN_RATE_EMAIL_PER_MINUTE,
+    LOGIN_RATE_IP_BURST,
+    LOGIN_RATE_IP_PER_MINUTE,
+    TRUSTED_PROXY_HOPS,
+)
+from app.core.metrics import REGISTRY
+
+RATE_LIMITED = REGISTRY.counter(
+    "rate_limited_total", "Intentos rechazados por token bucket", ("limiter",)
+)
+
+
+class TokenBucketLimiter:
+    def __init__(self, name: str, capacity: int, refill_per_minute: int, max_keys: int = 10000):
+        self.name = name
+        self.capacity = float(capacity)
+        self.refill_per_second = refill_per_minute / 60.0
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str) -> float:
+        """
+        ✅ Consume 1 token. Devuelve 0 si se permite; si no, los segundos hasta
+        el próximo token.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.refill_per_second)
+
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.refill_per_second if self.refill_per_second else 60.0
+
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        if wait:
+            RATE_LIMITED.inc(limiter=self.name)
+        return wait
+
+
+def client_ip(request: Request, trusted_hops: int = TRUSTED_PROXY_HOPS) -> str:
+    """
+    IP del cliente para el rate limit.
+    Cada proxy agrega a X-Forwarded-For la IP de quien le habló: con N proxies de
+    confianza, la del cliente es la N-ésima desde la derecha. Lo que está más a la
+    izquierda lo manda el propio cliente (falsificable) y no se usa.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if trusted_hops <= 0:
+        return peer
+
+    hops = [
+        hop.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for hop in header.split(",")
+        if hop.strip()
+    ]
+    # menos saltos de los esperados => no pasó por el proxy: vale el socket
+    if len(hops) < trusted_hops:
+        return peer
+    return hops[-trusted_hops]
+
+
+# =========================
+# Login: se revisa ANTES de tocar la DB o bcrypt
+# =========================
+LOGIN_IP_LIMITER = TokenBucketLimiter("login_ip", LOGIN_RATE_IP_BURST, LOGIN_RATE_IP_PER_MINUTE)
+LOGIN_EMAIL_LIMITER = TokenBucketLimiter("login_email", LOGIN_RATE_EMAIL_BURST, LOGIN_RATE_EMAIL_PER_MINUTE)
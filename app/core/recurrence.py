@@ -0,0 +1,234 @@
+# app/core/recurrence.py
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.local_time import to_local_naive
+from app.models.appointment_series import AppointmentSeries, AppointmentSeriesException
+from app.models.patient import Patient
+
+
+# ✅ Frecuencias soportadas -> días entre ocurrencias
+FREQUENCY_DAYS = {
+    "weekly": 7,
+    "biweekly": 14,
+}
+
+# Límite defensivo (2 años de sesiones semanales)
+MAX_SERIES_OCCURRENCES = 104
+
+
+def iter_recurrence(
+    start: datetime,
+    frequency: str,
+    occurrences: Optional[int] = None,
+    until: Optional[date] = None,
+) -> Iterator[datetime]:
+    """
+    Genera los inicios de cada ocurrencia (misma hora, cada 7 o 14 días).
+    Termina por número de ocurrencias o por fecha límite (inclusive).
+    """
+    step = timedelta(days=FREQUENCY_DAYS[frequency])
+
+    current = start
+    count = 0
+    while True:
+        if occurrences is not None and count >= occurrences:
+            return
+        if until is not None and current.date() > until:
+            return
+        yield current
+        count += 1
+        current = current + step
+
+
+def expand_recurrence(
+    start: datetime,
+    frequency: str,
+    occurrences: Optional[int] = None,
+    until: Optional[date] = None,
+) -> list:
+    """
+    Igual que iter_recurrence pero validando la regla y el límite de ocurrencias.
+    """
+    if frequency not in FREQUENCY_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"frequency inválida. Usa: {', '.join(sorted(FREQUENCY_DAYS))}"
+        )
+
+    if occurrences is None and until is None:
+        raise HTTPException(status_code=400, detail="Debes enviar occurrences o until")
+
+    if until is not None and until < start.date():
+        raise HTTPException(status_code=400, detail="until debe ser >= la fecha de la primera cita")
+
+    starts = []
+    for occurrence_start in iter_recurrence(start, frequency, occurrences, until):
+        if len(starts) >= MAX_SERIES_OCCURRENCES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"La serie excede el máximo de {MAX_SERIES_OCCURRENCES} ocurrencias"
+            )
+        starts.append(occurrence_start)
+
+    return starts
+
+
+# =========================
+# Series "lazy": expansión al leer
+# =========================
+# id de una ocurrencia virtual: "s{series_id}:{inicio ISO}". Los endpoints de estado
+# (PUT /appointments/{id}/complete, etc.) lo aceptan y materializan la ocurrencia.
+_OCCURRENCE_KEY_RE = re.compile(r"^s(\d+):(.+)$")
+
+
+def occurrence_key(series_id: int, occurrence_start: datetime) -> str:
+    return f"s{series_id}:{occurrence_start.isoformat()}"
+
+
+def parse_occurrence_key(key: str) -> Optional[Tuple[int, datetime]]:
+    """(series_id, inicio naive local) o None si no es un id de ocurrencia."""
+    match = _OCCURRENCE_KEY_RE.match(key)
+    if not match:
+        return None
+    try:
+        occurrence_start = datetime.fromisoformat(match.group(2))
+    except ValueError:
+        return None
+    return int(match.group(1)), to_local_naive(occurrence_start)
+
+
+@dataclass
+class VirtualOccurrence:
+    """
+    Ocurrencia de una serie que NO existe como fila en appointments.
+    Expone los mismos atributos que Appointment para que los endpoints de lectura
+    la traten igual que una cita real (id = occurrence_key, estable entre lecturas).
+    """
+    series_id: int
+    patient_id: int
+    user_id: int
+    start_time: datetime
+    duration_minutes: int
+    notes: Optional[str] = None
+    patient_name: Optional[str] = None
+    patient_alias: Optional[str] = None
+    created_at: Optional[datetime] = None
+    created_by: Optional[int] = None
+    id: Optional[str] = None
+    status: str = "scheduled"
+    is_active: bool = True
+    updated_at: Optional[datetime] = None
+    updated_by: Optional[int] = None
+    is_virtual: bool = True
+
+    def __post_init__(self):
+        if self.id is None:
+            self.id = occurrence_key(self.series_id, self.start_time)
+
+
+def iter_series_window(
+    series: AppointmentSeries,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+) -> Iterator[datetime]:
+    """
+    Inicios de ocurrencia de la serie dentro de [window_start, window_end].
+    Salta directo a la primera ocurrencia de la ventana (no recorre desde el inicio).
+    La ventana puede venir aware (p.ej. start_time del request): se pasa a hora local naive,
+    igual que series.start_time.
+    """
+    window_start = to_local_naive(window_start)
+    window_end = to_local_naive(window_end)
+    step = timedelta(days=FREQUENCY_DAYS[series.frequency])
+
+    current = series.start_time
+    if window_start is not None and window_start > current:
+        steps_to_skip = -((current - window_start) // step)  # ceil
+        current = current + step * steps_to_skip
+
+    last = series.last_start_time
+    if window_end is not None and window_end < last:
+        last = window_end
+
+    while current <= last:
+        yield current
+        current = current + step
+
+
+def is_series_occurrence(series: AppointmentSeries, occurrence_start: datetime) -> bool:
+    occurrence_start = to_local_naive(occurrence_start)
+    if occurrence_start < series.start_time or occurrence_start > series.last_start_time:
+        return False
+    step = timedelta(days=FREQUENCY_DAYS[series.frequency])
+    return (occurrence_start - series.start_time) % step == timedelta(0)
+
+
+def iter_virtual_occurrences(
+    db: Session,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    patient_id: Optional[int] = None,
+) -> Iterator[VirtualOccurrence]:
+    """
+    ✅ Genera las ocurrencias NO materializadas de las series activas en la ventana.
+    - 1 query para las series que tocan la ventana (+ nombre del paciente)
+    - 1 query para sus excepciones dentro de la ventana
+    - user_id=None => todas las agendas (admin)
+    """
+    window_start = to_local_naive(window_start)
+    window_end = to_local_naive(window_end)
+
+    q = (
+        db.query(AppointmentSeries, Patient.full_name, Patient.alias)
+        .join(Patient, Patient.id == AppointmentSeries.patient_id)
+        .filter(AppointmentSeries.is_active == True, Patient.is_active == True)
+    )
+
+    if user_id is not None:
+        q = q.filter(AppointmentSeries.user_id == user_id)
+    if patient_id is not None:
+        q = q.filter(AppointmentSeries.patient_id == patient_id)
+    if window_end is not None:
+        q = q.filter(AppointmentSeries.start_time <= window_end)
+    if window_start is not None:
+        q = q.filter(AppointmentSeries.last_start_time >= window_start)
+
+    rows = q.all()
+    if not rows:
+        return
+
+    ex_q = db.query(
+        AppointmentSeriesException.series_id,
+        AppointmentSeriesException.occurrence_start
+    ).filter(AppointmentSeriesException.series_id.in_([s.id for s, _, _ in rows]))
+
+    if window_start is not None:
+        ex_q = ex_q.filter(AppointmentSeriesException.occurrence_start >= window_start)
+    if window_end is not None:
+        ex_q = ex_q.filter(AppointmentSeriesException.occurrence_start <= window_end)
+
+    skip = {(series_id, occ) for series_id, occ in ex_q.all()}
+
+    for series, full_name, alias in rows:
+        for occurrence_start in iter_series_window(series, window_start, window_end):
+            if (series.id, occurrence_start) in skip:
+                continue
+            yield VirtualOccurrence(
+                series_id=series.id,
+                patient_id=series.patient_id,
+                user_id=series.user_id,
+                start_time=occurrence_start,
+                duration_minutes=series.duration_minutes,
+                notes=series.notes,
+                patient_name=full_name,
+                patient_alias=alias,
+                created_at=series.created_at,
+                created_by=series.created_by,
+            )
@@ -0,0 +1,200 @@
+# app/core/revocation.py
+"""
+Revocación de tokens sin leer users en cada request.
+
+- revoked_tokens (DB) es la fuente de verdad; REVOCATION_LIST la refleja por worker:
+  un dict de jti y otro de user_id -> "revocado todo lo emitido hasta". Validar un
+  token = 2 lookups en memoria.
+- La lista se registra en el bus de invalidación (app/db/invalidation.py) como entidad
+  "revoked_tokens": cada revocación hace NOTIFY (o sube cache_versions para el polling)
+  y los workers marcan la lista como vieja. La siguiente request la relee de forma
+  incremental (id > último visto), así que solo hay query después de una revocación.
+- Desactivar un usuario o cambiarle rol / psicóloga asignada / contraseña revoca todos
+  sus tokens (también el refresh: vuelve a iniciar sesión) en el mismo flush (hook
+  before_flush).
+
+Ids saltados en una relectura (una transacción con id menor que aún no hizo commit)
+se vuelven a pedir en las relecturas siguientes durante REVOCATION_GAP_SECONDS.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Tuple
+
+from sqlalchemy import delete, event, inspect, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import REFRESH_TOKEN_EXPIRE_DAYS, REVOCATION_GAP_SECONDS
+from app.core.metrics import REGISTRY
+from app.db.invalidation import ALL_KEYS, INVALIDATION_BUS
+from app.models.revoked_token import RevokedToken
+from app.models.user import User
+
+REVOKED_TOKENS_ENTITY = "revoked_tokens"
+
+# cambios en users que invalidan los claims de sus tokens
+_REVOKING_USER_ATTRS = ("is_active", "role", "owner_user_id", "password")
+
+# relectura incremental: rangos de ids más grandes que esto no se siguen como huecos
+_MAX_GAP_RANGE = 1000
+
+TOKEN_REVOCATIONS = REGISTRY.counter(
+    "token_revocations_total", "Revocaciones escritas (jti = un token, user = todos los de un usuario)", ("kind",)
+)
+REVOCATION_LIST_REFRESHES = REGISTRY.counter(
+    "revocation_list_refreshes_total", "Relecturas incrementales de revoked_tokens", ()
+)
+REVOCATION_LIST_SIZE = REGISTRY.gauge(
+    "revocation_list_entries", "Revocaciones vigentes en memoria", ("kind",)
+)
+
+
+class RevocationList:
+    entity = REVOKED_TOKENS_ENTITY
+
+    def __init__(self):
+        self._jtis: Dict[str, float] = {}                     # jti -> expira (epoch)
+        self._users: Dict[int, Tuple[float, float]] = {}      # user_id -> (revocado hasta, expira)
+        self._gaps: Dict[int, float] = {}                     # id no visto -> cuándo se detectó
+        self._last_id = 0
+        self._generation = 0
+        self._loaded_generation = -1
+        self._lock = threading.Lock()
+
+    # ---------- lectura (por request) ----------
+    @property
+    def stale(self) -> bool:
+        return self._loaded_generation != self._generation
+
+    def is_revoked(self, jti: str, user_id: int, issued_at: float) -> bool:
+        """✅ O(1) y sin lock: lecturas de dict atómicas bajo el GIL."""
+        if jti in self._jtis:
+            return True
+        revoked = self._users.get(user_id)
+        return revoked is not None and issued_at <= revoked[0]
+
+    # ---------- bus de invalidación ----------
+    def evict(self, key=ALL_KEYS) -> None:
+        with self._lock:
+            self._generation += 1
+
+    # ---------- relectura incremental ----------
+    def refresh(self, db: Session) -> None:
+        with self._lock:
+            generation = self._generation
+            last_id = self._last_id
+            gaps = list(self._gaps)
+
+        cond = RevokedToken.id > last_id
+        if gaps:
+            cond = or_(cond, RevokedToken.id.in_(gaps))
+        rows = db.execute(
+            select(
+                RevokedToken.id,
+                RevokedToken.jti,
+                RevokedToken.user_id,
+                RevokedToken.revoked_at,
+                RevokedToken.expires_at,
+            )
+            .where(cond, RevokedToken.expires_at > datetime.now(timezone.utc))
+            .order_by(RevokedToken.id)
+        ).all()
+        REVOCATION_LIST_REFRESHES.inc()
+
+        now = time.time()
+        with self._lock:
+            seen = set()
+            for row in rows:
+                seen.add(row.id)
+                self._gaps.pop(row.id, None)
+                expires = row.expires_at.timestamp()
+                if row.jti is not None:
+                    self._jtis[row.jti] = expires
+                else:
+                    previous = self._users.get(row.user_id, (0.0, 0.0))
+                    self._users[row.user_id] = (
+                        max(previous[0], row.revoked_at.timestamp()),
+                        max(previous[1], expires),
+                    )
+
+            max_id = max(seen, default=last_id)
+            # la carga inicial (last_id 0) no deja huecos: lo que falta ya expiró
+            if last_id and max_id - last_id <= _MAX_GAP_RANGE:
+                for missing in range(last_id + 1, max_id):
+                    if missing not in seen:
+                        self._gaps.setdefault(missing, now)
+            self._last_id = max(self._last_id, max_id)
+
+            self._gaps = {i: t for i, t in self._gaps.items() if now - t < REVOCATION_GAP_SECONDS}
+            self._jtis = {j: exp for j, exp in self._jtis.items() if exp > now}
+            self._users = {u: v for u, v in self._users.items() if v[1] > now}
+            self._loaded_generation = max(self._loaded_generation, generation)
+
+        REVOCATION_LIST_SIZE.set(len(self._jtis), kind="jti")
+        REVOCATION_LIST_SIZE.set(len(self._users), kind="user")
+
+
+REVOCATION_LIST = INVALIDATION_BUS.register(RevocationList())
+
+
+# =========================
+# Escritura
+# =========================
+def revoke_token(db: Session, claims: dict) -> bool:
+    """
+    ✅ Revoca un token por su jti (logout, rotación del refresh token).
+    False si ya estaba revocado (p.ej. refresh token usado dos veces).
+    El caller hace commit.
+    """
+    now = datetime.now(timezone.utc)
+    # de paso, limpia lo que ya expiró (índice por expires_at)
+    db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+
+    stmt = (
+        insert(RevokedToken)
+        .values(
+            jti=claims["jti"],
+            user_id=claims["uid"],
+            revoked_at=now,
+            expires_at=datetime.fromtimestamp(claims["exp"], timezone.utc),
+        )
+        .on_conflict_do_nothing(index_elements=["jti"], index_where=RevokedToken.jti.isnot(None))
+        .returning(RevokedToken.id)
+    )
+    if db.execute(stmt).scalar() is None:
+        return False
+
+    INVALIDATION_BUS.invalidate(db, REVOKED_TOKENS_ENTITY)
+    TOKEN_REVOCATIONS.inc(kind="jti")
+    return True
+
+
+def _before_flush(session: Session, flush_context, instances) -> None:
+    for user in list(session.dirty) + list(session.deleted):
+        if not isinstance(user, User):
+            continue
+        state = inspect(user)
+        if user not in session.deleted and not any(
+            state.attrs[attr].history.has_changes() for attr in _REVOKING_USER_ATTRS
+        ):
+            continue
+
+        now = datetime.now(timezone.utc)
+        session.add(RevokedToken(
+            jti=None,
+            user_id=user.id,
+            revoked_at=now,
+            # ningún token del usuario vive más que un refresh token
+            expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        ))
+        TOKEN_REVOCATIONS.inc(kind="user")
+
+
+# el INSERT de arriba pasa por el flush => el bus publica la invalidación solo
+INVALIDATION_BUS.watch(RevokedToken, REVOKED_TOKENS_ENTITY)
+
+
+def install_token_revocation() -> None:
+    if not event.contains(Session, "before_flush", _before_flush):
+        event.listen(Session, "before_flush", _before_flush)
@@ -1,10 +1,13 @@
-from datetime import datetime, timedelta
+import time
+import uuid
+from datetime import timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.core.config import BCRYPT_ROUNDS, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
 from app.db.deps import get_db
 from app.models.user import User
 
@@ -14,13 +17,23 @@ from app.models.user import User
 import os
 SECRET_KEY = os.getenv("JWT_SECRET", "dev_only_change_me")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = 43200
+
+# claim "typ": un refresh token no sirve como access token (ni al revés)
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
 
 # ==============================
 # 🔑 ENCRIPTACIÓN
 # ==============================
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# ✅ min_rounds = BCRYPT_ROUNDS => hashes con menos rounds cuentan como "deprecated":
+# verify_and_update devuelve el hash nuevo y el login lo guarda (upgrade transparente)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
 
 # ==============================
 # 🔒 OAUTH2 ESQUEMA
@@ -47,17 +60,60 @@ def verify_password(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
 
 # ==============================
-# 🎫 CREATE ACCESS TOKEN
+# 🎫 CREATE TOKENS
 # ==============================
 
+def _encode_token(claims: dict, token_type: str, lifetime: timedelta) -> str:
+    """
+    ✅ Todo token lleva jti (para revocarlo) e iat con milisegundos: la revocación de
+    todos los tokens de un usuario compara iat contra el momento de la revocación.
+    """
+    now = time.time()
+    to_encode = dict(
+        claims,
+        typ=token_type,
+        jti=uuid.uuid4().hex,
+        iat=round(now, 3),
+        exp=int(now + lifetime.total_seconds()),
+    )
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
 def create_access_token(data: dict):
-    to_encode = data.copy()
+    return _encode_token(data, ACCESS_TOKEN_TYPE, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+
+
+def create_refresh_token(user: User):
+    return _encode_token(
+        {"sub": user.email, "uid": user.id},
+        REFRESH_TOKEN_TYPE,
+        timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
+
+def user_claims(user: User) -> dict:
+    """
+    Lo que necesitan los endpoints del usuario (ver Principal en app/core/auth.py):
+    con esto el access token se valida sin leer la tabla users.
+    """
+    return {"sub": user.email, "uid": user.id, "role": user.role, "owner": user.owner_user_id}
 
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
 
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+def create_token_pair(user: User) -> dict:
+    return {
+        "access_token": create_access_token(user_claims(user)),
+        "refresh_token": create_refresh_token(user),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+def decode_token(token: str, token_type: str) -> dict:
+    """Claims de un token emitido por _encode_token del tipo pedido; JWTError si no (o si expiró)."""
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    if payload.get("typ") != token_type or "jti" not in payload or "uid" not in payload:
+        raise JWTError("Tipo de token inválido")
+    return payload
 
 # ==============================
 # 👤 GET CURRENT USER
@@ -67,28 +123,9 @@ def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ):
-    credentials_exception = HTTPException(
-        status_code=401,
-        detail="No autorizado",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-
-        if email is None:
-            raise credentials_exception
-
-    except JWTError:
-        raise credentials_exception
-
-    user = db.query(User).filter(User.email == email).first()
-
-    if user is None:
-        raise credentials_exception
-
-    return user
+    # ✅ misma verificación que app/core/auth.py (claims + lista de revocación)
+    from app.core.auth import authenticate_token
+    return authenticate_token(db, token)
 
 # ✅ Alias para compatibilidad con imports típicos
 def get_password_hash(password: str):
@@ -0,0 +1,30 @@
+# app/core/threadpool.py
+from anyio import to_thread
+
+from app.core.config import THREADPOOL_SIZE
+from app.core.metrics import REGISTRY
+
+THREADPOOL_TOTAL = REGISTRY.gauge("threadpool_size", "Threads del pool de anyio (endpoints/dependencias sync)")
+THREADPOOL_IN_USE = REGISTRY.gauge("threadpool_in_use", "Threads ocupados ahora")
+THREADPOOL_QUEUED = REGISTRY.gauge("threadpool_queued", "Tareas sync esperando un thread libre")
+
+
+def configure_threadpool() -> None:
+    """
+    Ajusta el límite del threadpool de anyio (default 40) desde THREADPOOL_SIZE.
+    Debe llamarse dentro del event loop (lifespan).
+    """
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+
+def collect_threadpool_metrics() -> None:
+    """
+    Collector del scrape: el limiter es por event loop, así que se lee desde un endpoint async.
+    """
+    limiter = to_thread.current_default_thread_limiter()
+    THREADPOOL_TOTAL.set(limiter.total_tokens)
+    THREADPOOL_IN_USE.set(limiter.borrowed_tokens)
+    THREADPOOL_QUEUED.set(limiter.statistics().tasks_waiting)
+
+
+REGISTRY.add_collector(collect_threadpool_metrics)
@@ -0,0 +1,41 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT
+from app.db.pool_metrics import instrumented_pool_class, instrument_engine
+from app.db.instrumentation import instrument_queries
+from app.db.session import DATABASE_URL
+
+
+def _to_async_url(url: str) -> str:
+    """
+    psycopg 3 sirve tanto sync como async con el mismo dialecto:
+    cualquier URL de Postgres se normaliza a postgresql+psycopg://
+    """
+    for prefix in ("postgresql+psycopg2://", "postgresql+psycopg://", "postgresql://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg://" + url[len(prefix):]
+    return url
+
+
+ASYNC_DATABASE_URL = _to_async_url(DATABASE_URL)
+
+# ✅ Engine async: las consultas esperan en el event loop, no en un thread del pool de Starlette
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, "async"),
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT
+)
+instrument_engine(async_engine.sync_engine, "async")
+instrument_queries(async_engine.sync_engine)
+
+# expire_on_commit=False: los objetos siguen legibles después del commit sin I/O implícito
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
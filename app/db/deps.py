@@ -1,4 +1,5 @@
 from app.db.session import SessionLocal
+from app.db.async_session import AsyncSessionLocal
 
 
 # 🔹 Dependency que abre y cierra la conexión a la DB
@@ -8,3 +9,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# 🔹 Igual que get_db pero con AsyncSession (para endpoints async def)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,150 @@
+"""
+Instrumentación de SQL por request (conteo, tiempo total, detección de N+1).
+
+- Listeners before/after_cursor_execute en los engines (sync y async).
+- Las estadísticas del request viven en un ContextVar: anyio copia el contexto al
+  threadpool y run_sync corre en el mismo contexto, así que endpoints sync y async suman
+  al mismo objeto.
+- DbQueryHeadersMiddleware agrega Server-Timing y X-DB-Queries a la respuesta y
+  avisa en el log cuando la misma sentencia se repite (patrón N+1).
+- assert_max_queries(n): helper para pytest que fija un presupuesto de queries.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import DB_INSTRUMENTATION_ENABLED, DB_REPEATED_STATEMENT_THRESHOLD
+from app.db.slow_queries import SLOW_QUERY_LOG
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    __slots__ = ("count", "total_seconds", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int = DB_REPEATED_STATEMENT_THRESHOLD) -> List[tuple]:
+        """Sentencias idénticas ejecutadas >= threshold veces (candidatas a N+1)."""
+        return [(stmt, n) for stmt, n in self.statements.most_common() if n >= threshold]
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("db_request_stats", default=None)
+
+# Colectores globales activos (assert_max_queries): ven TODAS las sentencias del proceso
+_global_collectors: List[QueryStats] = []
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _request_stats.get()
+
+
+def instrument_queries(engine: Engine) -> None:
+    """
+    Se llama al crear cada engine (para el async: async_engine.sync_engine).
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start_time")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+        for collector in _global_collectors:
+            collector.record(statement, elapsed)
+
+        SLOW_QUERY_LOG.record(conn, statement, parameters, executemany, elapsed)
+
+
+# =========================
+# Middleware (headers + aviso N+1)
+# =========================
+class DbQueryHeadersMiddleware:
+    """
+    Middleware ASGI puro. Los headers salen con lo ejecutado hasta http.response.start,
+    que en los endpoints de esta API es todo (el teardown de get_db solo cierra la sesión).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not DB_INSTRUMENTATION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                dur_ms = stats.total_seconds * 1000
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={dur_ms:.1f};desc="{stats.count} queries"'.encode()
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            for statement, n in stats.repeated():
+                logger.warning(
+                    "Posible N+1 en %s %s: %dx la misma sentencia: %s",
+                    scope["method"], scope["path"], n, " ".join(statement.split())[:300],
+                )
+
+
+# =========================
+# Helper para pytest
+# =========================
+@contextmanager
+def assert_max_queries(n: int):
+    """
+    Falla si dentro del bloque se ejecutan más de n sentencias SQL.
+
+        with assert_max_queries(4):
+            client.get("/calendar/day-slots?date_str=2026-03-02")
+
+    Cuenta a nivel proceso (no por ContextVar): TestClient corre la app en otro thread
+    y el contexto del test no llega al request. Usar con un request a la vez.
+    """
+    stats = QueryStats()
+    _global_collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        _global_collectors.remove(stats)
+
+    if stats.count > n:
+        detail = "\n".join(
+            f"  {count}x {' '.join(stmt.split())[:200]}"
+            for stmt, count in stats.statements.most_common()
+        )
+        raise AssertionError(f"Se esperaban <= {n} queries, se ejecutaron {stats.count}:\n{detail}")
@@ -0,0 +1,257 @@
+"""
+Bus de invalidación de caches en proceso entre workers / réplicas.
+
+- LocalCache: dict con TTL por entidad ("clinic_settings", "agenda_owner", ...).
+  get_or_load no guarda un valor cargado si hubo un desalojo mientras se cargaba
+  (evita re-cachear datos viejos leídos justo antes del commit de otro worker).
+- InvalidationBus.watch(Model, entity, key_fn): cualquier flush que toque el modelo
+  marca (entity, key). Para escrituras que no pasan por el flush: bus.invalidate(db, ...).
+- Publicación: en el MISMO flush se incrementa cache_versions y se hace pg_notify
+  con (entity, key, version). NOTIFY es transaccional => los demás workers lo reciben
+  solo después del commit. El worker que escribe desaloja en after_commit.
+- Recepción: handle_notify (thread LISTEN, app/db/notify.py) desaloja las llaves.
+- Fallback: si el LISTEN no está conectado (o está deshabilitado), un thread compara
+  cache_versions cada INVALIDATION_POLL_SECONDS y desaloja lo que cambió.
+  Al (re)conectar el LISTEN también se hace un poll para recuperar lo perdido.
+
+key "*" = todas las llaves de la entidad.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from itertools import chain
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import CACHE_TTL_SECONDS, INVALIDATION_POLL_SECONDS
+from app.core.metrics import REGISTRY
+from app.db.notify import notify
+from app.models.cache_version import CacheVersion
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache_invalidation"
+ALL_KEYS = "*"
+
+_PENDING_KEY = "cache_invalidation_pending"
+_PUBLISHED_KEY = "cache_invalidation_published"
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "Lecturas de caches en proceso", ("cache", "result")
+)
+CACHE_EVICTIONS = REGISTRY.counter(
+    "cache_evictions_total", "Desalojos por invalidación", ("cache", "source")
+)
+
+_MISSING = object()
+
+
+# =========================
+# Cache local
+# =========================
+class LocalCache:
+    def __init__(self, entity: str, ttl_seconds: int = CACHE_TTL_SECONDS):
+        self.entity = entity
+        self.ttl_seconds = ttl_seconds
+        self._data: Dict[str, Tuple[Any, float]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        key = str(key)
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] > time.monotonic():
+                CACHE_REQUESTS.inc(cache=self.entity, result="hit")
+                return item[0]
+            self._data.pop(key, None)
+        CACHE_REQUESTS.inc(cache=self.entity, result="miss")
+        return default
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            generation = self._generation
+        value = loader()
+        with self._lock:
+            # si hubo desalojo durante la carga, lo leído puede ser anterior al cambio
+            if generation == self._generation:
+                self._data[str(key)] = (value, time.monotonic() + self.ttl_seconds)
+        return value
+
+    def evict(self, key: Hashable = ALL_KEYS) -> None:
+        with self._lock:
+            self._generation += 1
+            if key == ALL_KEYS:
+                self._data.clear()
+            else:
+                self._data.pop(str(key), None)
+
+
+# =========================
+# Bus
+# =========================
+class InvalidationBus:
+    def __init__(self):
+        self._caches: Dict[str, List[LocalCache]] = {}
+        self._watches: List[Tuple[type, str, Callable[[Any], Optional[Hashable]]]] = []
+        self._seen: Dict[Tuple[str, str], int] = {}
+        self._seen_lock = threading.Lock()
+
+    def register(self, cache: LocalCache) -> LocalCache:
+        self._caches.setdefault(cache.entity, []).append(cache)
+        return cache
+
+    def watch(self, model: type, entity: str, key_fn: Callable[[Any], Optional[Hashable]] = lambda obj: ALL_KEYS) -> None:
+        """Flush que toque `model` => invalida (entity, key_fn(obj)); key_fn None => no invalida."""
+        self._watches.append((model, entity, key_fn))
+
+    # ---------- publicación (dentro de la transacción) ----------
+    def invalidate(self, db: Session, entity: str, key: Hashable = ALL_KEYS) -> None:
+        """✅ Invalidación explícita (UPDATE/INSERT en lote que no pasan por el flush)."""
+        db.info.setdefault(_PENDING_KEY, set()).add((entity, str(key)))
+        self._publish(db)
+
+    def _publish(self, db: Session) -> None:
+        pending = db.info.get(_PENDING_KEY, set())
+        published = db.info.setdefault(_PUBLISHED_KEY, set())
+        todo = sorted(pending - published)
+        if not todo:
+            return
+
+        table = CacheVersion.__table__
+        now = datetime.utcnow()
+        stmt = insert(table).values([{"entity": e, "key": k, "version": 1, "updated_at": now} for e, k in todo])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.entity, table.c.key],
+            set_={"version": table.c.version + 1, "updated_at": stmt.excluded.updated_at},
+        ).returning(table.c.entity, table.c.key, table.c.version)
+
+        # Core sobre la conexión: válido dentro de los hooks de flush
+        rows = db.connection().execute(stmt).all()
+        payload = orjson.dumps([[e, k, v] for e, k, v in rows]).decode()
+        notify(db.connection(), INVALIDATION_CHANNEL, payload)
+        published.update(todo)
+
+    def _after_flush(self, session: Session, flush_context) -> None:
+        marks = set()
+        # after_flush: new/dirty/deleted y el historial siguen siendo los previos al flush
+        for obj in chain(session.new, session.dirty, session.deleted):
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            for model, entity, key_fn in self._watches:
+                if isinstance(obj, model):
+                    key = key_fn(obj)
+                    if key is not None:
+                        marks.add((entity, str(key)))
+        if marks:
+            session.info.setdefault(_PENDING_KEY, set()).update(marks)
+            self._publish(session)
+
+    def _after_commit(self, session: Session) -> None:
+        # este worker: desalojo inmediato (no espera su propio NOTIFY)
+        for entity, key in session.info.pop(_PENDING_KEY, ()):
+            self.evict(entity, key, source="local")
+        session.info.pop(_PUBLISHED_KEY, None)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(_PENDING_KEY, None)
+        session.info.pop(_PUBLISHED_KEY, None)
+
+    def install(self) -> None:
+        if not event.contains(Session, "after_flush", self._after_flush):
+            event.listen(Session, "after_flush", self._after_flush)
+            event.listen(Session, "after_commit", self._after_commit)
+            event.listen(Session, "after_rollback", self._after_rollback)
+
+    # ---------- recepción ----------
+    def evict(self, entity: str, key: str, source: str) -> None:
+        for cache in self._caches.get(entity, ()):
+            cache.evict(key)
+            CACHE_EVICTIONS.inc(cache=entity, source=source)
+
+    def handle_notify(self, payload: str) -> None:
+        """Handler del PgListener (canal INVALIDATION_CHANNEL)."""
+        for entity, key, version in orjson.loads(payload):
+            with self._seen_lock:
+                self._seen[(entity, key)] = max(version, self._seen.get((entity, key), 0))
+            self.evict(entity, key, source="notify")
+
+    def poll_versions(self, db: Session) -> int:
+        """
+        Fallback sin LISTEN: compara cache_versions con lo último visto y desaloja
+        lo que cambió. La tabla es chica (1 fila por entidad/llave cacheable).
+        """
+        rows = db.execute(select(CacheVersion.entity, CacheVersion.key, CacheVersion.version)).all()
+        db.rollback()
+
+        changed = []
+        with self._seen_lock:
+            for entity, key, version in rows:
+                if self._seen.get((entity, key)) != version:
+                    self._seen[(entity, key)] = version
+                    changed.append((entity, key))
+        for entity, key in changed:
+            self.evict(entity, key, source="poll")
+        return len(changed)
+
+
+INVALIDATION_BUS = InvalidationBus()
+
+
+# =========================
+# Fallback: polling de versiones
+# =========================
+class InvalidationPoller:
+    """
+    Thread por proceso. Solo consulta cuando el LISTEN no está activo
+    (listener None = LISTEN deshabilitado => siempre por polling).
+    """
+
+    def __init__(self, session_factory, bus: InvalidationBus = INVALIDATION_BUS, listener=None,
+                 interval_seconds: int = INVALIDATION_POLL_SECONDS):
+        self.session_factory = session_factory
+        self.bus = bus
+        self.listener = listener
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def poll_once(self) -> int:
+        db = self.session_factory()
+        try:
+            return self.bus.poll_versions(db)
+        except Exception:
+            logger.exception("Error en polling de cache_versions")
+            return 0
+        finally:
+            db.close()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            if self.listener is not None and self.listener.connected.is_set():
+                continue
+            self.poll_once()
+
+    def start(self) -> None:
+        if self._thread:
+            return
+        # línea base: lo que ya está en la tabla no cuenta como cambio
+        self.poll_once()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="invalidation-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
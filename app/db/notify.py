@@ -0,0 +1,135 @@
+"""
+Postgres LISTEN/NOTIFY entre procesos (workers de uvicorn).
+
+- notify(db, channel, payload): pg_notify DENTRO de la transacción del request.
+  Postgres solo entrega la notificación si la transacción hace commit (y en orden
+  de commit): el "después del commit" lo garantiza la base, sin hooks.
+- PgListener: thread por proceso con una conexión psycopg dedicada (autocommit,
+  fuera del pool) que hace LISTEN y llama al handler de cada canal.
+  Se reconecta con backoff si la conexión se cae; arranca/para con el lifespan.
+
+Cada worker recibe también sus propias notificaciones: hay un único camino
+de entrega (NOTIFY -> LISTEN -> handler) para eventos locales y de otros workers.
+"""
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+import psycopg
+from psycopg import sql
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Límite de Postgres para el payload de NOTIFY (8000 bytes por defecto)
+MAX_PAYLOAD_BYTES = 7900
+
+PG_NOTIFY_RECEIVED = REGISTRY.counter(
+    "pg_notify_received_total", "Notificaciones recibidas por LISTEN", ("channel",)
+)
+PG_LISTENER_RECONNECTS = REGISTRY.counter(
+    "pg_listener_reconnects_total", "Reconexiones del thread LISTEN", ()
+)
+PG_LISTENER_CONNECTED = REGISTRY.gauge(
+    "pg_listener_connected", "1 si la conexión LISTEN está activa", ()
+)
+
+
+def notify(db: Session, channel: str, payload: str) -> None:
+    """
+    ✅ NOTIFY transaccional: se entrega al hacer commit de `db`; con rollback se descarta.
+    """
+    if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+        raise ValueError(f"Payload de NOTIFY demasiado grande para el canal {channel}")
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+
+
+def libpq_conninfo(database_url: str) -> str:
+    """URL de SQLAlchemy (postgresql+psycopg://...) -> conninfo de libpq para psycopg.connect."""
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class PgListener:
+    def __init__(
+        self,
+        database_url: str,
+        handlers: Optional[Dict[str, Callable[[str], None]]] = None,
+        poll_seconds: float = 1.0,
+        max_backoff_seconds: float = 30.0,
+    ):
+        self.conninfo = libpq_conninfo(database_url)
+        self.handlers: Dict[str, Callable[[str], None]] = dict(handlers or {})
+        self.connect_hooks: List[Callable[[], None]] = []
+        self.poll_seconds = poll_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.connected = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_handler(self, channel: str, handler: Callable[[str], None]) -> None:
+        """Registrar antes de start() (el LISTEN se hace al conectar)."""
+        self.handlers[channel] = handler
+
+    def add_connect_hook(self, hook: Callable[[], None]) -> None:
+        """
+        Se llama cada vez que el LISTEN queda activo (arranque y reconexiones):
+        las notificaciones emitidas mientras no había conexión se pierden, así que
+        quien dependa de ellas se pone al día aquí.
+        """
+        self.connect_hooks.append(hook)
+
+    def _listen_once(self) -> None:
+        with psycopg.connect(self.conninfo, autocommit=True) as conn:
+            for channel in self.handlers:
+                conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+            self.connected.set()
+            PG_LISTENER_CONNECTED.set(1)
+            logger.info("LISTEN activo en %s", ", ".join(self.handlers))
+
+            for hook in self.connect_hooks:
+                try:
+                    hook()
+                except Exception:
+                    logger.exception("Error en hook de conexión LISTEN")
+
+            while not self._stop.is_set():
+                # notifies(timeout=...) termina tras poll_seconds sin mensajes => revisa _stop
+                for note in conn.notifies(timeout=self.poll_seconds):
+                    PG_NOTIFY_RECEIVED.inc(channel=note.channel)
+                    try:
+                        self.handlers[note.channel](note.payload)
+                    except Exception:
+                        logger.exception("Error en handler de NOTIFY (%s)", note.channel)
+
+    def _loop(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                self._listen_once()
+                backoff = 1.0
+            except Exception:
+                logger.exception("Conexión LISTEN caída; reintentando en %.0fs", backoff)
+                PG_LISTENER_RECONNECTS.inc()
+            finally:
+                self.connected.clear()
+                PG_LISTENER_CONNECTED.set(0)
+            if self._stop.wait(backoff):
+                break
+            backoff = min(backoff * 2, self.max_backoff_seconds)
+
+    def start(self) -> None:
+        if self._thread or not self.handlers:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="pg-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_seconds + 5)
+            self._thread = None
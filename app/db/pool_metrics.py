@@ -0,0 +1,91 @@
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import REGISTRY
+
+# Buckets de espera de checkout: la mayoría debe ser < 1ms; lo interesante es la cola larga
+CHECKOUT_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+POOL_CHECKOUTS = REGISTRY.counter(
+    "db_pool_checkouts_total", "Conexiones entregadas por el pool", ("pool",)
+)
+POOL_CONNECTIONS_CREATED = REGISTRY.counter(
+    "db_pool_connections_created_total", "Conexiones nuevas abiertas contra Postgres", ("pool",)
+)
+POOL_INVALIDATIONS = REGISTRY.counter(
+    "db_pool_invalidations_total", "Conexiones invalidadas (errores / pre-ping fallido)", ("pool",)
+)
+POOL_CHECKOUT_TIMEOUTS = REGISTRY.counter(
+    "db_pool_checkout_timeouts_total", "Checkouts que agotaron pool_timeout", ("pool",)
+)
+POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Tiempo para obtener una conexión del pool (incluye abrirla si hubo overflow)",
+    ("pool",),
+    buckets=CHECKOUT_WAIT_BUCKETS,
+)
+POOL_SIZE = REGISTRY.gauge("db_pool_size", "pool_size configurado", ("pool",))
+POOL_MAX_OVERFLOW = REGISTRY.gauge("db_pool_max_overflow", "max_overflow configurado", ("pool",))
+POOL_CHECKED_OUT = REGISTRY.gauge("db_pool_checked_out", "Conexiones en uso ahora", ("pool",))
+POOL_CHECKED_IN = REGISTRY.gauge("db_pool_checked_in", "Conexiones libres en el pool ahora", ("pool",))
+POOL_OVERFLOW_IN_USE = REGISTRY.gauge("db_pool_overflow_in_use", "Conexiones de overflow abiertas ahora", ("pool",))
+
+
+def instrumented_pool_class(base, name: str):
+    """
+    Subclase del pool que mide la espera de checkout y cuenta los timeouts.
+    (Los eventos de pool de SQLAlchemy no exponen ninguno de los dos.)
+    Se mide en connect(): es la única entrada pública del checkout
+    (QueuePool._do_get es recursivo y no sirve para cronometrar).
+    """
+
+    class InstrumentedPool(base):
+        metrics_name = name
+
+        def connect(self):
+            t0 = time.perf_counter()
+            try:
+                return super().connect()
+            except exc.TimeoutError:
+                POOL_CHECKOUT_TIMEOUTS.inc(pool=self.metrics_name)
+                raise
+            finally:
+                POOL_CHECKOUT_WAIT.observe(time.perf_counter() - t0, pool=self.metrics_name)
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    InstrumentedPool.__qualname__ = InstrumentedPool.__name__
+    return InstrumentedPool
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Eventos de pool (checkout / connect / invalidate) + gauges del estado actual al scrape.
+    Para engines async se pasa async_engine.sync_engine.
+    """
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        POOL_CHECKOUTS.inc(pool=name)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        POOL_CONNECTIONS_CREATED.inc(pool=name)
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        POOL_INVALIDATIONS.inc(pool=name)
+
+    def _collect():
+        # engine.pool se lee en cada scrape: dispose() crea un pool nuevo
+        pool = engine.pool
+        size = pool.size()
+        POOL_SIZE.set(size, pool=name)
+        POOL_MAX_OVERFLOW.set(getattr(pool, "_max_overflow", 0), pool=name)
+        POOL_CHECKED_OUT.set(pool.checkedout(), pool=name)
+        POOL_CHECKED_IN.set(pool.checkedin(), pool=name)
+        # QueuePool.overflow() arranca en -pool_size; solo cuenta lo que excede pool_size
+        POOL_OVERFLOW_IN_USE.set(max(0, pool.overflow()), pool=name)
+
+    REGISTRY.add_collector(_collect)
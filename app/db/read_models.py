@@ -0,0 +1,152 @@
+"""
+Read models: proyecciones de columnas por endpoint de lectura.
+
+En vez de hidratar entidades ORM completas (identity map, estado de instrumentación,
+proxies de relaciones) para leer 4-6 columnas, los endpoints de lectura consultan
+db.query(*COLUMNAS) y reciben Row de SQLAlchemy: tuplas con acceso por nombre
+(row.start_time), sin sesión ni lazy loads.
+
+Cada proyección etiqueta sus columnas con los nombres de los campos del schema de
+respuesta, así las filas se validan directo con from_attributes (ver app/core/fast_json).
+Las ocurrencias virtuales de series (VirtualOccurrence) exponen los mismos atributos,
+así que se mezclan con las filas sin conversión.
+"""
+from sqlalchemy.orm import Bundle
+
+from app.models.appointment import Appointment
+from app.models.appointment_block import AppointmentBlock
+from app.models.note import Note
+from app.models.patient import Patient
+from app.models.patient_stats import PatientStats
+from app.schemas.patient import PatientResponse
+
+
+class OptionalBundle(Bundle):
+    """
+    Bundle (sub-Row anidado, p.ej. row.stats) que vale None cuando su primera columna
+    viene NULL: el caso de un OUTER JOIN sin fila, igual que una relación ORM vacía.
+    """
+
+    def create_row_processor(self, query, procs, labels):
+        make_row = super().create_row_processor(query, procs, labels)
+        key_proc = procs[0]
+
+        def proc(row):
+            if key_proc(row) is None:
+                return None
+            return make_row(row)
+
+        return proc
+
+
+# =========================
+# Citas
+# =========================
+# GET /appointments/ -> AppointmentResponse
+# series_id / is_virtual toman su default (solo las ocurrencias virtuales los traen).
+APPOINTMENT_LIST_COLUMNS = (
+    Appointment.id,
+    Appointment.patient_id,
+    Appointment.user_id,
+    Appointment.start_time,
+    Appointment.duration_minutes,
+    Appointment.status,
+    Appointment.notes,
+    Patient.full_name.label("patient_name"),
+    Appointment.is_active,
+    Appointment.created_at,
+    Appointment.updated_at,
+    Appointment.created_by,
+    Appointment.updated_by,
+)
+
+# GET /dashboard/upcoming -> UpcomingAppointmentItem
+UPCOMING_APPOINTMENT_COLUMNS = (
+    Appointment.id,
+    Appointment.patient_id,
+    Appointment.user_id,
+    Patient.full_name.label("patient_name"),
+    Appointment.start_time,
+    Appointment.duration_minutes,
+    Appointment.status,
+)
+
+# GET /calendar/events: solo se cuenta por día y estado
+CALENDAR_APPOINTMENT_COLUMNS = (
+    Appointment.start_time,
+    Appointment.status,
+)
+
+
+# =========================
+# Bloqueos
+# =========================
+# GET /appointments/blocks/ -> AppointmentBlockResponse
+BLOCK_LIST_COLUMNS = (
+    AppointmentBlock.id,
+    AppointmentBlock.user_id,
+    AppointmentBlock.start_time,
+    AppointmentBlock.end_time,
+    AppointmentBlock.reason,
+    AppointmentBlock.is_active,
+    AppointmentBlock.created_at,
+    AppointmentBlock.updated_at,
+    AppointmentBlock.created_by,
+    AppointmentBlock.updated_by,
+)
+
+# GET /calendar/events: días bloqueados completos
+CALENDAR_BLOCK_COLUMNS = (
+    AppointmentBlock.start_time,
+    AppointmentBlock.end_time,
+)
+
+
+# =========================
+# Notas
+# =========================
+# GET /notes/, /notes/by-patient/{id} -> NoteResponse
+NOTE_LIST_COLUMNS = (
+    Note.id,
+    Note.patient_id,
+    Note.appointment_id,
+    Note.user_id,
+    Note.note_type,
+    Note.subjective,
+    Note.objective,
+    Note.assessment,
+    Note.plan,
+    Note.content,
+    Note.is_active,
+    Note.created_at,
+    Note.updated_at,
+)
+
+# GET /clinical/patient/{id}/timeline (dict por nota, mismo orden de llaves que antes)
+CLINICAL_TIMELINE_COLUMNS = (
+    Note.id,
+    Note.created_at,
+    Note.note_type,
+    Note.appointment_id,
+    Note.subjective,
+    Note.objective,
+    Note.assessment,
+    Note.plan,
+    Note.content,
+)
+
+
+# =========================
+# Pacientes
+# =========================
+# GET /patients/ -> PatientResponse (stats anidadas, None si no hay fila en patient_stats)
+PATIENT_LIST_COLUMNS = tuple(getattr(Patient, name) for name in PatientResponse.model_fields if name != "stats")
+PATIENT_STATS_BUNDLE = OptionalBundle(
+    "stats",
+    PatientStats.patient_id,
+    PatientStats.sessions_attended,
+    PatientStats.no_shows,
+    PatientStats.notes_count,
+    PatientStats.last_visit,
+    PatientStats.next_visit,
+)
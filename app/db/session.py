@@ -2,6 +2,14 @@ import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT
+from app.db.pool_metrics import instrumented_pool_class, instrument_engine
+from app.db.instrumentation import instrument_queries
+from app.core.agenda_version import install_agenda_versioning
+from app.core.caches import install_cache_invalidation
+from app.core.revocation import install_token_revocation
 
 load_dotenv()
 # 1. Obtener la URL de Railway
@@ -19,9 +27,13 @@ if DATABASE_URL.startswith("postgres://"):
 engine = create_engine(
     DATABASE_URL, 
     pool_pre_ping=True,  # Vital para no perder la conexión
-    pool_size=10,
-    max_overflow=20
+    poolclass=instrumented_pool_class(QueuePool, "sync"),
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT
 )
+instrument_engine(engine, "sync")
+instrument_queries(engine)
 
 # 4. Configurar la Sesión
 SessionLocal = sessionmaker(
@@ -30,6 +42,13 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# ✅ agenda_versions se incrementa en el mismo flush que la escritura (ETags de agenda)
+install_agenda_versioning()
+# ✅ cambios en settings / psicólogas activas invalidan las caches de todos los workers
+install_cache_invalidation()
+# ✅ desactivar / cambiar rol, psicóloga o contraseña revoca los tokens del usuario
+install_token_revocation()
+
 # Función para tus rutas de FastAPI
 def get_db():
     db = SessionLocal()
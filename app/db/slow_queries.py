@@ -0,0 +1,228 @@
+"""
+Registro de sentencias SQL por fingerprint (literales y parámetros fuera).
+
+- Por fingerprint: count, total, max y p50/p95 sobre las últimas N duraciones.
+- Top-K acotado: al llenarse se descarta el fingerprint con menor tiempo total.
+- EXPLAIN (ANALYZE, BUFFERS) opcional y muestreado, solo para SELECT lentos,
+  dentro de un SAVEPOINT en la misma conexión (si falla, la transacción del request sigue sana).
+  ANALYZE re-ejecuta la sentencia: los SELECT con efectos (pg_notify, advisory locks,
+  FOR UPDATE / FOR SHARE, nextval) se explican sin ANALYZE (plan estimado, no corre).
+
+El tiempo lo mide app/db/instrumentation.py y llama a SLOW_QUERY_LOG.record().
+"""
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.config import (
+    SLOW_QUERY_EXPLAIN_ENABLED,
+    SLOW_QUERY_EXPLAIN_MS,
+    SLOW_QUERY_EXPLAIN_SAMPLE,
+    SLOW_QUERY_RECORD_MS,
+    SLOW_QUERY_TOP_K,
+)
+
+# Duraciones guardadas por fingerprint para p50/p95
+DURATION_WINDOW = 512
+
+# Mínimo entre dos EXPLAIN del mismo fingerprint
+EXPLAIN_MIN_INTERVAL_SECONDS = 600
+
+_FINGERPRINT_CACHE_MAX = 5000
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_PARAM = re.compile(r"%\([^)]+\)s|%s|\$\d+")
+_RE_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_RE_SPACES = re.compile(r"\s+")
+
+# SELECT que escriben, notifican o toman locks: EXPLAIN sin ANALYZE
+_RE_SIDE_EFFECTS = re.compile(
+    r"\bpg_notify\b|\bpg_(?:try_)?advisory_(?:xact_)?lock(?:_shared)?\b|\bnextval\b|\bsetval\b"
+    r"|\bFOR\s+(?:NO\s+KEY\s+)?UPDATE\b|\bFOR\s+(?:KEY\s+)?SHARE\b",
+    re.IGNORECASE,
+)
+
+
+def fingerprint(statement: str) -> str:
+    """
+    SELECT ... WHERE id IN (%(id_1_1)s, %(id_1_2)s) AND x = 'a'
+    -> SELECT ... WHERE id IN (?) AND x = ?
+    """
+    fp = _RE_STRING.sub("?", statement)
+    fp = _RE_PARAM.sub("?", fp)
+    fp = _RE_NUMBER.sub("?", fp)
+    fp = _RE_SPACES.sub(" ", fp).strip()
+    # IN (?, ?, ?) con cualquier cantidad de elementos -> misma huella
+    fp = _RE_LIST.sub("(?)", fp)
+    return fp
+
+
+def explain_command(statement: str) -> str:
+    """EXPLAIN que no repite efectos de la sentencia al re-ejecutarla."""
+    if _RE_SIDE_EFFECTS.search(statement):
+        return "EXPLAIN "
+    return "EXPLAIN (ANALYZE, BUFFERS) "
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "count", "total", "max", "durations", "pos",
+                 "last_seen", "explain", "explain_at", "explain_duration_ms", "explain_analyze")
+
+    def __init__(self, fp: str):
+        self.fingerprint = fp
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.durations: List[float] = []
+        self.pos = 0
+        self.last_seen: Optional[datetime] = None
+        self.explain: Optional[str] = None
+        self.explain_at: float = 0.0
+        self.explain_duration_ms: Optional[float] = None
+        self.explain_analyze = False
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        # ring buffer de las últimas DURATION_WINDOW duraciones
+        if len(self.durations) < DURATION_WINDOW:
+            self.durations.append(seconds)
+        else:
+            self.durations[self.pos] = seconds
+            self.pos = (self.pos + 1) % DURATION_WINDOW
+        self.last_seen = datetime.utcnow()
+
+    def as_dict(self, include_explain: bool) -> dict:
+        ordered = sorted(self.durations)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+        out = {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 2),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(pct(0.50) * 1000, 3),
+            "p95_ms": round(pct(0.95) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+        }
+        if include_explain and self.explain:
+            out["explain"] = self.explain
+            out["explain_duration_ms"] = self.explain_duration_ms
+            out["explain_analyze"] = self.explain_analyze   # False => plan estimado, sin tiempos reales
+        return out
+
+
+class SlowQueryLog:
+    def __init__(self, top_k: int = SLOW_QUERY_TOP_K):
+        self.top_k = top_k
+        self._entries: Dict[str, _Entry] = {}
+        self._fp_cache: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, statement: str) -> str:
+        # las sentencias de SQLAlchemy se repiten textualmente: el regex corre 1 vez por forma
+        fp = self._fp_cache.get(statement)
+        if fp is None:
+            fp = fingerprint(statement)
+            if len(self._fp_cache) >= _FINGERPRINT_CACHE_MAX:
+                self._fp_cache.clear()
+            self._fp_cache[statement] = fp
+        return fp
+
+    def record(self, conn, statement: str, parameters, executemany: bool, seconds: float) -> None:
+        if seconds * 1000 < SLOW_QUERY_RECORD_MS:
+            return
+
+        fp = self._fingerprint(statement)
+        with self._lock:
+            entry = self._entries.get(fp)
+            if entry is None:
+                if len(self._entries) >= self.top_k:
+                    # top-K por tiempo total: sale el que menos pesa
+                    weakest = min(self._entries.values(), key=lambda e: e.total)
+                    del self._entries[weakest.fingerprint]
+                entry = _Entry(fp)
+                self._entries[fp] = entry
+            entry.add(seconds)
+            want_explain = self._should_explain(entry, statement, executemany, seconds)
+            if want_explain:
+                entry.explain_at = time.monotonic()
+
+        if want_explain:
+            command = explain_command(statement)
+            plan = _explain(conn, command, statement, parameters)
+            if plan is not None:
+                with self._lock:
+                    entry.explain = plan
+                    entry.explain_duration_ms = round(seconds * 1000, 3)
+                    entry.explain_analyze = "ANALYZE" in command
+
+    def _should_explain(self, entry: _Entry, statement: str, executemany: bool, seconds: float) -> bool:
+        if not SLOW_QUERY_EXPLAIN_ENABLED or executemany:
+            return False
+        if seconds * 1000 < SLOW_QUERY_EXPLAIN_MS:
+            return False
+        # EXPLAIN ANALYZE re-ejecuta la sentencia: solo lecturas
+        if not statement.lstrip()[:6].upper() == "SELECT":
+            return False
+        if time.monotonic() - entry.explain_at < EXPLAIN_MIN_INTERVAL_SECONDS:
+            return False
+        return random.random() < SLOW_QUERY_EXPLAIN_SAMPLE
+
+    def top(self, limit: int = 50, sort: str = "total", include_explain: bool = True) -> List[dict]:
+        keys = {
+            "total": lambda e: e.total,
+            "count": lambda e: e.count,
+            "max": lambda e: e.max,
+            "mean": lambda e: e.total / e.count if e.count else 0.0,
+        }
+        with self._lock:
+            entries = sorted(self._entries.values(), key=keys[sort], reverse=True)[:limit]
+            return [e.as_dict(include_explain) for e in entries]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _explain(conn, command: str, statement: str, parameters) -> Optional[str]:
+    """
+    EXPLAIN (ver explain_command) en la misma conexión/transacción, aislado en un SAVEPOINT.
+    Se usa el cursor DBAPI directo: no pasa por los eventos de SQLAlchemy (sin recursión).
+    """
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+    except Exception:
+        return None
+
+    try:
+        cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(command + statement, parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        except Exception:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            plan = None
+        cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    except Exception:
+        return None
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+
+SLOW_QUERY_LOG = SlowQueryLog()
@@ -1,7 +1,11 @@
 import os
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import ORJSONResponse
 from app.routers.calendar import router as calendar_router
 
 from dotenv import load_dotenv
@@ -11,7 +15,20 @@ load_dotenv()
 
 # ✅ Base y engine
 from app.db.base_class import Base
-from app.db.session import engine
+from app.db.session import engine, SessionLocal, DATABASE_URL
+from app.db.notify import PgListener
+from app.db.invalidation import INVALIDATION_BUS, INVALIDATION_CHANNEL, InvalidationPoller
+from app.core.events import AGENDA_HUB, AGENDA_EVENTS_CHANNEL
+from app.core.config import (
+    NO_SHOW_SWEEPER_ENABLED, METRICS_MULTIPROC_DIR, COMPRESSION_ENABLED, EVENTS_ENABLED,
+    INVALIDATION_LISTEN_ENABLED,
+)
+from app.core.compression import CompressionMiddleware
+from app.core.conditional_get import ConditionalGetHeadersMiddleware
+from app.core.http_metrics import HttpMetricsMiddleware, run_flusher
+from app.db.instrumentation import DbQueryHeadersMiddleware
+from app.core.no_show_sweeper import NoShowSweeper
+from app.core.threadpool import configure_threadpool
 
 # ✅ Importar modelos
 from app.models.user import User
@@ -20,6 +37,11 @@ from app.models.appointment import Appointment
 from app.models.note import Note
 from app.models.clinic_settings import ClinicSettings
 from app.models.appointment_block import AppointmentBlock
+from app.models.patient_stats import PatientStats
+from app.models.appointment_series import AppointmentSeries, AppointmentSeriesException
+from app.models.agenda_version import AgendaVersion
+from app.models.cache_version import CacheVersion
+from app.models.revoked_token import RevokedToken
 
 # ✅ Importar Routers
 from app.routers import admin_users
@@ -35,8 +57,72 @@ from app.routers.clinic_settings import router as clinic_settings_router
 from app.routers.appointment_blocks import router as appointment_blocks_router
 from app.routers.dashboard import router as dashboard_router
 from app.routers.timeline import router as timeline_router
+from app.routers.internal import router as internal_router
+from app.routers.events import router as events_router
+from app.routers.sync import router as sync_router
+from app.routers.bootstrap import router as bootstrap_router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # ✅ Tamaño del threadpool de anyio desde THREADPOOL_SIZE
+    configure_threadpool()
+
+    try:
+        # Esto confirma la conexión que ya vimos exitosa en tus logs
+        with engine.connect() as connection:
+            print("--- Conexión a Base de Datos EXITOSA ---")
+    except Exception as e:
+        print(f"--- ERROR conectando a la DB: {e} ---")
+
+    # ✅ Barrido periódico de no-shows (advisory lock => 1 worker a la vez)
+    sweeper = NoShowSweeper(SessionLocal) if NO_SHOW_SWEEPER_ENABLED else None
+    if sweeper:
+        sweeper.start()
+        print("--- No-show sweeper ACTIVO ---")
+
+    # ✅ LISTEN/NOTIFY: eventos de agenda de TODOS los workers -> clientes SSE de este proceso
+    listener = None
+    if EVENTS_ENABLED or INVALIDATION_LISTEN_ENABLED:
+        listener = PgListener(DATABASE_URL)
+    if EVENTS_ENABLED:
+        AGENDA_HUB.bind_loop(asyncio.get_running_loop())
+        listener.add_handler(AGENDA_EVENTS_CHANNEL, AGENDA_HUB.dispatch_threadsafe)
+
+    # ✅ Invalidación de caches en proceso: NOTIFY si hay LISTEN; polling de
+    # cache_versions mientras el LISTEN esté caído (o deshabilitado)
+    invalidation_poller = InvalidationPoller(
+        SessionLocal, listener=listener if INVALIDATION_LISTEN_ENABLED else None
+    )
+    if INVALIDATION_LISTEN_ENABLED:
+        listener.add_handler(INVALIDATION_CHANNEL, INVALIDATION_BUS.handle_notify)
+        # al (re)conectar: ponerse al día con lo invalidado mientras no había LISTEN
+        listener.add_connect_hook(invalidation_poller.poll_once)
+    invalidation_poller.start()
+
+    if listener:
+        listener.start()
+
+    # ✅ Varios workers: cada uno vuelca sus métricas HTTP al directorio compartido
+    flusher_stop = asyncio.Event()
+    flusher = asyncio.create_task(run_flusher(flusher_stop)) if METRICS_MULTIPROC_DIR else None
 
-app = FastAPI(title="Psych SaaS API")
+    yield
+
+    if flusher:
+        flusher_stop.set()
+        await flusher
+
+    if sweeper:
+        sweeper.stop()
+
+    if listener:
+        listener.stop()
+
+    invalidation_poller.stop()
+
+
+# ✅ orjson para todas las respuestas JSON (serializa bastante más rápido que json.dumps)
+app = FastAPI(title="Psych SaaS API", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # ✅ MEJORA CORS: Lista extendida para asegurar comunicación total
 origins = [
@@ -55,14 +141,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("startup")
-def startup_event():
-    try:
-        # Esto confirma la conexión que ya vimos exitosa en tus logs
-        with engine.connect() as connection:
-            print("--- Conexión a Base de Datos EXITOSA ---")
-    except Exception as e:
-        print(f"--- ERROR conectando a la DB: {e} ---")
+# ✅ gzip / br / zstd según Accept-Encoding (umbral de tamaño; streaming con flush por chunk)
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# ✅ ETag de agenda en las respuestas 200 de los GET condicionales (app/core/conditional_get.py)
+app.add_middleware(ConditionalGetHeadersMiddleware)
+
+# ✅ Server-Timing / X-DB-Queries por request (+ aviso de N+1 en el log)
+app.add_middleware(DbQueryHeadersMiddleware)
+
+# ✅ Latencia / status / en vuelo por ruta (se agrega al final => envuelve todo, incluido CORS)
+app.add_middleware(HttpMetricsMiddleware)
 
 @app.get("/")
 def root():
@@ -87,8 +177,14 @@ app.include_router(dashboard_router)
 app.include_router(timeline_router)
 app.include_router(admin_users.router)
 app.include_router(calendar_router)
+app.include_router(internal_router)
+app.include_router(events_router)
+app.include_router(sync_router)
+app.include_router(bootstrap_router)
 # ✅ MEJORA MAESTRA: Sincronización de puerto con Railway
 if __name__ == "__main__":
     # Si Railway detecta puerto 8080 en logs, aquí lo forzamos a leer la variable PORT
     port = int(os.environ.get("PORT", 8080)) 
+    # request.client.host aquí es el proxy de Railway: la IP real para el rate limit de
+    # login sale de X-Forwarded-For según TRUSTED_PROXY_HOPS (app/core/rate_limit.py)
     uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=False)
\ No newline at end of file
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class AgendaVersion(Base):
+    """
+    ✅ Versión monótona por agenda (ver app/core/agenda_version.py).
+    Se incrementa en la MISMA transacción que cualquier escritura de citas, bloqueos,
+    series, notas o pacientes de la agenda; sirve para ETags / GET condicionales.
+
+    agenda_id = users.id de la psicóloga dueña; 0 = configuración clínica global.
+    (sin FK a users justamente por la fila 0)
+    """
+    __tablename__ = "agenda_versions"
+
+    agenda_id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, ForeignKey, Boolean, Text, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -28,6 +28,8 @@ class Appointment(Base):
 
     # 🔥 Soft delete + auditoría timestamps
     is_active = Column(Boolean, default=True)
+    # Versión de agenda de la última escritura (app/core/agenda_version.py): cursor de /sync/changes
+    change_version = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=True)
@@ -51,4 +53,18 @@ class Appointment(Base):
         "Note",
         back_populates="appointment",
         cascade="all, delete-orphan"
-    )
\ No newline at end of file
+    )
+
+    # ✅ Índices parciales (solo filas activas): is_active va en el WHERE, no en las columnas
+    __table_args__ = (
+        Index("ix_appointments_user_start_active", "user_id", "start_time", postgresql_where=text("is_active")),
+        Index("ix_appointments_patient_start_active", "patient_id", "start_time", postgresql_where=text("is_active")),
+        # sweeper de no-shows y filtros status == "scheduled"
+        Index(
+            "ix_appointments_scheduled_start",
+            "start_time",
+            postgresql_where=text("is_active AND status = 'scheduled'")
+        ),
+        # /sync/changes: filas de la agenda con change_version > cursor (incluye soft-deletes)
+        Index("ix_appointments_user_change_version", "user_id", "change_version"),
+    )
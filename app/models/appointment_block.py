@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, BigInteger, Integer, DateTime, ForeignKey, Boolean, Text, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -21,10 +21,19 @@ class AppointmentBlock(Base):
 
     # 🔥 auditoría + soft delete
     is_active = Column(Boolean, default=True)
+    # Versión de agenda de la última escritura (app/core/agenda_version.py): cursor de /sync/changes
+    change_version = Column(BigInteger, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     updated_by = Column(Integer, ForeignKey("users.id"), nullable=True)
 
     # Relaciones
-    user = relationship("User", foreign_keys=[user_id])
\ No newline at end of file
+    user = relationship("User", foreign_keys=[user_id])
+
+    # ✅ Índice parcial (solo bloqueos activos)
+    __table_args__ = (
+        Index("ix_appointment_blocks_user_start_active", "user_id", "start_time", postgresql_where=text("is_active")),
+        # /sync/changes: filas de la agenda con change_version > cursor (incluye soft-deletes)
+        Index("ix_appointment_blocks_user_change_version", "user_id", "change_version"),
+    )
@@ -0,0 +1,73 @@
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Boolean, Text, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class AppointmentSeries(Base):
+    """
+    ✅ Serie recurrente guardada como REGLA (no una fila por ocurrencia).
+    Las ocurrencias se expanden al leer, solo para la ventana pedida.
+    """
+    __tablename__ = "appointment_series"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)          # dueño de la agenda
+
+    # 📅 Regla
+    start_time = Column(DateTime, nullable=False)                             # primera ocurrencia
+    last_start_time = Column(DateTime, nullable=False)                        # última ocurrencia (para filtrar por rango)
+    duration_minutes = Column(Integer, nullable=False, default=60)
+    frequency = Column(String, nullable=False, default="weekly")
+    occurrences = Column(Integer, nullable=True)
+    until = Column(Date, nullable=True)
+
+    notes = Column(Text, nullable=True)
+
+    # 🔥 Soft delete + auditoría
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    updated_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    # Relaciones
+    patient = relationship("Patient")
+    exceptions = relationship(
+        "AppointmentSeriesException",
+        back_populates="series",
+        cascade="all, delete-orphan"
+    )
+
+    __table_args__ = (
+        Index("ix_appointment_series_user_range", "user_id", "start_time", "last_start_time"),
+        Index("ix_appointment_series_patient", "patient_id"),
+    )
+
+
+class AppointmentSeriesException(Base):
+    """
+    ✅ Excepción de una ocurrencia:
+    - appointment_id NULL  -> ocurrencia omitida (conflicto al crear la serie)
+    - appointment_id != NULL -> ocurrencia materializada como Appointment real
+    """
+    __tablename__ = "appointment_series_exceptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    series_id = Column(Integer, ForeignKey("appointment_series.id"), nullable=False)
+    occurrence_start = Column(DateTime, nullable=False)
+    appointment_id = Column(Integer, ForeignKey("appointments.id"), nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    series = relationship("AppointmentSeries", back_populates="exceptions")
+    appointment = relationship("Appointment")
+
+    __table_args__ = (
+        UniqueConstraint("series_id", "occurrence_start", name="uq_series_exception_occurrence"),
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class CacheVersion(Base):
+    """
+    ✅ Versión por (entidad, llave) de los caches en proceso (ver app/db/invalidation.py).
+    Se incrementa en la transacción que cambia la entidad; los workers sin LISTEN
+    comparan estas versiones por polling para saber qué desalojar.
+    """
+    __tablename__ = "cache_versions"
+
+    entity = Column(String(64), primary_key=True)
+    key = Column(String(128), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
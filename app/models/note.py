@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, Boolean, ForeignKey, Text, String
+from sqlalchemy import Column, BigInteger, Integer, DateTime, Boolean, ForeignKey, Text, String, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base_class import Base
@@ -25,6 +25,8 @@ class Note(Base):
     content = Column(Text, nullable=True)
 
     is_active = Column(Boolean, default=True)
+    # Versión de agenda de la última escritura (app/core/agenda_version.py): cursor de /sync/changes
+    change_version = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=True)
@@ -52,4 +54,12 @@ class Note(Base):
         "User",
         foreign_keys=[updated_by],
         back_populates="notes_updated"
-    )
\ No newline at end of file
+    )
+
+    # ✅ Índices parciales (solo notas activas)
+    __table_args__ = (
+        Index("ix_notes_patient_created_active", "patient_id", "created_at", postgresql_where=text("is_active")),
+        Index("ix_notes_user_created_active", "user_id", "created_at", postgresql_where=text("is_active")),
+        # /sync/changes: filas de la agenda con change_version > cursor (incluye soft-deletes)
+        Index("ix_notes_user_change_version", "user_id", "change_version"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Date
+from sqlalchemy import Column, BigInteger, Integer, String, ForeignKey, DateTime, Boolean, Date, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -54,6 +54,8 @@ class Patient(Base):
 
     # 🔥 Soft delete
     is_active = Column(Boolean, default=True)
+    # Versión de agenda de la última escritura (app/core/agenda_version.py): cursor de /sync/changes
+    change_version = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     # =========================
     # ✅ Relaciones
@@ -69,4 +71,18 @@ class Patient(Base):
         "Note",
         back_populates="patient",
         cascade="all, delete-orphan"
-    )
\ No newline at end of file
+    )
+
+    # ✅ Estadísticas precalculadas (tabla patient_stats)
+    stats = relationship(
+        "PatientStats",
+        back_populates="patient",
+        uselist=False
+    )
+
+    # ✅ Índice parcial (solo pacientes activos); id cubre el ORDER BY id DESC de los listados
+    __table_args__ = (
+        Index("ix_patients_user_active", "user_id", "id", postgresql_where=text("is_active")),
+        # /sync/changes: filas de la agenda con change_version > cursor (incluye soft-deletes)
+        Index("ix_patients_user_change_version", "user_id", "change_version"),
+    )
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class PatientStats(Base):
+    """
+    ✅ Estadísticas por paciente mantenidas de forma incremental
+    (se recalculan en la misma transacción que la escritura que las afecta).
+    """
+    __tablename__ = "patient_stats"
+
+    patient_id = Column(Integer, ForeignKey("patients.id"), primary_key=True)
+
+    # ✅ agenda dueña del paciente (para filtrar/ordenar listas sin JOIN extra)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    sessions_attended = Column(Integer, nullable=False, default=0)
+    no_shows = Column(Integer, nullable=False, default=0)
+    notes_count = Column(Integer, nullable=False, default=0)
+
+    last_visit = Column(DateTime, nullable=True)
+    next_visit = Column(DateTime, nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    patient = relationship("Patient", back_populates="stats")
+
+    __table_args__ = (
+        Index("ix_patient_stats_user_sessions", "user_id", "sessions_attended"),
+        Index("ix_patient_stats_user_no_shows", "user_id", "no_shows"),
+        Index("ix_patient_stats_user_notes", "user_id", "notes_count"),
+        Index("ix_patient_stats_user_last_visit", "user_id", "last_visit"),
+        Index("ix_patient_stats_user_next_visit", "user_id", "next_visit"),
+    )
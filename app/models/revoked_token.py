@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Index, text
+
+from app.db.base_class import Base
+
+
+class RevokedToken(Base):
+    """
+    ✅ Tokens revocados (ver app/core/revocation.py). Cada worker la refleja en memoria
+    y la relee de forma incremental (id > último visto) cuando el bus de invalidación
+    avisa de una revocación.
+
+    - jti != NULL: ese token (access o refresh) queda revocado (logout / rotación).
+    - jti NULL: TODOS los tokens de user_id emitidos hasta revoked_at (desactivación,
+      cambio de rol, de psicóloga asignada o de contraseña).
+
+    expires_at = cuando el token revocado expira por sí solo; después la fila sobra.
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(BigInteger, primary_key=True)
+    jti = Column(String(64), nullable=True)
+    user_id = Column(Integer, nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # un jti se revoca una sola vez: la rotación de refresh tokens lo usa para
+        # detectar un refresh token usado dos veces
+        Index("ux_revoked_tokens_jti", "jti", unique=True, postgresql_where=text("jti IS NOT NULL")),
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
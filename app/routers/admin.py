@@ -1,5 +1,9 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from typing import Optional
 from app.core.auth import require_admin
+from app.core.patient_stats import rebuild_patient_stats
+from app.db.deps import get_db
 from app.models.user import User
 
 router = APIRouter(
@@ -13,3 +17,16 @@ def admin_dashboard(current_user: User = Depends(require_admin)):
         "message": "Bienvenido al panel de administrador",
         "user": current_user.email
     }
+
+
+@router.post("/patient-stats/rebuild")
+def admin_rebuild_patient_stats(
+    user_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    ✅ Job de rebuild de patient_stats (todas las agendas o solo una).
+    """
+    rebuilt = rebuild_patient_stats(db, user_id=user_id)
+    return {"message": "Estadísticas reconstruidas", "patients": rebuilt}
@@ -11,7 +11,12 @@ from app.core.auth import get_current_user, require_roles
 from app.core.permissions import ensure_can_delete_block
 
 from app.models.user import User
+from app.core.agenda import get_target_user_id
 from app.models.appointment_block import AppointmentBlock
+from app.core.fast_json import fast_list_response
+from app.core.conditional_get import conditional_get
+from app.core.events import publish_agenda_event, BLOCK_ADDED, BLOCK_UPDATED, BLOCK_REMOVED
+from app.db.read_models import BLOCK_LIST_COLUMNS
 
 from app.schemas.appointment_block import (
     AppointmentBlockCreate,
@@ -21,28 +26,16 @@ from app.schemas.appointment_block import (
 
 router = APIRouter(prefix="/appointments/blocks", tags=["Appointment Blocks"])
 
+
+# ✅ GET condicional (ETag por versión de agenda): 304 antes de correr las queries
+AGENDA_ETAG = Depends(conditional_get())
+
 ALLOWED_ROLES = ["admin", "psychologist", "assistant"]
 
 
 # =========================
 # Helpers: 1 psicóloga
 # =========================
-def get_owner_user(db: Session) -> User:
-    owner = db.query(User).filter(
-        User.role == "psychologist",
-        User.is_active == True
-    ).first()
-    if not owner:
-        raise HTTPException(status_code=500, detail="No existe usuario con rol 'psychologist'")
-    return owner
-
-
-def get_target_user_id(db: Session, current_user: User) -> int:
-    if current_user.role == "assistant":
-        return get_owner_user(db).id
-    return current_user.id
-
-
 def _validate_block_range(start_time: datetime, end_time: datetime):
     if end_time <= start_time:
         raise HTTPException(status_code=400, detail="end_time debe ser mayor a start_time")
@@ -62,7 +55,8 @@ def _safe_list_query(db: Session, current_user: User):
     Devuelve [] y el frontend deja de marcar CORS.
     """
     try:
-        q = db.query(AppointmentBlock).filter(AppointmentBlock.is_active == True)
+        # ✅ Proyección a Row (mismos nombres que AppointmentBlockResponse)
+        q = db.query(*BLOCK_LIST_COLUMNS).filter(AppointmentBlock.is_active == True)
 
         if current_user.role != "admin":
             target_user_id = get_target_user_id(db, current_user)
@@ -136,6 +130,11 @@ def create_block(
             created_by=current_user.id
         )
         db.add(block)
+        db.flush()
+        publish_agenda_event(
+            db, block.user_id, BLOCK_ADDED,
+            id=block.id, start_time=block.start_time, end_time=block.end_time,
+        )
         db.commit()
         db.refresh(block)
         return block
@@ -150,13 +149,13 @@ def create_block(
         raise
 
 
-@router.get("/", response_model=List[AppointmentBlockResponse])
+@router.get("/", response_model=List[AppointmentBlockResponse], dependencies=[AGENDA_ETAG])
 def list_blocks(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     # ✅ Esto evita el 500 y por ende el “CORS missing allow origin”
-    return _safe_list_query(db, current_user)
+    return fast_list_response(AppointmentBlockResponse, _safe_list_query(db, current_user))
 
 
 @router.put("/{block_id}", response_model=AppointmentBlockResponse)
@@ -200,6 +199,10 @@ def update_block(
 
     block.updated_by = current_user.id
     block.updated_at = datetime.utcnow()
+    publish_agenda_event(
+        db, block.user_id, BLOCK_UPDATED,
+        id=block.id, start_time=block.start_time, end_time=block.end_time,
+    )
 
     db.commit()
     db.refresh(block)
@@ -240,6 +243,7 @@ def delete_block(
     block.is_active = False
     block.updated_by = current_user.id
     block.updated_at = datetime.utcnow()
+    publish_agenda_event(db, block.user_id, BLOCK_REMOVED, id=block.id)
 
     db.commit()
     return {"message": "Bloqueo desactivado correctamente"}
\ No newline at end of file
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import insert, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timedelta, time, timezone
-from zoneinfo import ZoneInfo
 
 from app.core.permissions import (
     ensure_can_edit_appointment,
@@ -11,22 +12,60 @@ from app.core.permissions import (
     ensure_can_complete_appointment
 )
 
-from app.db.deps import get_db
+from app.db.deps import get_db, get_async_db
 from app.models.appointment import Appointment
 from app.models.patient import Patient
-from app.core.auth import get_current_user, require_roles
+from app.core.auth import get_current_user, get_current_user_async, require_roles
 from app.models.user import User
-from app.schemas.appointment import AppointmentCreate, AppointmentResponse, AppointmentUpdate
+from app.core.caches import active_psychologist_ids, cached_clinic_settings
+from app.schemas.appointment import (
+    AppointmentCreate,
+    AppointmentResponse,
+    AppointmentUpdate,
+    AppointmentSeriesCreate,
+    AppointmentSeriesResponse,
+    AppointmentSeriesMaterialize,
+    AppointmentBatchStatusRequest,
+    AppointmentBatchStatusResponse,
+)
 from app.models.clinic_settings import ClinicSettings
 from app.models.appointment_block import AppointmentBlock
+from app.core.patient_stats import refresh_patient_stats
+from app.core.fast_json import fast_list_response
+from app.core.agenda_version import bump_agenda_versions, stamp_change_versions
+from app.core.conditional_get import conditional_get
+from app.core.events import (
+    publish_agenda_event,
+    APPOINTMENT_CREATED,
+    APPOINTMENT_UPDATED,
+    APPOINTMENT_STATUS_CHANGED,
+    SERIES_CREATED,
+    SERIES_CANCELLED,
+)
+from app.core.config import AGENDA_ETAG_TIME_BUCKET_SECONDS
+from app.db.read_models import APPOINTMENT_LIST_COLUMNS
+from app.core.local_time import LOCAL_TZ, local_now, to_local_naive
+from app.core.recurrence import (
+    VirtualOccurrence,
+    expand_recurrence,
+    is_series_occurrence,
+    iter_virtual_occurrences,
+    parse_occurrence_key,
+)
+from app.models.appointment_series import AppointmentSeries, AppointmentSeriesException
 
 router = APIRouter(
     prefix="/appointments",
     tags=["Appointments"]
 )
 
+
+# ✅ GET condicional (ETag por versión de agenda): 304 antes de correr las queries
+AGENDA_ETAG = Depends(conditional_get())
+# Dependen de "ahora": el ETag además rota cada AGENDA_ETAG_TIME_BUCKET_SECONDS
+AGENDA_ETAG_NOW = Depends(conditional_get(AGENDA_ETAG_TIME_BUCKET_SECONDS))
+
 ALLOWED_ROLES = ["admin", "psychologist", "assistant"]
-LOCAL_TZ = ZoneInfo("America/Mexico_City")
 
 
 # =========================
@@ -47,13 +86,25 @@ def _appointment_to_response(appt: Appointment, patient_name: Optional[str] = No
         "updated_at": appt.updated_at,
         "created_by": appt.created_by,
         "updated_by": appt.updated_by,
+        "series_id": getattr(appt, "series_id", None),
+        "is_virtual": getattr(appt, "is_virtual", False),
     }
 
 
+def _patient_name(appt: Appointment) -> Optional[str]:
+    # appt.patient viene con joinedload (_resolve_appointment / get_appointment)
+    return getattr(appt.patient, "full_name", None)
+
+
 # =========================
 # Clinic Settings
 # =========================
 def get_settings(db: Session) -> ClinicSettings:
+    """✅ Cacheado en proceso (solo lectura); PUT /settings lo invalida en todos los workers."""
+    return cached_clinic_settings(lambda: _load_settings(db))
+
+
+def _load_settings(db: Session) -> ClinicSettings:
     settings = db.query(ClinicSettings).first()
     if not settings:
         settings = ClinicSettings(
@@ -117,8 +168,14 @@ def validate_within_working_hours(db: Session, start_dt: datetime, duration_minu
     if duration_minutes is None or duration_minutes <= 0:
         raise HTTPException(status_code=400, detail="duration_minutes debe ser mayor a 0")
 
-    settings = get_settings(db)
+    _check_working_hours(get_settings(db), start_dt, duration_minutes)
+
 
+def _check_working_hours(settings: ClinicSettings, start_dt: datetime, duration_minutes: int):
+    """
+    Misma validación que validate_within_working_hours, con settings ya cargados
+    (para validar muchas ocurrencias sin volver a consultar la BD).
+    """
     weekday = start_dt.weekday()
     day_enabled = {
         0: settings.mon,
@@ -172,13 +229,48 @@ def _ensure_not_no_show(appt: Appointment):
         raise HTTPException(status_code=400, detail="No puedes modificar una cita marcada como no-show")
 
 
-def get_owner_user(db: Session) -> User:
-    owners = (
-        db.query(User)
-        .filter(User.role == "psychologist", User.is_active == True)
-        .order_by(User.id.asc())
-        .all()
-    )
+# =========================
+# Reglas de transición de estado (compartidas por endpoints unitarios y batch)
+# =========================
+def _check_can_cancel(current_user: User, appt: Appointment):
+    ensure_can_cancel_appointment(current_user, appt)
+
+
+def _check_can_no_show(current_user: User, appt: Appointment):
+    ensure_can_mark_no_show(current_user, appt)
+
+    if appt.status != "scheduled":
+        raise HTTPException(
+            status_code=400,
+            detail=f"No puedes marcar no-show porque la cita está en estado '{appt.status}'"
+        )
+
+    # start_time es hora local naive => se compara contra la hora local, no contra UTC
+    if appt.start_time > local_now():
+        raise HTTPException(
+            status_code=400,
+            detail="No puedes marcar no-show: la cita aún no ha ocurrido (start_time está en el futuro)"
+        )
+
+
+def _check_can_complete(current_user: User, appt: Appointment):
+    ensure_can_complete_appointment(current_user, appt)
+
+    if appt.status == "cancelled":
+        raise HTTPException(status_code=400, detail="No puedes completar una cita cancelada")
+
+
+# action -> (validación, valores a escribir)
+STATUS_TRANSITIONS = {
+    "cancel": (_check_can_cancel, {"status": "cancelled", "is_active": False}),
+    "no_show": (_check_can_no_show, {"status": "no_show"}),
+    "complete": (_check_can_complete, {"status": "completed"}),
+}
+
+
+def get_owner_user_id(db: Session) -> int:
+    # ✅ cacheado en proceso (app/core/caches.py), invalidado entre workers
+    owners = active_psychologist_ids(db)
 
     if len(owners) == 0:
         raise HTTPException(status_code=500, detail="No existe psicóloga activa en el sistema.")
@@ -197,7 +289,7 @@ def get_owner_user(db: Session) -> User:
 
 def get_target_user_id(db: Session, current_user: User) -> int:
     if current_user.role == "assistant":
-        return get_owner_user(db).id
+        return get_owner_user_id(db)
     return current_user.id
 
 
@@ -211,12 +303,16 @@ def _patient_access_query(db: Session, current_user: User, patient_id: int):
         return base
 
     if current_user.role == "assistant":
-        owner_id = get_owner_user(db).id
+        owner_id = get_owner_user_id(db)
         return base.filter(Patient.user_id.in_([owner_id, current_user.id]))
 
     return base.filter(Patient.user_id == current_user.id)
 
 
+# Ninguna cita dura más que esto (el schema limita a 240 min): acota la búsqueda de traslapes
+MAX_APPOINTMENT_SPAN = timedelta(days=1)
+
+
 def _validate_overlap(
     db: Session,
     target_user_id: int,
@@ -227,9 +323,13 @@ def _validate_overlap(
     new_start_utc = _as_utc_aware(new_start)
     new_end_utc = _as_utc_aware(new_end)
 
+    # ✅ solo citas que pueden tocar el rango (índice user_id + start_time);
+    # antes se cargaba la agenda completa en cada alta/edición
     q = db.query(Appointment).filter(
         Appointment.is_active == True,
-        Appointment.user_id == target_user_id
+        Appointment.user_id == target_user_id,
+        Appointment.start_time < new_end,
+        Appointment.start_time > new_start - MAX_APPOINTMENT_SPAN,
     )
 
     if exclude_id is not None:
@@ -272,6 +372,13 @@ def _validate_patient_no_double_booking(
 
     existing = q.first()
 
+    # ✅ también cuenta una ocurrencia virtual de una serie en ese mismo horario
+    if not existing:
+        existing = next(
+            iter_virtual_occurrences(db, new_start, new_start, user_id=target_user_id, patient_id=patient_id),
+            None
+        )
+
     if existing:
         raise HTTPException(
             status_code=400,
@@ -353,16 +460,591 @@ def create_appointment(
     )
 
     db.add(appt)
+    refresh_patient_stats(db, [appt.patient_id])
+    # (refresh_patient_stats hizo flush => appt.id ya existe)
+    publish_agenda_event(
+        db, appt.user_id, APPOINTMENT_CREATED,
+        id=appt.id, start_time=appt.start_time, status=appt.status,
+    )
     db.commit()
     db.refresh(appt)
 
     return _appointment_to_response(appt, patient_name=getattr(patient, "full_name", None))
 
 
-@router.get("/", response_model=List[AppointmentResponse])
-def list_appointments(
+@router.post("/series", response_model=AppointmentSeriesResponse)
+def create_appointment_series(
+    data: AppointmentSeriesCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_roles(ALLOWED_ROLES))
+):
+    """
+    ✅ Agenda una serie recurrente (weekly / biweekly).
+    - Carga citas y bloqueos del rango UNA sola vez
+    - Valida todas las ocurrencias en un barrido ordenado
+    - Inserta las aceptadas con un solo INSERT y devuelve los conflictos por ocurrencia
+    """
+    # la regla se guarda naive en hora local (igual que start_time de las citas)
+    starts = expand_recurrence(to_local_naive(data.start_time), data.frequency, data.occurrences, data.until)
+    duration = timedelta(minutes=data.duration_minutes)
+
+    patient = _patient_access_query(db, current_user, data.patient_id).first()
+    if not patient:
+        raise HTTPException(status_code=404, detail="Paciente no encontrado o sin acceso")
+
+    target_user_id = get_target_user_id(db, current_user)
+    settings = get_settings(db)
+
+    range_start = starts[0]
+    range_end = starts[-1] + duration
+
+    # 1) Citas existentes del paciente en el rango (para doble agenda exacta)
+    existing_starts = {
+        _as_utc_aware(row.start_time)
+        for row in db.query(Appointment.start_time).filter(
+            Appointment.is_active == True,
+            Appointment.user_id == target_user_id,
+            Appointment.patient_id == patient.id,
+            Appointment.start_time >= range_start,
+            Appointment.start_time <= range_end,
+        )
+    }
+    existing_starts.update(
+        _as_utc_aware(occ.start_time)
+        for occ in iter_virtual_occurrences(db, range_start, range_end, user_id=target_user_id, patient_id=patient.id)
+    )
+
+    # 2) Bloqueos que tocan el rango, ordenados para el barrido
+    blocks = [
+        (_as_utc_aware(b.start_time), _as_utc_aware(b.end_time))
+        for b in db.query(AppointmentBlock.start_time, AppointmentBlock.end_time)
+        .filter(
+            AppointmentBlock.is_active == True,
+            AppointmentBlock.user_id == target_user_id,
+            AppointmentBlock.start_time < range_end,
+            AppointmentBlock.end_time > range_start,
+        )
+        .order_by(AppointmentBlock.start_time.asc())
+    ]
+
+    accepted = []
+    conflicts = []
+    block_idx = 0
+
+    for occurrence_start in starts:
+        occ_start = _as_utc_aware(occurrence_start)
+        occ_end = _as_utc_aware(occurrence_start + duration)
+
+        try:
+            _validate_no_past(occurrence_start)
+            _check_working_hours(settings, occurrence_start, data.duration_minutes)
+
+            # bloqueos que ya terminaron antes de esta ocurrencia no vuelven a revisarse
+            while block_idx < len(blocks) and blocks[block_idx][1] <= occ_start:
+                block_idx += 1
+
+            i = block_idx
+            while i < len(blocks) and blocks[i][0] < occ_end:
+                if occ_start < blocks[i][1]:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Horario bloqueado. No se pueden agendar citas en ese rango."
+                    )
+                i += 1
+
+            if occ_start in existing_starts:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Este paciente ya tiene una cita exactamente en ese horario."
+                )
+
+        except HTTPException as e:
+            conflicts.append({"start_time": occurrence_start, "detail": e.detail})
+            continue
+
+        # (traslapes con otras citas se permiten igual que en _validate_overlap)
+        accepted.append(occurrence_start)
+
+    if not data.materialize:
+        return _create_lazy_series(db, current_user, data, patient, target_user_id, starts, accepted, conflicts)
+
+    created = []
+    if accepted:
+        # INSERT en lote: no pasa por el flush => versión de agenda a mano (y change_version)
+        versions = bump_agenda_versions(db, [target_user_id])
+        rows = [
+            {
+                "patient_id": patient.id,
+                "user_id": target_user_id,
+                "start_time": occurrence_start,
+                "duration_minutes": data.duration_minutes,
+                "status": "scheduled",
+                "notes": data.notes,
+                "created_by": current_user.id,
+                "change_version": versions[target_user_id],
+            }
+            for occurrence_start in accepted
+        ]
+        appts = db.scalars(insert(Appointment).returning(Appointment), rows).all()
+
+        # se arma la respuesta antes del commit (evita recargar cada fila)
+        created = [_appointment_to_response(a, patient_name=patient.full_name) for a in appts]
+
+        publish_agenda_event(db, target_user_id, APPOINTMENT_CREATED, ids=[a.id for a in appts])
+        refresh_patient_stats(db, [patient.id])
+        db.commit()
+
+    return {"series_id": None, "created": created, "conflicts": conflicts}
+
+
+def _create_lazy_series(
+    db: Session,
+    current_user: User,
+    data: AppointmentSeriesCreate,
+    patient: Patient,
+    target_user_id: int,
+    starts: List[datetime],
+    accepted: List[datetime],
+    conflicts: List[dict],
+):
+    """
+    Guarda la serie como regla + excepciones (ocurrencias con conflicto).
+    No se crea ninguna fila en appointments.
+    """
+    series = AppointmentSeries(
+        patient_id=patient.id,
+        user_id=target_user_id,
+        start_time=starts[0],
+        last_start_time=starts[-1],
+        duration_minutes=data.duration_minutes,
+        frequency=data.frequency,
+        occurrences=data.occurrences,
+        until=data.until,
+        notes=data.notes,
+        created_by=current_user.id
+    )
+    series.exceptions = [
+        AppointmentSeriesException(occurrence_start=c["start_time"], created_by=current_user.id)
+        for c in conflicts
+    ]
+
+    db.add(series)
+    db.flush()
+    publish_agenda_event(
+        db, series.user_id, SERIES_CREATED,
+        id=series.id, start_time=series.start_time, last_start_time=series.last_start_time,
+    )
+    db.commit()
+    db.refresh(series)
+
+    created = [
+        _appointment_to_response(
+            VirtualOccurrence(
+                series_id=series.id,
+                patient_id=series.patient_id,
+                user_id=series.user_id,
+                start_time=occurrence_start,
+                duration_minutes=series.duration_minutes,
+                notes=series.notes,
+                created_at=series.created_at,
+                created_by=series.created_by,
+            ),
+            patient_name=patient.full_name
+        )
+        for occurrence_start in accepted
+    ]
+
+    return {"series_id": series.id, "created": created, "conflicts": conflicts}
+
+
+def _series_access_query(db: Session, current_user: User, series_id: int):
+    return _series_scope_query(db, current_user).filter(AppointmentSeries.id == series_id)
+
+
+def _series_scope_query(db: Session, current_user: User):
+    query = db.query(AppointmentSeries).filter(AppointmentSeries.is_active == True)
+
+    if current_user.role != "admin":
+        target_user_id = get_target_user_id(db, current_user)
+        query = query.filter(AppointmentSeries.user_id == target_user_id)
+
+    return query
+
+
+def _lookup_occurrences(
+    db: Session,
+    current_user: User,
+    occurrences: Iterable[Tuple[int, datetime]],
+) -> Tuple[Dict[Tuple[int, datetime], Appointment], Dict[Tuple[int, datetime], VirtualOccurrence]]:
+    """
+    ✅ (series_id, inicio) -> (citas ya materializadas, ocurrencias aún virtuales). No escribe nada.
+    - 1 query de series (con el filtro de agenda) + 1 de excepciones
+    - ocurrencia ya materializada => su cita existente (un id virtual viejo sigue sirviendo)
+    - serie sin acceso, horario fuera de la regla u ocurrencia omitida => no viene en el resultado
+    """
+    wanted = {(series_id, to_local_naive(start)) for series_id, start in occurrences}
+    if not wanted:
+        return {}, {}
+
+    series_map = {
+        s.id: s
+        for s in _series_scope_query(db, current_user).filter(
+            AppointmentSeries.id.in_({series_id for series_id, _ in wanted})
+        )
+    }
+    wanted = {
+        (series_id, start) for series_id, start in wanted
+        if series_id in series_map and is_series_occurrence(series_map[series_id], start)
+    }
+    if not wanted:
+        return {}, {}
+
+    done = {
+        (series_id, start): appointment_id
+        for series_id, start, appointment_id in db.query(
+            AppointmentSeriesException.series_id,
+            AppointmentSeriesException.occurrence_start,
+            AppointmentSeriesException.appointment_id,
+        ).filter(
+            tuple_(AppointmentSeriesException.series_id, AppointmentSeriesException.occurrence_start).in_(list(wanted))
+        )
+    }
+    linked_ids = [appointment_id for appointment_id in done.values() if appointment_id is not None]
+    linked = {a.id: a for a in db.query(Appointment).filter(Appointment.id.in_(linked_ids))} if linked_ids else {}
+
+    existing = {}
+    pending = {}
+    for series_id, start in sorted(wanted):
+        if (series_id, start) in done:
+            # omitida (conflicto al crear la serie) => sin cita
+            appt = linked.get(done[(series_id, start)])
+            if appt is not None:
+                existing[(series_id, start)] = appt
+            continue
+
+        series = series_map[series_id]
+        pending[(series_id, start)] = VirtualOccurrence(
+            series_id=series.id,
+            patient_id=series.patient_id,
+            user_id=series.user_id,
+            start_time=start,
+            duration_minutes=series.duration_minutes,
+            notes=series.notes,
+            created_at=series.created_at,
+            created_by=series.created_by,
+        )
+
+    return existing, pending
+
+
+def _create_occurrence_rows(
+    db: Session,
+    current_user: User,
+    occurrences: Iterable[VirtualOccurrence],
+) -> Dict[Tuple[int, datetime], Appointment]:
+    """Ocurrencias virtuales -> filas en appointments + excepción de la serie, SIN commit."""
+    created = {}
+    for occ in occurrences:
+        appt = Appointment(
+            patient_id=occ.patient_id,
+            user_id=occ.user_id,
+            start_time=occ.start_time,
+            duration_minutes=occ.duration_minutes,
+            status="scheduled",
+            notes=occ.notes,
+            created_by=current_user.id
+        )
+        db.add(appt)
+        created[(occ.series_id, occ.start_time)] = appt
+
+    if created:
+        db.flush()
+        for (series_id, occurrence_start), appt in created.items():
+            db.add(AppointmentSeriesException(
+                series_id=series_id,
+                occurrence_start=occurrence_start,
+                appointment_id=appt.id,
+                created_by=current_user.id
+            ))
+            publish_agenda_event(
+                db, appt.user_id, APPOINTMENT_CREATED,
+                id=appt.id, start_time=appt.start_time, status=appt.status, series_id=series_id,
+            )
+
+    return created
+
+
+def _materialize_occurrences(
+    db: Session,
+    current_user: User,
+    occurrences: Iterable[Tuple[int, datetime]],
+) -> Dict[Tuple[int, datetime], Appointment]:
+    """
+    ✅ (series_id, inicio) -> cita real (ya materializada o creada aquí), SIN commit
+    (el caller sigue en la misma transacción). Ver _lookup_occurrences.
+    """
+    existing, pending = _lookup_occurrences(db, current_user, occurrences)
+    existing.update(_create_occurrence_rows(db, current_user, pending.values()))
+    return existing
+
+
+def _resolve_appointment(db: Session, current_user: User, appointment_id: str, not_found: str) -> Appointment:
+    """
+    Cita activa por id real (entero) o por id de ocurrencia virtual ("s{serie}:{inicio}",
+    ver occurrence_key): la ocurrencia se materializa en la transacción del cambio que sigue.
+    """
+    appt = None
+    if appointment_id.isdigit():
+        # paciente en la misma query: la respuesta lleva patient_name
+        query = db.query(Appointment).options(joinedload(Appointment.patient)).filter(
+            Appointment.id == int(appointment_id),
+            Appointment.is_active == True
+        )
+
+        if current_user.role != "admin":
+            target_user_id = get_target_user_id(db, current_user)
+            query = query.filter(Appointment.user_id == target_user_id)
+
+        appt = query.first()
+    else:
+        key = parse_occurrence_key(appointment_id)
+        if key is not None:
+            appt = _materialize_occurrences(db, current_user, [key]).get(key)
+            if appt is not None and not appt.is_active:
+                appt = None
+
+    if not appt:
+        raise HTTPException(status_code=404, detail=not_found)
+    return appt
+
+
+@router.post("/series/{series_id}/materialize", response_model=AppointmentResponse)
+def materialize_series_occurrence(
+    series_id: int,
+    data: AppointmentSeriesMaterialize,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(ALLOWED_ROLES))
+):
+    """
+    ✅ Convierte UNA ocurrencia virtual en una cita real (fila en appointments).
+    Después se edita / completa / marca no-show / cancela con los endpoints normales.
+    """
+    series = _series_access_query(db, current_user, series_id).first()
+    if not series:
+        raise HTTPException(status_code=404, detail="Serie no encontrada o sin acceso")
+
+    # se guarda naive en hora local, igual que start_time de las citas
+    occurrence_start = to_local_naive(data.occurrence_start)
+
+    if not is_series_occurrence(series, occurrence_start):
+        raise HTTPException(status_code=400, detail="Ese horario no corresponde a una ocurrencia de la serie")
+
+    already = db.query(AppointmentSeriesException).filter(
+        AppointmentSeriesException.series_id == series.id,
+        AppointmentSeriesException.occurrence_start == occurrence_start
+    ).first()
+    if already:
+        raise HTTPException(status_code=400, detail="Esa ocurrencia ya fue materializada u omitida")
+
+    patient = db.query(Patient).filter(Patient.id == series.patient_id).first()
+
+    appt = _materialize_occurrences(db, current_user, [(series.id, occurrence_start)])[(series.id, occurrence_start)]
+    refresh_patient_stats(db, [appt.patient_id])
+
+    db.commit()
+    db.refresh(appt)
+
+    response = _appointment_to_response(appt, patient_name=getattr(patient, "full_name", None))
+    response["series_id"] = series.id
+    return response
+
+
+@router.delete("/series/{series_id}")
+def cancel_series(
+    series_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(ALLOWED_ROLES))
+):
+    """
+    ✅ Desactiva la regla: las ocurrencias virtuales dejan de aparecer.
+    Las citas ya materializadas NO se tocan.
+    """
+    series = _series_access_query(db, current_user, series_id).first()
+    if not series:
+        raise HTTPException(status_code=404, detail="Serie no encontrada o sin acceso")
+
+    series.is_active = False
+    series.updated_by = current_user.id
+    series.updated_at = datetime.utcnow()
+    publish_agenda_event(db, series.user_id, SERIES_CANCELLED, id=series.id)
+
+    db.commit()
+    return {"message": "Serie desactivada correctamente"}
+
+
+# =========================
+# ✅ Cambios de estado en lote (cierre del día en 1 request)
+# =========================
+@router.post("/batch-status", response_model=AppointmentBatchStatusResponse)
+def batch_status(
+    payload: AppointmentBatchStatusRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(ALLOWED_ROLES))
+):
+    """
+    Aplica complete / no_show / cancel a varias citas:
+    - 1 query para cargar todas las citas (con el filtro de agenda)
+    - ids de ocurrencias virtuales ("s{serie}:{inicio}"): la regla se evalúa sobre la
+      ocurrencia y solo las aceptadas se materializan (en la misma transacción)
+    - mismas reglas que los endpoints unitarios, evaluadas por item
+    - 1 UPDATE por acción con los ids aceptados
+    Los items rechazados no abortan el lote ni escriben nada: se reportan en results.
+    """
+    ids = set()
+    occurrence_keys = {}
+    for item in payload.items:
+        if isinstance(item.id, int) or item.id.isdigit():
+            ids.add(int(item.id))
+        else:
+            key = parse_occurrence_key(item.id)
+            if key is not None:
+                occurrence_keys[item.id] = key
+
+    appts = {}
+    if ids:
+        query = db.query(Appointment).filter(
+            Appointment.id.in_(ids),
+            Appointment.is_active == True
+        )
+
+        if current_user.role != "admin":
+            target_user_id = get_target_user_id(db, current_user)
+            query = query.filter(Appointment.user_id == target_user_id)
+
+        appts = {a.id: a for a in query.all()}
+
+    # ocurrencia virtual -> cita ya materializada, o VirtualOccurrence (sin fila todavía)
+    existing, pending = _lookup_occurrences(db, current_user, occurrence_keys.values())
+    for appt in existing.values():
+        if appt.is_active:
+            appts[appt.id] = appt
+
+    now = datetime.utcnow()
+    results = []
+    accepted = {action: [] for action in STATUS_TRANSITIONS}
+    # (acción, ocurrencia, entrada de results) aceptadas que aún no tienen fila
+    accepted_pending = []
+    seen = set()
+
+    for item in payload.items:
+        appt = None
+        if item.id in occurrence_keys:
+            key = occurrence_keys[item.id]
+            appt = appts.get(getattr(existing.get(key), "id", None)) or pending.get(key)
+        elif str(item.id).isdigit():
+            appt = appts.get(int(item.id))
+
+        if not appt:
+            results.append({
+                "id": item.id, "action": item.action, "ok": False,
+                "status_code": 404, "detail": "Cita no encontrada o sin acceso",
+            })
+            continue
+
+        # id real => cita; virtual => (serie, inicio)
+        is_pending = isinstance(appt, VirtualOccurrence)
+        appointment_id = None if is_pending else appt.id
+        seen_key = (appt.series_id, appt.start_time) if is_pending else appt.id
+
+        if seen_key in seen:
+            results.append({
+                "id": item.id, "appointment_id": appointment_id, "action": item.action, "ok": False,
+                "status_code": 400, "detail": "Cita repetida en el lote",
+            })
+            continue
+        seen.add(seen_key)
+
+        check, values = STATUS_TRANSITIONS[item.action]
+        try:
+            check(current_user, appt)
+        except HTTPException as e:
+            results.append({
+                "id": item.id, "appointment_id": appointment_id, "action": item.action, "ok": False,
+                "status_code": e.status_code, "detail": e.detail,
+            })
+            continue
+
+        entry = {
+            "id": item.id, "appointment_id": appointment_id, "action": item.action, "ok": True,
+            "status": values["status"],
+        }
+        results.append(entry)
+        if is_pending:
+            accepted_pending.append((item.action, appt, entry))
+        else:
+            accepted[item.action].append(appt.id)
+
+    # solo las ocurrencias aceptadas pasan a ser filas
+    created = _create_occurrence_rows(db, current_user, [occ for _, occ, _ in accepted_pending])
+    for action, occ, entry in accepted_pending:
+        appt = created[(occ.series_id, occ.start_time)]
+        appts[appt.id] = appt
+        accepted[action].append(appt.id)
+        entry["appointment_id"] = appt.id
+
+    updated = 0
+    for action, action_ids in accepted.items():
+        if not action_ids:
+            continue
+        _, values = STATUS_TRANSITIONS[action]
+        result = db.execute(
+            update(Appointment)
+            .where(Appointment.id.in_(action_ids), Appointment.is_active == True)
+            .values(**values, updated_by=current_user.id, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        updated += result.rowcount
+
+        # 1 evento por agenda (admin puede mezclar agendas en el lote)
+        by_agenda = {}
+        for i in action_ids:
+            by_agenda.setdefault(appts[i].user_id, []).append(i)
+        for agenda_id, agenda_appt_ids in by_agenda.items():
+            publish_agenda_event(db, agenda_id, APPOINTMENT_STATUS_CHANGED, ids=agenda_appt_ids, status=values["status"])
+
+    if updated:
+        # UPDATE en lote (synchronize_session=False): no pasa por el flush
+        bump_agenda_versions(db, {
+            appts[i].user_id for action_ids in accepted.values() for i in action_ids
+        })
+        stamp_change_versions(db, Appointment, [i for action_ids in accepted.values() for i in action_ids])
+
+    stats_patient_ids = {appts[i].patient_id for action_ids in accepted.values() for i in action_ids}
+    if stats_patient_ids:
+        refresh_patient_stats(db, stats_patient_ids)
+
+    db.commit()
+
+    return {"updated": updated, "results": results}
+
+
+@router.get("/", response_model=List[AppointmentResponse], dependencies=[AGENDA_ETAG])
+async def list_appointments(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    status: Optional[str] = None,
+    patient_id: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None
+):
+    # ✅ async: la lógica ORM (sync) corre con run_sync sobre el driver async -> no ocupa thread del pool
+    rows = await db.run_sync(_list_appointments, current_user, status, patient_id, date_from, date_to)
+    return fast_list_response(AppointmentResponse, rows)
+
+
+def _list_appointments(
+    db: Session,
+    current_user: User,
     status: Optional[str] = None,
     patient_id: Optional[int] = None,
     date_from: Optional[str] = None,
@@ -370,12 +1052,14 @@ def list_appointments(
 ):
     status_norm = _normalize_status_param(status)
 
-    query = db.query(Appointment)
+    # ✅ Proyección a Row (sin identity map): las columnas se llaman como los campos de AppointmentResponse
+    query = db.query(*APPOINTMENT_LIST_COLUMNS)
 
     if status_norm != "cancelled":
         query = query.filter(Appointment.is_active == True)
         query = query.filter(Appointment.patient.has(Patient.is_active == True))
 
+    target_user_id = None
     if current_user.role != "admin":
         target_user_id = get_target_user_id(db, current_user)
         query = query.filter(Appointment.user_id == target_user_id)
@@ -392,6 +1076,9 @@ def list_appointments(
     if patient_id is not None:
         query = query.filter(Appointment.patient_id == patient_id)
 
+    start = None
+    end = None
+
     if date_from:
         try:
             start = datetime.fromisoformat(date_from + "T00:00:00")
@@ -409,18 +1096,21 @@ def list_appointments(
     query = query.outerjoin(
         Patient,
         (Patient.id == Appointment.patient_id) & (Patient.is_active == True)
-    ).add_columns(Patient.full_name)
+    )
 
-    rows = query.order_by(Appointment.start_time.asc()).all()
+    result = query.order_by(Appointment.start_time.asc()).all()
 
-    result = []
-    for appt, full_name in rows:
-        result.append(_appointment_to_response(appt, patient_name=full_name))
+    # ✅ Ocurrencias virtuales de series (siempre están en "scheduled")
+    if status_norm in (None, "scheduled"):
+        virtual = list(iter_virtual_occurrences(db, start, end, user_id=target_user_id, patient_id=patient_id))
+        if virtual:
+            result.extend(virtual)
+            result.sort(key=lambda r: r.start_time)
 
     return result
 
 
-@router.get("/availability", operation_id="get_appointments_availability")
+@router.get("/availability", operation_id="get_appointments_availability", dependencies=[AGENDA_ETAG_NOW])
 def get_availability(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -459,7 +1149,15 @@ def get_availability(
     range_start_dt = datetime.combine(d_from, time(0, 0))
     range_end_dt = datetime.combine(d_to, time(23, 59, 59))
 
-    appts = db.query(Appointment).filter(
+    # ✅ nombre y alias del paciente en la misma query (mismos atributos que VirtualOccurrence)
+    appts = db.query(
+        Appointment.start_time,
+        Appointment.duration_minutes,
+        Patient.full_name.label("patient_name"),
+        Patient.alias.label("patient_alias"),
+    ).outerjoin(
+        Patient, Patient.id == Appointment.patient_id
+    ).filter(
         Appointment.is_active == True,
         Appointment.user_id == target_user_id,
         Appointment.start_time >= range_start_dt,
@@ -467,19 +1165,20 @@ def get_availability(
         Appointment.status.in_(["scheduled"])
     ).all()
 
+    # ✅ + ocurrencias virtuales de series en el rango (ya traen patient_name / patient_alias)
+    appts.extend(iter_virtual_occurrences(db, range_start_dt, range_end_dt, user_id=target_user_id))
+
     # 🔥 RANGOS CON PACIENTE
     appt_ranges = []
     for ap in appts:
         ap_start_utc = _as_utc_aware(ap.start_time)
         ap_end_utc = _as_utc_aware(ap.start_time + timedelta(minutes=ap.duration_minutes or 0))
 
-        patient = db.query(Patient).filter(Patient.id == ap.patient_id).first()
-
         appt_ranges.append({
             "start": ap_start_utc,
             "end": ap_end_utc,
-            "patient_name": getattr(patient, "full_name", None),
-            "alias": getattr(patient, "alias", None)
+            "patient_name": ap.patient_name,
+            "alias": ap.patient_alias
         })
 
     day_enabled_map = {
@@ -579,13 +1278,13 @@ def get_availability(
     }
 
 
-@router.get("/{appointment_id}", response_model=AppointmentResponse)
+@router.get("/{appointment_id}", response_model=AppointmentResponse, dependencies=[AGENDA_ETAG])
 def get_appointment(
     appointment_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    query = db.query(Appointment).filter(
+    query = db.query(Appointment).options(joinedload(Appointment.patient)).filter(
         Appointment.id == appointment_id,
         Appointment.is_active == True
     )
@@ -598,31 +1297,18 @@ def get_appointment(
     if not appt:
         raise HTTPException(status_code=404, detail="Cita no encontrada")
 
-    patient = db.query(Patient).filter(Patient.id == appt.patient_id).first()
-    patient_name = getattr(patient, "full_name", None) if patient else None
-
-    return _appointment_to_response(appt, patient_name=patient_name)
+    return _appointment_to_response(appt, patient_name=_patient_name(appt))
 
 
 @router.put("/{appointment_id}", response_model=AppointmentResponse)
 def update_appointment(
-    appointment_id: int,
+    appointment_id: str,
     data: AppointmentUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(ALLOWED_ROLES))
 ):
-    query = db.query(Appointment).filter(
-        Appointment.id == appointment_id,
-        Appointment.is_active == True
-    )
-
-    if current_user.role != "admin":
-        target_user_id = get_target_user_id(db, current_user)
-        query = query.filter(Appointment.user_id == target_user_id)
-
-    appt = query.first()
-    if not appt:
-        raise HTTPException(status_code=404, detail="Cita no encontrada")
+    # id real o id de ocurrencia virtual de una serie (se materializa aquí)
+    appt = _resolve_appointment(db, current_user, appointment_id, "Cita no encontrada")
 
     if appt.status in ["completed", "no_show"]:
         raise HTTPException(
@@ -659,46 +1345,45 @@ def update_appointment(
         exclude_id=appt.id
     )
 
+    previous_status = appt.status
     for field, value in data.dict(exclude_unset=True).items():
         setattr(appt, field, value)
 
     appt.updated_by = current_user.id
     appt.updated_at = datetime.utcnow()
+    refresh_patient_stats(db, [appt.patient_id])
+    publish_agenda_event(
+        db, appt.user_id,
+        APPOINTMENT_STATUS_CHANGED if appt.status != previous_status else APPOINTMENT_UPDATED,
+        id=appt.id, start_time=appt.start_time, status=appt.status,
+    )
+
+    # antes del commit: el paciente ya vino con la cita (el commit lo expira)
+    patient_name = _patient_name(appt)
 
     db.commit()
     db.refresh(appt)
 
-    patient = db.query(Patient).filter(Patient.id == appt.patient_id).first()
-    patient_name = getattr(patient, "full_name", None) if patient else None
-
     return _appointment_to_response(appt, patient_name=patient_name)
 
 
 @router.delete("/{appointment_id}")
 def cancel_appointment(
-    appointment_id: int,
+    appointment_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(ALLOWED_ROLES))
 ):
-    query = db.query(Appointment).filter(
-        Appointment.id == appointment_id,
-        Appointment.is_active == True
-    )
+    # id real o id de ocurrencia virtual de una serie (se materializa aquí)
+    appt = _resolve_appointment(db, current_user, appointment_id, "Cita no encontrada")
 
-    if current_user.role != "admin":
-        target_user_id = get_target_user_id(db, current_user)
-        query = query.filter(Appointment.user_id == target_user_id)
-
-    appt = query.first()
-    if not appt:
-        raise HTTPException(status_code=404, detail="Cita no encontrada")
-
-    ensure_can_cancel_appointment(current_user, appt)
+    _check_can_cancel(current_user, appt)
 
     appt.is_active = False
     appt.status = "cancelled"
     appt.updated_by = current_user.id
     appt.updated_at = datetime.utcnow()
+    refresh_patient_stats(db, [appt.patient_id])
+    publish_agenda_event(db, appt.user_id, APPOINTMENT_STATUS_CHANGED, id=appt.id, status=appt.status)
 
     db.commit()
     return {"message": "Cita cancelada/desactivada correctamente"}
@@ -706,83 +1391,51 @@ def cancel_appointment(
 
 @router.put("/{appointment_id}/no-show", response_model=AppointmentResponse)
 def mark_no_show(
-    appointment_id: int,
+    appointment_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(ALLOWED_ROLES))
 ):
-    query = db.query(Appointment).filter(
-        Appointment.id == appointment_id,
-        Appointment.is_active == True
-    )
+    # id real o id de ocurrencia virtual de una serie (se materializa aquí)
+    appt = _resolve_appointment(db, current_user, appointment_id, "Cita no encontrada o sin acceso")
 
-    if current_user.role != "admin":
-        target_user_id = get_target_user_id(db, current_user)
-        query = query.filter(Appointment.user_id == target_user_id)
-
-    appt = query.first()
-    if not appt:
-        raise HTTPException(status_code=404, detail="Cita no encontrada o sin acceso")
-
-    ensure_can_mark_no_show(current_user, appt)
-
-    if appt.status != "scheduled":
-        raise HTTPException(
-            status_code=400,
-            detail=f"No puedes marcar no-show porque la cita está en estado '{appt.status}'"
-        )
-
-    now = datetime.utcnow()
-    if appt.start_time > now:
-        raise HTTPException(
-            status_code=400,
-            detail="No puedes marcar no-show: la cita aún no ha ocurrido (start_time está en el futuro)"
-        )
+    _check_can_no_show(current_user, appt)
 
     appt.status = "no_show"
     appt.updated_by = current_user.id
     appt.updated_at = datetime.utcnow()
+    refresh_patient_stats(db, [appt.patient_id])
+    publish_agenda_event(db, appt.user_id, APPOINTMENT_STATUS_CHANGED, id=appt.id, status=appt.status)
+
+    # antes del commit: el paciente ya vino con la cita (el commit lo expira)
+    patient_name = _patient_name(appt)
 
     db.commit()
     db.refresh(appt)
 
-    patient = db.query(Patient).filter(Patient.id == appt.patient_id).first()
-    patient_name = getattr(patient, "full_name", None) if patient else None
-
     return _appointment_to_response(appt, patient_name=patient_name)
 
 
 @router.put("/{appointment_id}/complete", response_model=AppointmentResponse)
 def complete_appointment(
-    appointment_id: int,
+    appointment_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(ALLOWED_ROLES))
 ):
-    query = db.query(Appointment).filter(
-        Appointment.id == appointment_id,
-        Appointment.is_active == True
-    )
+    # id real o id de ocurrencia virtual de una serie (se materializa aquí)
+    appt = _resolve_appointment(db, current_user, appointment_id, "Cita no encontrada o sin acceso")
 
-    if current_user.role != "admin":
-        target_user_id = get_target_user_id(db, current_user)
-        query = query.filter(Appointment.user_id == target_user_id)
-
-    appt = query.first()
-    if not appt:
-        raise HTTPException(status_code=404, detail="Cita no encontrada o sin acceso")
-
-    ensure_can_complete_appointment(current_user, appt)
-
-    if appt.status == "cancelled":
-        raise HTTPException(status_code=400, detail="No puedes completar una cita cancelada")
+    _check_can_complete(current_user, appt)
 
     appt.status = "completed"
     appt.updated_by = current_user.id
     appt.updated_at = datetime.utcnow()
+    refresh_patient_stats(db, [appt.patient_id])
+    publish_agenda_event(db, appt.user_id, APPOINTMENT_STATUS_CHANGED, id=appt.id, status=appt.status)
+
+    # antes del commit: el paciente ya vino con la cita (el commit lo expira)
+    patient_name = _patient_name(appt)
 
     db.commit()
     db.refresh(appt)
 
-    patient = db.query(Patient).filter(Patient.id == appt.patient_id).first()
-    patient_name = getattr(patient, "full_name", None) if patient else None
-
     return _appointment_to_response(appt, patient_name=patient_name)
\ No newline at end of file
@@ -1,15 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
+from jose import JWTError
+from typing import Optional
+import math
 import os
 
+from app.schemas.auth import LogoutRequest, TokenRefreshRequest
 from app.schemas.user import UserCreate
 from app.models.user import User
-from app.db.deps import get_db
+from app.db.deps import get_db, get_async_db
+from app.core.auth import get_current_user_async, oauth2_scheme
+from app.core.config import LOGIN_RATE_LIMIT_ENABLED
+from app.core.password_hashing import PASSWORD_HASHER, PasswordHasherBusy
+from app.core.rate_limit import LOGIN_EMAIL_LIMITER, LOGIN_IP_LIMITER, client_ip
+from app.core.revocation import REVOCATION_LIST, revoke_token
 from app.core.security import (
+    ACCESS_TOKEN_TYPE,
+    REFRESH_TOKEN_TYPE,
     hash_password,
-    verify_password,
-    create_access_token
+    create_token_pair,
+    decode_token,
 )
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
@@ -74,12 +87,32 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     return {"message": "Usuario creado correctamente"}
 
 
+def _rate_limited(wait: float):
+    return HTTPException(
+        status_code=429,
+        detail="Demasiados intentos de inicio de sesión. Intenta más tarde.",
+        headers={"Retry-After": str(math.ceil(wait))},
+    )
+
+
 @router.post("/login")
-def login(
+async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = db.query(User).filter(User.email == form_data.username).first()
+    """
+    ✅ async: bcrypt corre en PASSWORD_HASHER (pool propio y acotado), no en el
+    threadpool de requests => una ráfaga de logins no frena al resto de endpoints.
+    """
+    # 🔥 rate limit por IP y por email ANTES de la DB y de bcrypt
+    if LOGIN_RATE_LIMIT_ENABLED:
+        wait = LOGIN_IP_LIMITER.take(client_ip(request)) or LOGIN_EMAIL_LIMITER.take(form_data.username.strip().lower())
+        if wait:
+            raise _rate_limited(wait)
+
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalars().first()
 
     if not user:
         raise HTTPException(status_code=401, detail="Credenciales incorrectas")
@@ -87,16 +120,105 @@ def login(
     if hasattr(user, "is_active") and not user.is_active:
         raise HTTPException(status_code=401, detail="Usuario desactivado")
 
-    if not verify_password(form_data.password, user.password):
+    # no retener la conexión mientras bcrypt trabaja
+    await db.commit()
+
+    try:
+        valid, new_hash = await PASSWORD_HASHER.verify_and_update(form_data.password, user.password)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Servicio ocupado. Intenta de nuevo en unos segundos.",
+            headers={"Retry-After": "1"},
+        )
+
+    if not valid:
         raise HTTPException(status_code=401, detail="Credenciales incorrectas")
 
-    access_token = create_access_token(
-        data={"sub": user.email, "role": user.role}
-    )
+    # ✅ hash con costo viejo => se guarda el nuevo (BCRYPT_ROUNDS).
+    # UPDATE directo: no es un cambio de contraseña, no debe revocar sus otras sesiones
+    if new_hash:
+        await db.execute(update(User).where(User.id == user.id).values(password=new_hash))
+        await db.commit()
+
+    return {
+        **create_token_pair(user),
+        "email": user.email,
+        "role": user.role
+    }
+
+
+# =========================
+# POST /auth/refresh
+# =========================
+@router.post("/refresh")
+async def refresh(
+    payload: TokenRefreshRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    ✅ Refresh token => par nuevo (access + refresh). Rotación: el refresh usado queda
+    revocado; presentarlo otra vez => 401.
+    Es el único punto (además del login) que lee users: rol y psicóloga salen frescos.
+    """
+    try:
+        claims = decode_token(payload.refresh_token, REFRESH_TOKEN_TYPE)
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Refresh token inválido o expirado")
+
+    if REVOCATION_LIST.stale:
+        await db.run_sync(REVOCATION_LIST.refresh)
+    if REVOCATION_LIST.is_revoked(claims["jti"], claims["uid"], claims["iat"]):
+        raise HTTPException(status_code=401, detail="Refresh token revocado")
+
+    result = await db.execute(select(User).where(User.id == claims["uid"]))
+    user = result.scalars().first()
+    if not user or not user.is_active:
+        raise HTTPException(status_code=401, detail="Usuario desactivado")
+
+    # jti único en revoked_tokens: dos refresh simultáneos con el mismo token => uno pierde
+    if not await db.run_sync(revoke_token, claims):
+        raise HTTPException(status_code=401, detail="Refresh token revocado")
+    await db.commit()
 
     return {
-        "access_token": access_token,
-        "token_type": "bearer",
+        **create_token_pair(user),
         "email": user.email,
         "role": user.role
-    }
\ No newline at end of file
+    }
+
+
+# =========================
+# POST /auth/logout
+# =========================
+@router.post("/logout")
+async def logout(
+    payload: Optional[LogoutRequest] = None,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
+):
+    """
+    ✅ Revoca el access token (y el refresh token si viene en el body): deja de valer
+    de inmediato en todos los workers.
+    """
+    to_revoke = []
+    try:
+        to_revoke.append(decode_token(token, ACCESS_TOKEN_TYPE))
+    except JWTError:
+        # token del formato viejo (sin jti): no se puede revocar, expira solo
+        pass
+
+    if payload and payload.refresh_token:
+        try:
+            claims = decode_token(payload.refresh_token, REFRESH_TOKEN_TYPE)
+        except JWTError:
+            claims = None
+        if claims and claims["uid"] == current_user.id:
+            to_revoke.append(claims)
+
+    for claims in to_revoke:
+        await db.run_sync(revoke_token, claims)
+    await db.commit()
+
+    return {"message": "Sesión cerrada correctamente"}
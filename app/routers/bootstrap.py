@@ -0,0 +1,75 @@
+import asyncio
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.async_session import AsyncSessionLocal
+from app.db.deps import get_async_db
+from app.core.auth import require_roles_async
+from app.core.caches import cached_clinic_settings
+from app.core.conditional_get import conditional_get
+from app.core.config import AGENDA_ETAG_TIME_BUCKET_SECONDS
+from app.core.fast_json import fast_model_response
+from app.models.user import User
+from app.routers import appointment_blocks, clinic_settings, dashboard, patients
+from app.schemas.bootstrap import BootstrapResponse
+
+router = APIRouter(prefix="/bootstrap", tags=["Bootstrap"])
+
+# ✅ Incluye métricas / próximas citas (dependen de "ahora") => bucket de tiempo como /dashboard
+AGENDA_ETAG_NOW = Depends(conditional_get(AGENDA_ETAG_TIME_BUCKET_SECONDS))
+
+ALLOWED_ROLES = ["admin", "psychologist", "assistant"]
+
+
+async def _run_section(fn, *args):
+    """
+    Cada sección en su propia AsyncSession (= su propia conexión): así corren en
+    paralelo. Ninguna retiene una conexión mientras espera otra (sin hold-and-wait
+    sobre el pool).
+    """
+    async with AsyncSessionLocal() as db:
+        return await db.run_sync(fn, *args)
+
+
+def _settings(db):
+    # cacheado en proceso: casi siempre sin query (ni conexión)
+    return cached_clinic_settings(lambda: clinic_settings.get_settings(db))
+
+
+# =========================
+# GET /bootstrap
+# =========================
+@router.get("/", response_model=BootstrapResponse, dependencies=[AGENDA_ETAG_NOW])
+async def bootstrap(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_roles_async(ALLOWED_ROLES)),
+):
+    """
+    ✅ Todo lo que pinta la app al entrar, en 1 round trip:
+    /users/me, /clinic-settings, /dashboard/metrics, /dashboard/upcoming,
+    /appointments/blocks y /patients (con sus parámetros por defecto).
+
+    Autenticación, agenda y versión (ETag) se resuelven una sola vez; cada sección
+    reutiliza la lógica (_impl) de su endpoint y corre en paralelo con las demás.
+    Con If-None-Match y la agenda sin cambios => 304 sin tocar las secciones.
+    """
+    # la conexión de la request vuelve al pool antes de abrir las de las secciones
+    await db.commit()
+
+    settings, metrics, upcoming, blocks, patient_rows = await asyncio.gather(
+        _run_section(_settings),
+        _run_section(dashboard._get_metrics, current_user),
+        _run_section(dashboard._upcoming_appointments, current_user),
+        _run_section(appointment_blocks._safe_list_query, current_user),
+        _run_section(patients._list_patients, current_user),
+    )
+
+    return fast_model_response(BootstrapResponse, {
+        "user": current_user,
+        "settings": settings,
+        "metrics": metrics,
+        "upcoming": upcoming,
+        "blocks": blocks,
+        "patients": patient_rows,
+    })
@@ -1,14 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, date, time
 
-from app.db.deps import get_db
-from app.core.auth import get_current_user
+from app.db.deps import get_async_db
+from app.core.auth import get_current_user_async
+from app.core.conditional_get import conditional_get
 from app.models.user import User
+from app.core.caches import cached_clinic_settings
+from app.core.agenda import get_target_user_id
 from app.models.appointment import Appointment
 from app.models.appointment_block import AppointmentBlock
 from app.models.clinic_settings import ClinicSettings
 from app.models.patient import Patient
+from app.core.recurrence import iter_virtual_occurrences
+from app.db.read_models import CALENDAR_APPOINTMENT_COLUMNS, CALENDAR_BLOCK_COLUMNS
 from app.schemas.calendar import (
     CalendarEventsResponse,
     CalendarDaySummary,
@@ -18,51 +24,22 @@ from app.schemas.calendar import (
 
 router = APIRouter(prefix="/calendar", tags=["Calendar"])
 
-SLOT_MINUTES_DEFAULT = 30
-
-
-# =========================
-# Helpers: agenda compartida
-# =========================
-def get_owner_user(db: Session) -> User:
-    """
-    Busca la psicóloga activa dueña de la agenda.
-    Esta función replica la lógica que ya usas en otros módulos.
-    """
-    owner = (
-        db.query(User)
-        .filter(User.role == "psychologist", User.is_active == True)
-        .order_by(User.id.asc())
-        .first()
-    )
-    if not owner:
-        raise HTTPException(status_code=500, detail="No existe psicóloga activa en el sistema.")
-    return owner
 
+# ✅ GET condicional (ETag por versión de agenda): 304 antes de correr las queries
+AGENDA_ETAG = Depends(conditional_get())
 
-def get_target_user_id(db: Session, current_user: User) -> int:
-    """
-    Determina de qué agenda debe leer/escribir el usuario actual.
-
-    psychologist -> su propia agenda
-    assistant    -> agenda de la psychologist dueña
-    admin        -> compatibilidad actual: su propia agenda
-    """
-    if current_user.role == "assistant":
-        # Si assistant tiene owner_user_id configurado, usarlo
-        if getattr(current_user, "owner_user_id", None):
-            return current_user.owner_user_id
-
-        # Fallback compatible con tu proyecto actual
-        return get_owner_user(db).id
-
-    return current_user.id
+SLOT_MINUTES_DEFAULT = 30
 
 
 # =========================
 # Helpers: settings
 # =========================
 def get_settings(db: Session) -> ClinicSettings:
+    """✅ Cacheado en proceso (solo lectura); PUT /settings lo invalida en todos los workers."""
+    return cached_clinic_settings(lambda: _load_settings(db))
+
+
+def _load_settings(db: Session) -> ClinicSettings:
     """
     Obtiene configuración clínica global.
     Si no existe, crea una por compatibilidad.
@@ -114,12 +91,22 @@ def _overlap(a_start: datetime, a_end: datetime, b_start: datetime, b_end: datet
 # =========================
 # A) GET /calendar/events?from_date=YYYY-MM-DD&to_date=YYYY-MM-DD
 # =========================
-@router.get("/events", response_model=CalendarEventsResponse)
-def get_calendar_events(
+@router.get("/events", response_model=CalendarEventsResponse, dependencies=[AGENDA_ETAG])
+async def get_calendar_events(
+    from_date: str,
+    to_date: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    # ✅ async: la lógica ORM (sync) corre con run_sync sobre el driver async -> no ocupa thread del pool
+    return await db.run_sync(_get_calendar_events, current_user, from_date, to_date)
+
+
+def _get_calendar_events(
+    db: Session,
+    current_user: User,
     from_date: str,
     to_date: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
     d_from = _parse_date_yyyy_mm_dd(from_date, "from_date")
     d_to = _parse_date_yyyy_mm_dd(to_date, "to_date")
@@ -138,10 +125,10 @@ def get_calendar_events(
     range_end = datetime.combine(d_to, time(23, 59, 59))
 
     # =========================
-    # Citas de la agenda compartida
+    # Citas de la agenda compartida (solo start_time + status: se cuentan por día)
     # =========================
     appts = (
-        db.query(Appointment)
+        db.query(*CALENDAR_APPOINTMENT_COLUMNS)
         .filter(
             Appointment.is_active == True,
             Appointment.user_id == target_user_id,
@@ -151,11 +138,14 @@ def get_calendar_events(
         .all()
     )
 
+    # ✅ + ocurrencias virtuales de series (solo la ventana pedida)
+    appts.extend(iter_virtual_occurrences(db, range_start, range_end, user_id=target_user_id))
+
     # =========================
     # Bloqueos de la agenda compartida
     # =========================
     blocks = (
-        db.query(AppointmentBlock)
+        db.query(*CALENDAR_BLOCK_COLUMNS)
         .filter(
             AppointmentBlock.is_active == True,
             AppointmentBlock.user_id == target_user_id,
@@ -246,11 +236,19 @@ def get_calendar_events(
 # =========================
 # B) GET /calendar/day-slots?date_str=YYYY-MM-DD
 # =========================
-@router.get("/day-slots", response_model=DaySlotsResponse)
-def get_day_slots(
+@router.get("/day-slots", response_model=DaySlotsResponse, dependencies=[AGENDA_ETAG])
+async def get_day_slots(
+    date_str: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    return await db.run_sync(_get_day_slots, current_user, date_str)
+
+
+def _get_day_slots(
+    db: Session,
+    current_user: User,
     date_str: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
     d = _parse_date_yyyy_mm_dd(date_str, "date_str")
     settings = get_settings(db)
@@ -276,6 +274,12 @@ def get_day_slots(
         .all()
     )
 
+    # ✅ + ocurrencias virtuales de series del día
+    appts.extend(
+        occ for occ in iter_virtual_occurrences(db, day_open, day_close, user_id=target_user_id)
+        if occ.start_time < day_close
+    )
+
     # =========================
     # Bloqueos del día de la agenda compartida
     # =========================
@@ -293,13 +297,14 @@ def get_day_slots(
     # =========================
     # 🔥 NUEVO: MAPA DE PACIENTES (NO ROMPE NADA)
     # =========================
-    patient_map = {}
-    for a in appts:
-        patient = db.query(Patient).filter(Patient.id == a.patient_id).first()
-        patient_map[a.id] = {
-            "name": getattr(patient, "full_name", None),
-            "alias": getattr(patient, "alias", None),
-        }
+    # ✅ 1 query para todos los pacientes del día (antes: 1 por paciente)
+    patient_ids = {a.patient_id for a in appts}
+    patient_map = {patient_id: {"name": None, "alias": None} for patient_id in patient_ids}
+    if patient_ids:
+        for patient_id, full_name, alias in db.query(Patient.id, Patient.full_name, Patient.alias).filter(
+            Patient.id.in_(patient_ids)
+        ):
+            patient_map[patient_id] = {"name": full_name, "alias": alias}
 
     # =========================
     # Citas activas que sí ocupan horario
@@ -352,8 +357,8 @@ def get_day_slots(
                 start=cur.time().strftime("%H:%M"),
                 end=end.time().strftime("%H:%M"),
                 status=status,
-                patient=patient_map.get(matched_ap.id)["name"] if status == "booked" and matched_ap else None,
-                alias=patient_map.get(matched_ap.id)["alias"] if status == "booked" and matched_ap else None,
+                patient=patient_map.get(matched_ap.patient_id)["name"] if status == "booked" and matched_ap else None,
+                alias=patient_map.get(matched_ap.patient_id)["alias"] if status == "booked" and matched_ap else None,
             )
         )
 
@@ -1,15 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, true
 from typing import List, Optional
 from datetime import datetime
 
 from app.db.deps import get_db
 from app.core.auth import get_current_user
 from app.models.user import User
+from app.core.agenda import get_owner_user_id, get_target_user_id
 from app.models.patient import Patient
 from app.models.appointment import Appointment
 from app.models.note import Note
+from app.db.read_models import CLINICAL_TIMELINE_COLUMNS
 
 router = APIRouter(prefix="/clinical", tags=["Clinical"])
 
@@ -17,20 +19,6 @@ router = APIRouter(prefix="/clinical", tags=["Clinical"])
 # =========================
 # Helpers para "1 psicóloga"
 # =========================
-def get_owner_user(db: Session) -> User:
-    owner = db.query(User).filter(User.role == "psychologist", User.is_active == True).first()
-    if not owner:
-        raise HTTPException(status_code=500, detail="No existe usuario con rol 'psychologist' activo")
-    return owner
-
-
-def get_target_user_id(db: Session, current_user: User) -> int:
-    # assistant trabaja para la psicóloga
-    if current_user.role == "assistant":
-        return get_owner_user(db).id
-    return current_user.id
-
-
 def _patient_access_query(db: Session, current_user: User, patient_id: int):
     q = db.query(Patient).filter(Patient.id == patient_id, Patient.is_active == True)
 
@@ -39,7 +27,7 @@ def _patient_access_query(db: Session, current_user: User, patient_id: int):
 
     # assistant: pacientes de psicóloga
     if current_user.role == "assistant":
-        owner_id = get_owner_user(db).id
+        owner_id = get_owner_user_id(db)
         return q.filter(Patient.user_id == owner_id)
 
     # psychologist: solo los suyos
@@ -47,82 +35,182 @@ def _patient_access_query(db: Session, current_user: User, patient_id: int):
 
 
 # =========================
-# Endpoints
+# Resumen clínico (1 statement)
 # =========================
-
-@router.get("/patient/{patient_id}/summary")
-def patient_summary(
-    patient_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
+def _owner_id_subquery():
     """
-    ✅ Resumen clínico por paciente:
-    - datos del paciente
-    - total de citas (activas)
-    - total de notas (activas)
-    - última cita pasada (si existe)
-    - próxima cita (si existe)
+    Misma regla que get_owner_user_id, pero como subquery escalar para
+    resolver la agenda dentro del mismo statement.
     """
-    patient = _patient_access_query(db, current_user, patient_id).first()
-    if not patient:
-        raise HTTPException(status_code=404, detail="Paciente no encontrado o sin acceso")
+    return (
+        select(User.id)
+        .where(User.role == "psychologist", User.is_active == True)
+        .order_by(User.id.asc())
+        .limit(1)
+        .scalar_subquery()
+    )
 
+
+def _summary_select(current_user: User, now: datetime):
+    """
+    ✅ Resumen clínico en UN solo statement:
+    - counts como subqueries escalares correlacionadas
+    - última / próxima cita como LATERAL joins (LIMIT 1 por paciente)
+    - agenda objetivo resuelta dentro del mismo SQL (assistant -> psicóloga)
+    """
     if current_user.role == "admin":
         target_user_id = None
+    elif current_user.role == "assistant":
+        target_user_id = _owner_id_subquery()
     else:
-        target_user_id = get_target_user_id(db, current_user)
+        target_user_id = current_user.id
 
-    # Filtros de agenda (si no admin)
-    appt_q = db.query(Appointment).filter(
-        Appointment.is_active == True,
-        Appointment.patient_id == patient_id
+    appt_filters = [Appointment.is_active == True, Appointment.patient_id == Patient.id]
+    note_filters = [Note.is_active == True, Note.patient_id == Patient.id]
+
+    if target_user_id is not None:
+        appt_filters.append(Appointment.user_id == target_user_id)
+        note_filters.append(Note.user_id == target_user_id)
+
+    appointments_count = (
+        select(func.count(Appointment.id))
+        .where(*appt_filters)
+        .scalar_subquery()
     )
-    note_q = db.query(Note).filter(
-        Note.is_active == True,
-        Note.patient_id == patient_id
+    notes_count = (
+        select(func.count(Note.id))
+        .where(*note_filters)
+        .scalar_subquery()
     )
 
-    if target_user_id is not None:
-        appt_q = appt_q.filter(Appointment.user_id == target_user_id)
-        note_q = note_q.filter(Note.user_id == target_user_id)
+    last_appt = (
+        select(Appointment.id, Appointment.start_time, Appointment.duration_minutes, Appointment.status)
+        .where(*appt_filters, Appointment.start_time <= now)
+        .order_by(Appointment.start_time.desc())
+        .limit(1)
+        .lateral("last_appt")
+    )
+    next_appt = (
+        select(Appointment.id, Appointment.start_time, Appointment.duration_minutes, Appointment.status)
+        .where(*appt_filters, Appointment.start_time > now)
+        .order_by(Appointment.start_time.asc())
+        .limit(1)
+        .lateral("next_appt")
+    )
+
+    stmt = (
+        select(
+            Patient.id,
+            Patient.full_name,
+            Patient.age,
+            Patient.notes,
+            Patient.created_at,
+            Patient.is_active,
+            appointments_count.label("appointments_count"),
+            notes_count.label("notes_count"),
+            last_appt.c.id.label("last_id"),
+            last_appt.c.start_time.label("last_start_time"),
+            last_appt.c.duration_minutes.label("last_duration_minutes"),
+            last_appt.c.status.label("last_status"),
+            next_appt.c.id.label("next_id"),
+            next_appt.c.start_time.label("next_start_time"),
+            next_appt.c.duration_minutes.label("next_duration_minutes"),
+            next_appt.c.status.label("next_status"),
+        )
+        .select_from(Patient)
+        .outerjoin(last_appt, true())
+        .outerjoin(next_appt, true())
+        .where(Patient.is_active == True)
+    )
 
-    total_appointments = appt_q.count()
-    total_notes = note_q.count()
+    if target_user_id is not None:
+        stmt = stmt.where(Patient.user_id == target_user_id)
 
-    now = datetime.utcnow()
+    return stmt
 
-    last_appointment = appt_q.filter(Appointment.start_time <= now).order_by(Appointment.start_time.desc()).first()
-    next_appointment = appt_q.filter(Appointment.start_time > now).order_by(Appointment.start_time.asc()).first()
 
+def _summary_row_to_dict(row) -> dict:
     return {
         "patient": {
-            "id": patient.id,
-            "full_name": patient.full_name,
-            "age": patient.age,
-            "notes": patient.notes,  # tu campo de texto del paciente
-            "created_at": patient.created_at,
-            "is_active": patient.is_active
+            "id": row.id,
+            "full_name": row.full_name,
+            "age": row.age,
+            "notes": row.notes,  # tu campo de texto del paciente
+            "created_at": row.created_at,
+            "is_active": row.is_active
         },
         "counts": {
-            "appointments": total_appointments,
-            "notes": total_notes
+            "appointments": row.appointments_count,
+            "notes": row.notes_count
         },
-        "last_appointment": None if not last_appointment else {
-            "id": last_appointment.id,
-            "start_time": last_appointment.start_time,
-            "duration_minutes": last_appointment.duration_minutes,
-            "status": last_appointment.status
+        "last_appointment": None if row.last_id is None else {
+            "id": row.last_id,
+            "start_time": row.last_start_time,
+            "duration_minutes": row.last_duration_minutes,
+            "status": row.last_status
         },
-        "next_appointment": None if not next_appointment else {
-            "id": next_appointment.id,
-            "start_time": next_appointment.start_time,
-            "duration_minutes": next_appointment.duration_minutes,
-            "status": next_appointment.status
+        "next_appointment": None if row.next_id is None else {
+            "id": row.next_id,
+            "start_time": row.next_start_time,
+            "duration_minutes": row.next_duration_minutes,
+            "status": row.next_status
         }
     }
 
 
+# =========================
+# Endpoints
+# =========================
+
+@router.get("/patient/{patient_id}/summary")
+def patient_summary(
+    patient_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    ✅ Resumen clínico por paciente:
+    - datos del paciente
+    - total de citas (activas)
+    - total de notas (activas)
+    - última cita pasada (si existe)
+    - próxima cita (si existe)
+    """
+    stmt = _summary_select(current_user, datetime.utcnow()).where(Patient.id == patient_id)
+
+    row = db.execute(stmt).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Paciente no encontrado o sin acceso")
+
+    return _summary_row_to_dict(row)
+
+
+@router.get("/patients/summary")
+def patients_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    limit: int = 50,
+    offset: int = 0
+):
+    """
+    ✅ Variante para listas: mismo resumen para una página completa de pacientes
+    (un solo statement, en lugar de llamar al summary por cada fila).
+    """
+    if limit <= 0 or limit > 200:
+        raise HTTPException(status_code=400, detail="limit debe estar entre 1 y 200")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset debe ser >= 0")
+
+    stmt = (
+        _summary_select(current_user, datetime.utcnow())
+        .order_by(Patient.id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+
+    return [_summary_row_to_dict(row) for row in db.execute(stmt).all()]
+
+
 @router.get("/patient/{patient_id}/timeline")
 def patient_timeline(
     patient_id: int,
@@ -133,11 +221,12 @@ def patient_timeline(
     """
     ✅ Timeline clínico (últimas notas) por paciente
     """
-    patient = _patient_access_query(db, current_user, patient_id).first()
+    # solo se verifica acceso: basta el id
+    patient = _patient_access_query(db, current_user, patient_id).with_entities(Patient.id).first()
     if not patient:
         raise HTTPException(status_code=404, detail="Paciente no encontrado o sin acceso")
 
-    q = db.query(Note).filter(Note.is_active == True, Note.patient_id == patient_id)
+    q = db.query(*CLINICAL_TIMELINE_COLUMNS).filter(Note.is_active == True, Note.patient_id == patient_id)
 
     if current_user.role != "admin":
         target_user_id = get_target_user_id(db, current_user)
@@ -146,17 +235,4 @@ def patient_timeline(
     notes = q.order_by(Note.created_at.desc()).limit(limit).all()
 
     # response simple (sin schema extra por ahora)
-    return [
-        {
-            "id": n.id,
-            "created_at": n.created_at,
-            "note_type": n.note_type,
-            "appointment_id": n.appointment_id,
-            "subjective": n.subjective,
-            "objective": n.objective,
-            "assessment": n.assessment,
-            "plan": n.plan,
-            "content": n.content,
-        }
-        for n in notes
-    ]
\ No newline at end of file
+    return [n._asdict() for n in notes]
\ No newline at end of file
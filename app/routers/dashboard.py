@@ -6,16 +6,23 @@ from typing import Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import ProgrammingError, OperationalError
 
-from app.db.deps import get_db
-from app.core.auth import require_roles
+from app.db.deps import get_db, get_async_db
+from app.core.auth import require_roles, require_roles_async
+from app.core.conditional_get import conditional_get
+from app.core.config import AGENDA_ETAG_TIME_BUCKET_SECONDS
 from app.models.user import User
+from app.core.caches import cached_clinic_settings
+from app.core.agenda import get_target_user_id
 from app.models.patient import Patient
 from app.models.appointment import Appointment
 from app.models.note import Note
 from app.models.clinic_settings import ClinicSettings
+from app.core.recurrence import iter_virtual_occurrences
+from app.db.read_models import UPCOMING_APPOINTMENT_COLUMNS
 
 # ✅ Si existe el modelo AppointmentBlock en tu proyecto, lo importamos
 # (Si la TABLA no existe en DB, NO pasa nada: lo manejamos con try/except)
@@ -29,6 +36,11 @@ from app.schemas.dashboard import (
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
+
+# ✅ GET condicional (ETag por versión de agenda): 304 antes de correr las queries.
+# Todo el dashboard depende de "ahora": el ETag además rota cada AGENDA_ETAG_TIME_BUCKET_SECONDS
+AGENDA_ETAG_NOW = Depends(conditional_get(AGENDA_ETAG_TIME_BUCKET_SECONDS))
+
 ALLOWED_ROLES = ["admin", "psychologist", "assistant"]
 
 
@@ -45,34 +57,15 @@ def _has_column(model, col_name: str) -> bool:
         return False
 
 
-# =========================
-# Helpers (1 psicóloga)
-# =========================
-def get_owner_user(db: Session) -> User:
-    owner = (
-        db.query(User)
-        .filter(User.role == "psychologist", User.is_active == True)
-        .first()
-    )
-    if not owner:
-        raise HTTPException(
-            status_code=500,
-            detail="No existe usuario con rol 'psychologist'",
-        )
-    return owner
-
-
-def get_target_user_id(db: Session, current_user: User) -> int:
-    # assistant -> agenda de la psicóloga
-    if current_user.role == "assistant":
-        return get_owner_user(db).id
-    return current_user.id
-
-
 # =========================
 # Clinic Settings (si existe)
 # =========================
 def get_settings(db: Session) -> ClinicSettings:
+    """✅ Cacheado en proceso (solo lectura); PUT /settings lo invalida en todos los workers."""
+    return cached_clinic_settings(lambda: _load_settings(db))
+
+
+def _load_settings(db: Session) -> ClinicSettings:
     """
     ✅ Si la tabla clinic_settings no existe o no está migrada aún,
     devolvemos settings default SIN crashear.
@@ -143,6 +136,22 @@ def _calc_available_minutes(db: Session, target_user_id: int, start_dt: datetime
     """
     settings = get_settings(db)
 
+    # ✅ restar bloqueos si existen, si no, se asume 0
+    # (1 query para todo el rango; antes era 1 por día hábil)
+    try:
+        blocks = (
+            db.query(AppointmentBlock.start_time, AppointmentBlock.end_time)
+            .filter(
+                AppointmentBlock.is_active == True,
+                AppointmentBlock.user_id == target_user_id,
+                AppointmentBlock.start_time < end_dt,
+                AppointmentBlock.end_time > start_dt,
+            )
+            .all()
+        )
+    except (ProgrammingError, OperationalError):
+        blocks = []
+
     total = 0
     cursor = datetime(start_dt.year, start_dt.month, start_dt.day, 0, 0, 0)
 
@@ -162,21 +171,6 @@ def _calc_available_minutes(db: Session, target_user_id: int, start_dt: datetime
             if window_end > window_start:
                 minutes_today = int((window_end - window_start).total_seconds() // 60)
 
-                # ✅ restar bloqueos si existen, si no, se asume 0
-                try:
-                    blocks = (
-                        db.query(AppointmentBlock)
-                        .filter(
-                            AppointmentBlock.is_active == True,
-                            AppointmentBlock.user_id == target_user_id,
-                            AppointmentBlock.start_time < window_end,
-                            AppointmentBlock.end_time > window_start,
-                        )
-                        .all()
-                    )
-                except (ProgrammingError, OperationalError):
-                    blocks = []
-
                 blocked = 0
                 for b in blocks:
                     blocked += _clamp_range(window_start, window_end, b.start_time, b.end_time)
@@ -191,10 +185,21 @@ def _calc_available_minutes(db: Session, target_user_id: int, start_dt: datetime
 # =========================
 # ENDPOINTS
 # =========================
-@router.get("/metrics", response_model=DashboardMetrics)
-def get_metrics(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(ALLOWED_ROLES)),
+@router.get("/metrics", response_model=DashboardMetrics, dependencies=[AGENDA_ETAG_NOW])
+async def get_metrics(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_roles_async(ALLOWED_ROLES)),
+    date_from: Optional[str] = None,  # YYYY-MM-DD
+    date_to: Optional[str] = None,     # YYYY-MM-DD
+    days: Optional[int] = None,        # ✅ NUEVO (7/14/30) hacia adelante
+):
+    # ✅ async: la lógica ORM (sync) corre con run_sync sobre el driver async -> no ocupa thread del pool
+    return await db.run_sync(_get_metrics, current_user, date_from, date_to, days)
+
+
+def _get_metrics(
+    db: Session,
+    current_user: User,
     date_from: Optional[str] = None,  # YYYY-MM-DD
     date_to: Optional[str] = None,     # YYYY-MM-DD
     days: Optional[int] = None,        # ✅ NUEVO (7/14/30) hacia adelante
@@ -264,6 +269,11 @@ def get_metrics(
     scheduled_appointments_in_range = appt_q.filter(Appointment.status == "scheduled").count()
     cancelled_appointments_in_range = appt_q.filter(Appointment.status == "cancelled").count()
 
+    # ✅ Ocurrencias virtuales de series (todas "scheduled")
+    virtual = list(iter_virtual_occurrences(db, start_dt, end_dt, user_id=target_user_id))
+    total_appointments_in_range += len(virtual)
+    scheduled_appointments_in_range += len(virtual)
+
     # 4) Notes
     notes_q = (
         db.query(Note)
@@ -277,7 +287,7 @@ def get_metrics(
     total_notes_in_range = notes_q.count()
 
     # 5) Booked minutes
-    appts = appt_q.all()
+    appts = appt_q.all() + virtual
     booked_minutes_in_range = 0
     for a in appts:
         booked_minutes_in_range += int(a.duration_minutes or 0)
@@ -302,10 +312,19 @@ def get_metrics(
     )
 
 
-@router.get("/appointments-by-day", response_model=List[AppointmentsByDayPoint])
-def appointments_by_day(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(ALLOWED_ROLES)),
+@router.get("/appointments-by-day", response_model=List[AppointmentsByDayPoint], dependencies=[AGENDA_ETAG_NOW])
+async def appointments_by_day(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_roles_async(ALLOWED_ROLES)),
+    date_from: Optional[str] = None,  # YYYY-MM-DD
+    date_to: Optional[str] = None,     # YYYY-MM-DD
+):
+    return await db.run_sync(_appointments_by_day, current_user, date_from, date_to)
+
+
+def _appointments_by_day(
+    db: Session,
+    current_user: User,
     date_from: Optional[str] = None,  # YYYY-MM-DD
     date_to: Optional[str] = None,     # YYYY-MM-DD
 ):
@@ -339,6 +358,7 @@ def appointments_by_day(
         )
         .all()
     )
+    appts.extend(iter_virtual_occurrences(db, start_dt, end_dt, user_id=target_user_id))
 
     # 3) Agrupar por fecha
     bucket = {}
@@ -374,10 +394,19 @@ def appointments_by_day(
     return out
 
 
-@router.get("/upcoming", response_model=List[UpcomingAppointmentItem])
-def upcoming_appointments(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(ALLOWED_ROLES)),
+@router.get("/upcoming", response_model=List[UpcomingAppointmentItem], dependencies=[AGENDA_ETAG_NOW])
+async def upcoming_appointments(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_roles_async(ALLOWED_ROLES)),
+    days: int = 7,
+    limit: int = 20,
+):
+    return await db.run_sync(_upcoming_appointments, current_user, days, limit)
+
+
+def _upcoming_appointments(
+    db: Session,
+    current_user: User,
     days: int = 7,
     limit: int = 20,
 ):
@@ -395,9 +424,9 @@ def upcoming_appointments(
     now = datetime.utcnow()
     end_dt = now + timedelta(days=days)
 
-    # ✅ Traemos citas + nombre del paciente con JOIN
+    # ✅ Traemos citas + nombre del paciente con JOIN (proyección: Row, no entidades ORM)
     rows = (
-        db.query(Appointment, Patient.full_name)
+        db.query(*UPCOMING_APPOINTMENT_COLUMNS)
         .join(Patient, Patient.id == Appointment.patient_id)
         .filter(
             Appointment.is_active == True,
@@ -410,14 +439,20 @@ def upcoming_appointments(
         .all()
     )
 
+    # ✅ + ocurrencias virtuales de series (mismos atributos); se reordena y se vuelve a limitar
+    virtual = list(iter_virtual_occurrences(db, now, end_dt, user_id=target_user_id))
+    if virtual:
+        rows = sorted(rows + virtual, key=lambda r: r.start_time)[:limit]
+
     out: List[UpcomingAppointmentItem] = []
-    for a, patient_full_name in rows:
+    for a in rows:
         out.append(
             UpcomingAppointmentItem(
                 id=a.id,
+                series_id=getattr(a, "series_id", None),
                 patient_id=a.patient_id,
                 user_id=a.user_id,
-                patient_name=patient_full_name,  # ✅ AQUÍ VA LA MAGIA
+                patient_name=a.patient_name,  # ✅ AQUÍ VA LA MAGIA
                 start_time=a.start_time.isoformat(),
                 duration_minutes=int(a.duration_minutes or 0),
                 status=a.status,
@@ -427,7 +462,7 @@ def upcoming_appointments(
     return out
 
 
-@router.get("/metrics/export.csv")
+@router.get("/metrics/export.csv", dependencies=[AGENDA_ETAG_NOW])
 def export_metrics_csv(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(ALLOWED_ROLES)),
@@ -435,7 +470,7 @@ def export_metrics_csv(
     date_to: Optional[str] = None,
 ):
     # Reusa tu función actual llamando directamente
-    data = get_metrics(db=db, current_user=current_user, date_from=date_from, date_to=date_to)
+    data = _get_metrics(db, current_user, date_from=date_from, date_to=date_to)
 
     def generate():
         buffer = StringIO()
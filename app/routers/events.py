@@ -0,0 +1,83 @@
+import asyncio
+from typing import Optional
+
+import orjson
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.agenda_version import agenda_id_for_user
+from app.core.auth import authenticate_token_async
+from app.core.config import EVENTS_ENABLED, EVENTS_KEEPALIVE_SECONDS
+from app.core.events import AGENDA_HUB
+from app.db.async_session import AsyncSessionLocal
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+# Reintento sugerido al navegador (EventSource reconecta solo)
+RETRY_MS = 3000
+
+
+def _sse(event: str, data: dict, event_id: Optional[int] = None) -> bytes:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + orjson.dumps(data).decode())
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+async def _event_stream(agenda_id: Optional[int]):
+    sub = AGENDA_HUB.subscribe(agenda_id)
+    try:
+        # "ready": al (re)conectar el cliente refresca lo que tenga en pantalla
+        yield f"retry: {RETRY_MS}\n".encode() + _sse("ready", {"agenda_id": agenda_id})
+
+        while True:
+            if sub.lagged:
+                # cola llena (cliente lento): se perdieron eventos => refrescar todo
+                sub.lagged = False
+                yield _sse("resync", {"agenda_id": agenda_id})
+
+            try:
+                event_id, event = await asyncio.wait_for(sub.queue.get(), timeout=EVENTS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # comentario SSE: mantiene viva la conexión en proxies / detecta desconexión
+                yield b": keepalive\n\n"
+                continue
+
+            yield _sse(event["type"], event, event_id)
+    finally:
+        AGENDA_HUB.unsubscribe(sub)
+
+
+# =========================
+# GET /events/stream?token=...
+# =========================
+@router.get("/stream")
+async def stream_agenda_events(
+    token: str = Query(..., description="JWT de /auth/login (EventSource no permite enviar headers)"),
+):
+    """
+    ✅ Server-Sent Events con los cambios de la agenda del usuario (citas, series, bloqueos).
+    Reemplaza el polling de /calendar/events y /appointments/: el cliente escucha y
+    vuelve a pedir solo lo que cambió.
+
+    La sesión de DB se cierra antes de empezar el stream: un cliente conectado
+    no retiene conexiones del pool.
+    """
+    if not EVENTS_ENABLED:
+        raise HTTPException(status_code=503, detail="Eventos en tiempo real deshabilitados")
+
+    async with AsyncSessionLocal() as db:
+        current_user = await authenticate_token_async(db, token)
+        agenda_id = await agenda_id_for_user(db, current_user)
+
+    return StreamingResponse(
+        _event_stream(agenda_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # nginx / proxies: no bufferizar el stream
+            "X-Accel-Buffering": "no",
+        },
+    )
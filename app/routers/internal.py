@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+
+from app.core.auth import require_admin_async
+from app.core.metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE
+from app.core.http_metrics import render_http_metrics
+from app.db.slow_queries import SLOW_QUERY_LOG
+from app.models.user import User
+
+# registra los collectors del threadpool
+import app.core.threadpool  # noqa: F401
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"]
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(current_user: User = Depends(require_admin_async)):
+    """
+    ✅ Métricas en formato Prometheus (pool de conexiones + threadpool + HTTP por ruta).
+    async def: el scrape no compite por threads con el tráfico que está midiendo.
+    Con METRICS_MULTIPROC_DIR, las métricas HTTP suman todos los workers.
+    """
+    body = REGISTRY.render() + render_http_metrics()
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/slow-queries")
+async def slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    sort: str = Query("total", pattern="^(total|count|max|mean)$"),
+    include_explain: bool = True,
+    current_user: User = Depends(require_admin_async)
+):
+    """
+    ✅ Top de sentencias SQL por fingerprint (de este proceso) con count/p50/p95/max/total.
+    """
+    return {"sort": sort, "items": SLOW_QUERY_LOG.top(limit=limit, sort=sort, include_explain=include_explain)}
+
+
+@router.delete("/slow-queries")
+async def reset_slow_queries(current_user: User = Depends(require_admin_async)):
+    SLOW_QUERY_LOG.reset()
+    return {"message": "Registro de sentencias reiniciado"}
@@ -6,10 +6,14 @@ from datetime import datetime
 from app.db.deps import get_db
 from app.core.auth import get_current_user, require_roles
 from app.models.user import User
+from app.core.agenda import get_target_user_id
 from app.models.appointment import Appointment
 from app.models.patient import Patient
 from app.models.note import Note
 from app.schemas.note import NoteCreate, NoteUpdate, NoteResponse
+from app.core.patient_stats import refresh_patient_stats
+from app.core.fast_json import fast_list_response
+from app.db.read_models import NOTE_LIST_COLUMNS
 
 router = APIRouter(prefix="/notes", tags=["Notes"])
 
@@ -19,23 +23,6 @@ ALLOWED_ROLES = ["admin", "psychologist", "assistant"]
 # =========================
 # Helpers para "1 psicóloga"
 # =========================
-def get_owner_user(db: Session) -> User:
-    owner = (
-        db.query(User)
-        .filter(User.role == "psychologist", User.is_active == True)
-        .first()
-    )
-    if not owner:
-        raise HTTPException(status_code=500, detail="No existe usuario con rol 'psychologist'")
-    return owner
-
-
-def get_target_user_id(db: Session, current_user: User) -> int:
-    if current_user.role == "assistant":
-        return get_owner_user(db).id
-    return current_user.id
-
-
 def _appointment_access_query(db: Session, current_user: User, appointment_id: int):
     query = db.query(Appointment).filter(
         Appointment.id == appointment_id,
@@ -154,6 +141,7 @@ def create_note(
     )
 
     db.add(note)
+    refresh_patient_stats(db, [note.patient_id])
     db.commit()
     db.refresh(note)
     return note
@@ -164,14 +152,14 @@ def list_notes(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(Note).filter(Note.is_active == True)
+    query = db.query(*NOTE_LIST_COLUMNS).filter(Note.is_active == True)
     query = query.filter(Note.patient.has(Patient.is_active == True))
 
-    if current_user.role == "admin":
-        return query.order_by(Note.created_at.desc()).all()
+    if current_user.role != "admin":
+        target_user_id = get_target_user_id(db, current_user)
+        query = query.filter(Note.user_id == target_user_id)
 
-    target_user_id = get_target_user_id(db, current_user)
-    return query.filter(Note.user_id == target_user_id).order_by(Note.created_at.desc()).all()
+    return fast_list_response(NoteResponse, query.order_by(Note.created_at.desc()).all())
 
 
 @router.get("/by-patient/{patient_id}", response_model=List[NoteResponse], operation_id="list_notes_by_patient")
@@ -184,13 +172,13 @@ def list_notes_by_patient(
     if not patient:
         raise HTTPException(status_code=404, detail="Paciente no encontrado o sin acceso")
 
-    q = db.query(Note).filter(Note.patient_id == patient_id, Note.is_active == True)
+    q = db.query(*NOTE_LIST_COLUMNS).filter(Note.patient_id == patient_id, Note.is_active == True)
 
-    if current_user.role == "admin":
-        return q.order_by(Note.created_at.desc()).all()
+    if current_user.role != "admin":
+        target_user_id = get_target_user_id(db, current_user)
+        q = q.filter(Note.user_id == target_user_id)
 
-    target_user_id = get_target_user_id(db, current_user)
-    return q.filter(Note.user_id == target_user_id).order_by(Note.created_at.desc()).all()
+    return fast_list_response(NoteResponse, q.order_by(Note.created_at.desc()).all())
 
 
 @router.put("/{note_id}", response_model=NoteResponse, operation_id="update_note")
@@ -251,6 +239,7 @@ def update_note(
     )
 
     # 4) actualizar
+    previous_patient_id = note.patient_id
     note.patient_id = patient.id
     note.appointment_id = appt.id if appt else None
     note.note_type = final_note_type
@@ -262,6 +251,9 @@ def update_note(
     note.updated_by = current_user.id
     note.updated_at = datetime.utcnow()
 
+    # si la nota cambió de paciente, se actualizan ambos conteos
+    refresh_patient_stats(db, [previous_patient_id, note.patient_id])
+
     db.commit()
     db.refresh(note)
     return note
@@ -286,6 +278,7 @@ def delete_note(
     note.is_active = False
     note.updated_by = current_user.id
     note.updated_at = datetime.utcnow()
+    refresh_patient_stats(db, [note.patient_id])
 
     db.commit()
     return {"message": "Nota desactivada correctamente"}
\ No newline at end of file
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import date, datetime
 
 from app.db.deps import get_db
@@ -8,13 +8,35 @@ from app.models.patient import Patient
 from app.schemas.patient import PatientCreate, PatientResponse, PatientUpdate
 from app.core.auth import get_current_user, require_roles
 from app.models.user import User
+from app.core.agenda import get_target_user_id as get_agenda_user_id
 from app.models.appointment import Appointment
 from app.models.note import Note
+from app.models.patient_stats import PatientStats
+from app.models.appointment_series import AppointmentSeries
+from app.core.patient_stats import refresh_patient_stats
+from app.core.fast_json import fast_list_response
+from app.core.conditional_get import conditional_get
+from app.db.read_models import PATIENT_LIST_COLUMNS, PATIENT_STATS_BUNDLE
 
 router = APIRouter(prefix="/patients", tags=["Patients"])
 
+
+# ✅ GET condicional (ETag por versión de agenda): 304 antes de correr las queries
+AGENDA_ETAG = Depends(conditional_get())
+
 ALLOWED_ROLES = ["admin", "psychologist", "assistant"]
 
+# ✅ Columnas por las que se puede ordenar la lista (stats indexadas por agenda)
+SORTABLE_COLUMNS = {
+    "id": Patient.id,
+    "full_name": Patient.full_name,
+    "sessions_attended": PatientStats.sessions_attended,
+    "no_shows": PatientStats.no_shows,
+    "notes_count": PatientStats.notes_count,
+    "last_visit": PatientStats.last_visit,
+    "next_visit": PatientStats.next_visit,
+}
+
 
 def _calc_age(birth_date: date) -> int:
     today = date.today()
@@ -44,9 +66,8 @@ def get_target_user_id(db: Session, current_user: User) -> int:
                 detail="La psicóloga asignada a esta assistant no existe o está inactiva."
             )
 
-        return owner.id
-
-    return current_user.id
+    # misma agenda que el resto de routers y que el ETag (app/core/agenda.py)
+    return get_agenda_user_id(db, current_user)
 
 
 def _patient_access_query(db: Session, current_user: User, patient_id: int):
@@ -118,25 +139,73 @@ def create_patient(
     )
 
     db.add(new_patient)
+    db.flush()
+    refresh_patient_stats(db, [new_patient.id])
     db.commit()
     db.refresh(new_patient)
     return new_patient
 
-@router.get("/", response_model=List[PatientResponse])
+@router.get("/", response_model=List[PatientResponse], dependencies=[AGENDA_ETAG])
 def get_patients(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    sort_by: str = "id",
+    order: str = "desc",
+    min_no_shows: Optional[int] = None,
+    has_next_visit: Optional[bool] = None,
 ):
-    q = db.query(Patient).filter(Patient.is_active == True)
+    """
+    ✅ Lista de pacientes con sus estadísticas (patient_stats).
+    Se puede ordenar/filtrar por las estadísticas sin agregar en lectura.
+    """
+    rows = _list_patients(db, current_user, sort_by, order, min_no_shows, has_next_visit)
+    return fast_list_response(PatientResponse, rows)
+
+
+def _list_patients(
+    db: Session,
+    current_user: User,
+    sort_by: str = "id",
+    order: str = "desc",
+    min_no_shows: Optional[int] = None,
+    has_next_visit: Optional[bool] = None,
+):
+    sort_col = SORTABLE_COLUMNS.get(sort_by)
+    if sort_col is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"sort_by inválido. Usa: {', '.join(sorted(SORTABLE_COLUMNS))}"
+        )
 
-    if current_user.role == "admin":
-        return q.order_by(Patient.id.desc()).all()
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order inválido. Usa: asc, desc")
 
-    target_user_id = get_target_user_id(db, current_user)
-    return q.filter(Patient.user_id == target_user_id).order_by(Patient.id.desc()).all()
+    # ✅ Proyección a Row (sin identity map); stats como sub-Row anidado (None si no hay fila)
+    q = (
+        db.query(*PATIENT_LIST_COLUMNS, PATIENT_STATS_BUNDLE)
+        .select_from(Patient)
+        .outerjoin(Patient.stats)
+        .filter(Patient.is_active == True)
+    )
+
+    if current_user.role != "admin":
+        target_user_id = get_target_user_id(db, current_user)
+        q = q.filter(Patient.user_id == target_user_id)
+
+    if min_no_shows is not None:
+        q = q.filter(PatientStats.no_shows >= min_no_shows)
+
+    if has_next_visit is not None:
+        if has_next_visit:
+            q = q.filter(PatientStats.next_visit.isnot(None))
+        else:
+            q = q.filter(PatientStats.next_visit.is_(None))
 
+    sort_expr = sort_col.asc() if order == "asc" else sort_col.desc()
+    return q.order_by(sort_expr.nullslast(), Patient.id.desc()).all()
 
-@router.get("/{patient_id}", response_model=PatientResponse)
+
+@router.get("/{patient_id}", response_model=PatientResponse, dependencies=[AGENDA_ETAG])
 def get_patient(
     patient_id: int,
     db: Session = Depends(get_db),
@@ -202,6 +271,16 @@ def delete_patient(
         ap.updated_by = current_user.id
         ap.updated_at = now
 
+    series = db.query(AppointmentSeries).filter(
+        AppointmentSeries.patient_id == patient_id,
+        AppointmentSeries.is_active == True
+    ).all()
+
+    for sr in series:
+        sr.is_active = False
+        sr.updated_by = current_user.id
+        sr.updated_at = now
+
     notes = db.query(Note).filter(
         Note.patient_id == patient_id,
         Note.is_active == True
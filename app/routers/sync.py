@@ -0,0 +1,165 @@
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, or_, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.deps import get_async_db
+from app.core.auth import get_current_user_async
+from app.core.agenda_version import GLOBAL_AGENDA_ID, agenda_id_for_user
+from app.core.fast_json import fast_model_response
+from app.models.user import User
+from app.models.agenda_version import AgendaVersion
+from app.models.appointment import Appointment
+from app.models.appointment_block import AppointmentBlock
+from app.models.note import Note
+from app.models.patient import Patient
+from app.db.read_models import (
+    APPOINTMENT_LIST_COLUMNS,
+    BLOCK_LIST_COLUMNS,
+    NOTE_LIST_COLUMNS,
+    PATIENT_LIST_COLUMNS,
+    PATIENT_STATS_BUNDLE,
+)
+from app.schemas.sync import SyncChangesResponse
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+# =========================
+# Cursor: "agenda:versión[,agenda:versión...]"
+# =========================
+def _parse_cursor(since: str) -> Dict[int, int]:
+    try:
+        pairs = (item.split(":") for item in since.split(","))
+        return {int(agenda): int(version) for agenda, version in pairs}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor de sincronización inválido")
+
+
+def _format_cursor(versions: Dict[int, int]) -> str:
+    return ",".join(f"{agenda}:{version}" for agenda, version in sorted(versions.items()))
+
+
+def _changed(model, agenda_id: Optional[int], since: Optional[Dict[int, int]]):
+    """
+    Filtro de filas en alcance: de la agenda (o todas para admin) y, si hay cursor,
+    solo las escritas después (change_version > versión del cursor en su agenda).
+    Admin: agendas que no vienen en el cursor se mandan completas.
+    """
+    if since is None:
+        return model.user_id == agenda_id if agenda_id is not None else true()
+
+    if agenda_id is not None:
+        return and_(model.user_id == agenda_id, model.change_version > since[agenda_id])
+
+    conds = [and_(model.user_id == agenda, model.change_version > version) for agenda, version in since.items()]
+    conds.append(model.user_id.notin_(list(since)))
+    return or_(*conds)
+
+
+# =========================
+# GET /sync/changes?since=...
+# =========================
+@router.get("/changes", response_model=SyncChangesResponse)
+async def sync_changes(
+    since: Optional[str] = Query(None, description="cursor de la respuesta anterior; vacío => snapshot completo"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """
+    ✅ Delta de pacientes, citas, notas y bloqueos de la agenda del usuario desde `since`.
+
+    El cliente guarda una copia local, aplica `patients/appointments/notes/blocks` como
+    upserts y `deleted` como bajas, y manda el `cursor` devuelto en la siguiente llamada.
+    Sin `since` (o con un cursor de otra agenda) => snapshot completo (`full: true`).
+
+    Las ocurrencias virtuales de series (sin fila) no viajan aquí: siguen en /appointments/.
+    """
+    agenda_id = await agenda_id_for_user(db, current_user)
+    if agenda_id is None and current_user.role != "admin":
+        raise HTTPException(status_code=400, detail="No hay agenda asignada para sincronizar")
+
+    # filas y versiones deben salir del MISMO snapshot: si no, una transacción que hace
+    # commit entre dos queries quedaría detrás del cursor sin haberse enviado
+    await db.commit()
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    return await db.run_sync(_sync_changes, agenda_id, since)
+
+
+def _sync_changes(db: Session, agenda_id: Optional[int], since_raw: Optional[str]):
+    since = _parse_cursor(since_raw) if since_raw else None
+    if since is not None and agenda_id is not None and agenda_id not in since:
+        # cursor de otra agenda (p.ej. cambió la psicóloga de la assistant)
+        since = None
+    full = since is None
+
+    versions_q = select(AgendaVersion.agenda_id, AgendaVersion.version).where(
+        AgendaVersion.agenda_id != GLOBAL_AGENDA_ID
+    )
+    if agenda_id is not None:
+        versions_q = versions_q.where(AgendaVersion.agenda_id == agenda_id)
+    versions = dict(db.execute(versions_q).all())
+    if agenda_id is not None:
+        versions.setdefault(agenda_id, 0)
+
+    appointments = (
+        db.query(*APPOINTMENT_LIST_COLUMNS)
+        .outerjoin(Patient, (Patient.id == Appointment.patient_id) & (Patient.is_active == True))
+        .filter(_changed(Appointment, agenda_id, since), Appointment.is_active == True)
+        .order_by(Appointment.id)
+        .all()
+    )
+    notes = (
+        db.query(*NOTE_LIST_COLUMNS)
+        .filter(_changed(Note, agenda_id, since), Note.is_active == True)
+        .order_by(Note.id)
+        .all()
+    )
+    blocks = (
+        db.query(*BLOCK_LIST_COLUMNS)
+        .filter(_changed(AppointmentBlock, agenda_id, since), AppointmentBlock.is_active == True)
+        .order_by(AppointmentBlock.id)
+        .all()
+    )
+
+    deleted = {}
+    touched = set()
+    if not full:
+        for key, model in (("appointments", Appointment), ("notes", Note)):
+            rows = db.execute(
+                select(model.id, model.patient_id).where(_changed(model, agenda_id, since), model.is_active == False)
+            ).all()
+            deleted[key] = [r.id for r in rows]
+            touched.update(r.patient_id for r in rows)
+        for key, model in (("patients", Patient), ("blocks", AppointmentBlock)):
+            deleted[key] = db.scalars(
+                select(model.id).where(_changed(model, agenda_id, since), model.is_active == False)
+            ).all()
+        touched.update(r.patient_id for r in appointments)
+        touched.update(r.patient_id for r in notes)
+
+    patient_filter = _changed(Patient, agenda_id, since)
+    if touched:
+        # citas / notas escritas refrescan patient_stats: esos pacientes también van
+        patient_filter = or_(patient_filter, Patient.id.in_(touched))
+    patients = (
+        db.query(*PATIENT_LIST_COLUMNS, PATIENT_STATS_BUNDLE)
+        .select_from(Patient)
+        .outerjoin(Patient.stats)
+        .filter(patient_filter, Patient.is_active == True)
+        .order_by(Patient.id)
+        .all()
+    )
+
+    return fast_model_response(SyncChangesResponse, {
+        "cursor": _format_cursor(versions),
+        "full": full,
+        "patients": patients,
+        "appointments": appointments,
+        "notes": notes,
+        "blocks": blocks,
+        "deleted": deleted,
+    })
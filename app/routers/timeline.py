@@ -1,12 +1,15 @@
 # app/routers/timeline.py
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from datetime import datetime
 
-from app.db.deps import get_db
-from app.core.auth import get_current_user
+from app.db.deps import get_async_db
+from app.core.auth import get_current_user_async
+from app.core.conditional_get import conditional_get
 from app.models.user import User
+from app.core.agenda import get_target_user_id
 from app.models.patient import Patient
 from app.models.appointment import Appointment
 from app.models.note import Note
@@ -14,26 +17,16 @@ from app.schemas.timeline import PatientTimelineResponse, TimelineEvent
 
 router = APIRouter(prefix="/patients", tags=["Timeline"])
 
+
+# ✅ GET condicional (ETag por versión de agenda): 304 antes de correr las queries
+AGENDA_ETAG = Depends(conditional_get())
+
 ALLOWED_ROLES = ["admin", "psychologist", "assistant"]
 
 
 # =========================
 # Helpers (1 psicóloga)
 # =========================
-def get_owner_user(db: Session) -> User:
-    owner = db.query(User).filter(User.role == "psychologist", User.is_active == True).first()
-    if not owner:
-        raise HTTPException(status_code=500, detail="No existe usuario con rol 'psychologist'")
-    return owner
-
-
-def get_target_user_id(db: Session, current_user: User) -> int:
-    # assistant -> agenda/pacientes de la psicóloga
-    if current_user.role == "assistant":
-        return get_owner_user(db).id
-    return current_user.id
-
-
 def patient_access_query(db: Session, current_user: User, patient_id: int):
     """
     ✅ Admin: cualquier paciente activo
@@ -52,11 +45,23 @@ def patient_access_query(db: Session, current_user: User, patient_id: int):
 # =========================
 # Endpoint: Timeline
 # =========================
-@router.get("/{patient_id}/timeline", response_model=PatientTimelineResponse)
-def get_patient_timeline(
+@router.get("/{patient_id}/timeline", response_model=PatientTimelineResponse, dependencies=[AGENDA_ETAG])
+async def get_patient_timeline(
+    patient_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    date_from: Optional[str] = None,  # YYYY-MM-DD
+    date_to: Optional[str] = None,    # YYYY-MM-DD
+    limit: int = 200
+):
+    # ✅ async: la lógica ORM (sync) corre con run_sync sobre el driver async -> no ocupa thread del pool
+    return await db.run_sync(_get_patient_timeline, current_user, patient_id, date_from, date_to, limit)
+
+
+def _get_patient_timeline(
+    db: Session,
+    current_user: User,
     patient_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
     date_from: Optional[str] = None,  # YYYY-MM-DD
     date_to: Optional[str] = None,    # YYYY-MM-DD
     limit: int = 200
@@ -1,12 +1,15 @@
 # app/schemas/appointment.py
 
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
-from datetime import datetime
+from typing import List, Optional, Literal, Union
+from datetime import date, datetime
 
 # ✅ Estados permitidos (ajustado a lo que ya usas)
 AppointmentStatus = Literal["scheduled", "confirmed", "cancelled", "completed", "no_show"]
 
+# ✅ Frecuencias para series recurrentes
+RecurrenceFrequency = Literal["weekly", "biweekly"]
+
 
 class AppointmentBase(BaseModel):
     patient_id: int = Field(..., examples=[1])
@@ -40,7 +43,9 @@ class AppointmentUpdate(BaseModel):
 
 
 class AppointmentResponse(AppointmentBase):
-    id: int
+    # ✅ ocurrencia virtual de una serie (aún no materializada): id = "s{serie}:{inicio}"
+    # (ver app/core/recurrence.occurrence_key); los endpoints de estado lo aceptan
+    id: Union[int, str]
     user_id: int
     is_active: bool
     created_at: datetime
@@ -48,5 +53,75 @@ class AppointmentResponse(AppointmentBase):
     created_by: Optional[int] = None
     updated_by: Optional[int] = None
 
+    # ✅ Series recurrentes
+    series_id: Optional[int] = None
+    is_virtual: bool = False
+
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+# =========================
+# Series recurrentes
+# =========================
+class AppointmentSeriesCreate(BaseModel):
+    patient_id: int = Field(..., examples=[1])
+    start_time: datetime = Field(..., examples=["2026-02-11T15:30:00"])
+    duration_minutes: int = Field(60, ge=15, le=240, examples=[60])
+    notes: Optional[str] = None
+
+    # Regla: weekly/biweekly + (N ocurrencias o fecha límite)
+    frequency: RecurrenceFrequency = "weekly"
+    occurrences: Optional[int] = Field(None, ge=1, examples=[12])
+    until: Optional[date] = Field(None, examples=["2026-06-30"])
+
+    # False (default): se guarda solo la regla y las ocurrencias se expanden al leer
+    # True: se crea una fila en appointments por ocurrencia
+    materialize: bool = False
+
+
+class AppointmentSeriesConflict(BaseModel):
+    start_time: datetime
+    detail: str
+
+
+class AppointmentSeriesResponse(BaseModel):
+    series_id: Optional[int] = None
+    created: List[AppointmentResponse]
+    conflicts: List[AppointmentSeriesConflict]
+
+
+
+class AppointmentSeriesMaterialize(BaseModel):
+    occurrence_start: datetime = Field(..., examples=["2026-02-18T15:30:00"])
+
+
+# =========================
+# Cambios de estado en lote (cierre del día)
+# =========================
+BatchStatusAction = Literal["complete", "no_show", "cancel"]
+
+
+class AppointmentBatchStatusItem(BaseModel):
+    # id de cita o de ocurrencia virtual de una serie ("s{serie}:{inicio}")
+    id: Union[int, str] = Field(..., examples=[1])
+    action: BatchStatusAction = Field(..., examples=["complete"])
+
+
+class AppointmentBatchStatusRequest(BaseModel):
+    items: List[AppointmentBatchStatusItem] = Field(..., min_length=1, max_length=200)
+
+
+class AppointmentBatchStatusResult(BaseModel):
+    id: Union[int, str]
+    appointment_id: Optional[int] = None         # id real (difiere de id si era una ocurrencia virtual)
+    action: BatchStatusAction
+    ok: bool
+    status: Optional[str] = None                 # estado final si ok=True
+    status_code: Optional[int] = None            # código HTTP equivalente si ok=False
+    detail: Optional[str] = None
+
+
+class AppointmentBatchStatusResponse(BaseModel):
+    updated: int
+    results: List[AppointmentBatchStatusResult]
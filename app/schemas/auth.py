@@ -0,0 +1,12 @@
+# app/schemas/auth.py
+from pydantic import BaseModel
+from typing import Optional
+
+
+class TokenRefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    # opcional: si viene, también se revoca (si no, sigue vivo hasta expirar)
+    refresh_token: Optional[str] = None
@@ -0,0 +1,28 @@
+# app/schemas/bootstrap.py
+from pydantic import BaseModel
+from typing import List
+
+from app.schemas.appointment_block import AppointmentBlockResponse
+from app.schemas.clinic_settings import ClinicSettingsResponse
+from app.schemas.dashboard import DashboardMetrics, UpcomingAppointmentItem
+from app.schemas.patient import PatientResponse
+
+
+class BootstrapUser(BaseModel):
+    # mismo contenido que GET /users/me
+    id: int
+    email: str
+    role: str
+    is_active: bool
+
+    class Config:
+        from_attributes = True
+
+
+class BootstrapResponse(BaseModel):
+    user: BootstrapUser
+    settings: ClinicSettingsResponse
+    metrics: DashboardMetrics
+    upcoming: List[UpcomingAppointmentItem]
+    blocks: List[AppointmentBlockResponse]
+    patients: List[PatientResponse]
@@ -1,6 +1,6 @@
 # app/schemas/dashboard.py
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Union
 
 
 class DashboardMetrics(BaseModel):
@@ -33,7 +33,9 @@ class AppointmentsByDayPoint(BaseModel):
 
 
 class UpcomingAppointmentItem(BaseModel):
-    id: int
+    # ✅ ocurrencias virtuales de una serie: id = "s{serie}:{inicio}" (ver AppointmentResponse)
+    id: Union[int, str]
+    series_id: Optional[int] = None
     patient_id: int
     user_id: int
 
@@ -70,6 +70,17 @@ class PatientUpdate(BaseModel):
 # =========================
 # Outputs
 # =========================
+class PatientStatsResponse(BaseModel):
+    sessions_attended: int = 0
+    no_shows: int = 0
+    notes_count: int = 0
+    last_visit: Optional[datetime] = None
+    next_visit: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 class PatientResponse(BaseModel):
     id: int
     full_name: str
@@ -107,5 +118,8 @@ class PatientResponse(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
+    # ✅ NUEVO: estadísticas precalculadas (patient_stats)
+    stats: Optional[PatientStatsResponse] = None
+
     class Config:
         from_attributes = True
\ No newline at end of file
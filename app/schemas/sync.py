@@ -0,0 +1,34 @@
+# app/schemas/sync.py
+from pydantic import BaseModel
+from typing import List
+
+from app.schemas.appointment import AppointmentResponse
+from app.schemas.appointment_block import AppointmentBlockResponse
+from app.schemas.note import NoteResponse
+from app.schemas.patient import PatientResponse
+
+
+class SyncDeleted(BaseModel):
+    # ids dados de baja (is_active = False) desde el cursor
+    patients: List[int] = []
+    appointments: List[int] = []
+    notes: List[int] = []
+    blocks: List[int] = []
+
+
+class SyncChangesResponse(BaseModel):
+    # cursor opaco para la siguiente llamada (?since=)
+    cursor: str
+    # True => snapshot completo: el cliente reemplaza su copia local
+    full: bool
+
+    # filas nuevas o modificadas (activas)
+    patients: List[PatientResponse] = []
+    appointments: List[AppointmentResponse] = []
+    notes: List[NoteResponse] = []
+    blocks: List[AppointmentBlockResponse] = []
+
+    deleted: SyncDeleted = SyncDeleted()
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,178 @@
+"""
+Benchmark: endpoints de lectura async (AsyncSession + run_sync) vs el camino sync (threadpool).
+
+Monta, solo para el benchmark, una copia sync (`def` + get_db + get_current_user) de cada
+endpoint portado bajo /_sync, llamando exactamente la misma lógica (_impl). Así ambos modos
+hacen las mismas queries y lo único que cambia es cómo se espera la DB.
+
+Uso (con una DB ya poblada y un usuario existente):
+    pip install -r bench/requirements.txt
+    python -m bench.async_vs_sync --email psy@x.com --password pw --users 200 --requests 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+import httpx
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.core.auth import get_current_user, require_roles
+from app.core.fast_json import fast_list_response
+from app.db.deps import get_db
+from app.models.user import User
+from app.routers import appointments, calendar, dashboard, timeline
+from app.schemas.appointment import AppointmentResponse
+
+
+# =========================
+# Copia sync de los endpoints portados (mismo _impl)
+# =========================
+sync_router = APIRouter(prefix="/_sync")
+
+
+@sync_router.get("/appointments/")
+def list_appointments_sync(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    status: Optional[str] = None,
+    patient_id: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+):
+    rows = appointments._list_appointments(db, current_user, status, patient_id, date_from, date_to)
+    return fast_list_response(AppointmentResponse, rows)
+
+
+@sync_router.get("/calendar/events")
+def calendar_events_sync(
+    from_date: str,
+    to_date: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return calendar._get_calendar_events(db, current_user, from_date, to_date)
+
+
+@sync_router.get("/dashboard/metrics")
+def dashboard_metrics_sync(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(dashboard.ALLOWED_ROLES)),
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    days: Optional[int] = None,
+):
+    return dashboard._get_metrics(db, current_user, date_from, date_to, days)
+
+
+@sync_router.get("/dashboard/upcoming")
+def dashboard_upcoming_sync(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(dashboard.ALLOWED_ROLES)),
+    days: int = 7,
+    limit: int = 20,
+):
+    return dashboard._upcoming_appointments(db, current_user, days, limit)
+
+
+@sync_router.get("/patients/{patient_id}/timeline")
+def timeline_sync(
+    patient_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return timeline._get_patient_timeline(db, current_user, patient_id)
+
+
+app.include_router(sync_router)
+
+
+def _paths(patient_id: Optional[int]) -> list:
+    today = date.today()
+    d_from = (today - timedelta(days=7)).isoformat()
+    d_to = (today + timedelta(days=7)).isoformat()
+
+    paths = [
+        f"/appointments/?date_from={d_from}&date_to={d_to}",
+        f"/calendar/events?from_date={d_from}&to_date={d_to}",
+        f"/dashboard/metrics?date_from={d_from}&date_to={d_to}",
+        "/dashboard/upcoming?days=7",
+    ]
+    if patient_id is not None:
+        paths.append(f"/patients/{patient_id}/timeline")
+    return paths
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+async def _run_mode(client: httpx.AsyncClient, prefix: str, paths: list, users: int, requests: int) -> dict:
+    latencies = []
+    errors = 0
+
+    async def user_loop(user_idx: int):
+        nonlocal errors
+        for i in range(requests):
+            path = prefix + paths[(user_idx + i) % len(paths)]
+            t0 = time.perf_counter()
+            r = await client.get(path)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if r.status_code != 200:
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(user_loop(u) for u in range(users)))
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50), 1),
+        "p95_ms": round(_percentile(latencies, 95), 1),
+        "p99_ms": round(_percentile(latencies, 99), 1),
+        "mean_ms": round(statistics.fmean(latencies), 1),
+    }
+
+
+async def main(args):
+    # raise_app_exceptions=False: un 500 (p.ej. QueuePool timeout) cuenta como error, no aborta el benchmark
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        r = await client.post("/auth/login", data={"username": args.email, "password": args.password})
+        r.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {r.json()['access_token']}"
+
+        patient_id = args.patient_id
+        if patient_id is None:
+            patients = (await client.get("/patients/")).json()
+            patient_id = patients[0]["id"] if patients else None
+
+        paths = _paths(patient_id)
+
+        # calentamiento (pools de conexiones, caches de compilación)
+        for prefix in ("/_sync", ""):
+            await _run_mode(client, prefix, paths, users=5, requests=2)
+
+        for label, prefix in (("sync", "/_sync"), ("async", "")):
+            result = await _run_mode(client, prefix, paths, args.users, args.requests)
+            print(f"{label:>5}: {result}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="p99 async vs sync con N usuarios concurrentes")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=10, help="requests por usuario")
+    parser.add_argument("--patient-id", type=int, default=None)
+    asyncio.run(main(parser.parse_args()))
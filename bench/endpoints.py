@@ -0,0 +1,292 @@
+"""
+Suite de benchmark por endpoint (in-process, httpx.ASGITransport, sin servidor).
+
+Siembra la clínica sintética (bench.seed) a la escala pedida y recorre TODOS los GET
+de los routers con el rol que los usa en la práctica (psicóloga, asistente, admin).
+Por endpoint reporta:
+- p50 / p95 / p99 / media de latencia (requests secuenciales: mide costo, no concurrencia)
+- queries por request (header X-DB-Queries de DbQueryHeadersMiddleware)
+- bytes de respuesta
+- crecimiento del pico de RSS del proceso (resource.getrusage)
+
+El resultado se guarda en JSON con el commit de git, para comparar dos corridas:
+
+    python -m bench.endpoints --scale 10                       # -> bench/results/endpoints_<sha>_x10.json
+    python -m bench.endpoints --no-seed --iterations 100       # reusa la DB ya sembrada
+    python -m bench.endpoints --compare antes.json despues.json
+
+--compare sale con código 1 si algún endpoint empeora su p95 más allá de --threshold
+o emite más queries que antes.
+
+⚠️ Sin --no-seed hace TRUNCATE: solo contra una DB local desechable.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import httpx
+
+from app.core.config import DB_INSTRUMENTATION_ENABLED
+from app.main import app
+from app.db.session import engine
+from bench.seed import ADMIN_EMAIL, ASSISTANT_EMAIL, BENCH_PASSWORD, PSYCHOLOGIST_EMAIL, count_rows, seed
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+def _git_commit() -> dict:
+    def _git(*args) -> str:
+        try:
+            return subprocess.run(
+                ["git", *args], capture_output=True, text=True, check=True,
+                cwd=os.path.dirname(__file__),
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+
+    return {
+        "sha": _git("rev-parse", "HEAD") or "unknown",
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss: KB en Linux, bytes en macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def endpoints(patient_id: int, appointment_id: int) -> list:
+    """
+    (nombre, rol, path). Un endpoint por GET de cada router.
+    """
+    today = date.today()
+    d_from = (today - timedelta(days=7)).isoformat()
+    d_to = (today + timedelta(days=7)).isoformat()
+    month_from = today.replace(day=1)
+    month_to = (month_from + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    year_from = (today - timedelta(days=365)).isoformat()
+
+    return [
+        # raíz / salud
+        ("health", "psychologist", "/health"),
+        ("users_me", "psychologist", "/users/me"),
+        # pacientes
+        ("patients_list", "psychologist", "/patients/"),  # sin paginación: lista completa, como el frontend
+        ("patients_list_no_shows", "psychologist", "/patients/?sort_by=no_shows&min_no_shows=1"),
+        ("patient_detail", "psychologist", f"/patients/{patient_id}"),
+        ("patient_timeline", "psychologist", f"/patients/{patient_id}/timeline"),
+        # citas
+        ("appointments_week", "psychologist", f"/appointments/?date_from={d_from}&date_to={d_to}"),
+        ("appointments_week_assistant", "assistant", f"/appointments/?date_from={d_from}&date_to={d_to}"),
+        ("appointment_detail", "psychologist", f"/appointments/{appointment_id}"),
+        ("availability", "assistant", f"/appointments/availability?date_from={today}&date_to={d_to}"),
+        ("blocks_list", "psychologist", "/appointments/blocks/"),
+        # calendario
+        ("calendar_month", "psychologist", f"/calendar/events?from_date={month_from}&to_date={month_to}"),
+        ("day_slots", "assistant", f"/calendar/day-slots?date_str={today.isoformat()}"),
+        # notas / clínico
+        ("notes_list", "psychologist", "/notes/"),
+        ("notes_by_patient", "psychologist", f"/notes/by-patient/{patient_id}"),
+        ("clinical_summary", "psychologist", f"/clinical/patient/{patient_id}/summary"),
+        ("clinical_patients_summary", "psychologist", "/clinical/patients/summary?limit=50"),
+        ("clinical_timeline", "psychologist", f"/clinical/patient/{patient_id}/timeline"),
+        # dashboard
+        ("dashboard_metrics_week", "psychologist", f"/dashboard/metrics?date_from={d_from}&date_to={d_to}"),
+        ("dashboard_metrics_year", "psychologist", f"/dashboard/metrics?date_from={year_from}&date_to={d_to}"),
+        ("dashboard_by_day", "psychologist", f"/dashboard/appointments-by-day?date_from={d_from}&date_to={d_to}"),
+        ("dashboard_upcoming", "psychologist", "/dashboard/upcoming?days=7"),
+        ("dashboard_export_csv", "psychologist", f"/dashboard/metrics/export.csv?date_from={year_from}&date_to={d_to}"),
+        # configuración
+        ("settings", "psychologist", "/settings/"),
+        ("clinic_settings", "psychologist", "/clinic-settings/"),
+        # admin
+        ("admin_dashboard", "admin", "/admin/dashboard"),
+        ("admin_users", "admin", "/admin/users/"),
+        ("admin_appointments_week", "admin", f"/appointments/?date_from={d_from}&date_to={d_to}"),
+        ("internal_metrics", "admin", "/internal/metrics"),
+    ]
+
+
+async def _login(client: httpx.AsyncClient, email: str) -> dict:
+    r = await client.post("/auth/login", data={"username": email, "password": BENCH_PASSWORD})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+async def _measure(client: httpx.AsyncClient, headers: dict, path: str, iterations: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await client.get(path, headers=headers)
+
+    rss_before = _peak_rss_mb()
+    latencies = []
+    queries = []
+    statuses = {}
+    size = 0
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        r = await client.get(path, headers=headers)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        statuses[str(r.status_code)] = statuses.get(str(r.status_code), 0) + 1
+        size = len(r.content)
+        if "x-db-queries" in r.headers:
+            queries.append(int(r.headers["x-db-queries"]))
+
+    latencies.sort()
+    return {
+        "path": path,
+        "status": statuses,
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "queries": max(queries) if queries else None,
+        "bytes": size,
+        "peak_rss_growth_mb": round(_peak_rss_mb() - rss_before, 1),
+    }
+
+
+async def run(args) -> dict:
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        auth = {
+            "psychologist": await _login(client, PSYCHOLOGIST_EMAIL),
+            "assistant": await _login(client, ASSISTANT_EMAIL),
+            "admin": await _login(client, ADMIN_EMAIL),
+        }
+
+        # paciente "típico": el que está a la mitad de la lista, con historial
+        patients = (await client.get("/patients/", headers=auth["psychologist"])).json()
+        patient_id = patients[len(patients) // 2]["id"]
+        today = date.today()
+        appts = (await client.get(
+            f"/appointments/?date_from={today - timedelta(days=7)}&date_to={today}",
+            headers=auth["psychologist"],
+        )).json()
+        appointment_id = next((a["id"] for a in appts if a.get("id")), 1)
+
+        results = {}
+        for name, role, path in endpoints(patient_id, appointment_id):
+            if args.only and name not in args.only:
+                continue
+            results[name] = await _measure(client, auth[role], path, args.iterations, args.warmup)
+            r = results[name]
+            print(
+                f"{name:<30} p50={r['p50_ms']:>8.2f}ms p95={r['p95_ms']:>8.2f}ms "
+                f"p99={r['p99_ms']:>8.2f}ms queries={r['queries']} bytes={r['bytes']} status={r['status']}"
+            )
+
+    return results
+
+
+def compare(base_path: str, new_path: str, threshold: float) -> int:
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    print(f"base: {base['git']['sha'][:10]} x{base['scale']}  ->  new: {new['git']['sha'][:10]} x{new['scale']}")
+    print(f"{'endpoint':<30} {'p50 ms':>18} {'p95 ms':>18} {'queries':>10}")
+
+    regressions = []
+    for name, b in base["endpoints"].items():
+        n = new["endpoints"].get(name)
+        if n is None:
+            print(f"{name:<30} (no existe en la corrida nueva)")
+            continue
+
+        flags = []
+        if b["p95_ms"] and n["p95_ms"] > b["p95_ms"] * threshold:
+            flags.append("p95")
+        if b["queries"] is not None and n["queries"] is not None and n["queries"] > b["queries"]:
+            flags.append("queries")
+        if flags:
+            regressions.append((name, flags))
+
+        print(
+            f"{name:<30} {b['p50_ms']:>8.2f}->{n['p50_ms']:<8.2f} {b['p95_ms']:>8.2f}->{n['p95_ms']:<8.2f} "
+            f"{str(b['queries']):>4}->{str(n['queries']):<4} {'⚠️ ' + ','.join(flags) if flags else ''}"
+        )
+
+    print(f"peak RSS: {base['peak_rss_mb']} MB -> {new['peak_rss_mb']} MB")
+    if regressions:
+        print(f"❌ {len(regressions)} endpoint(s) con regresión (threshold p95 x{threshold})")
+        return 1
+    print("✅ sin regresiones")
+    return 0
+
+
+def main(args) -> int:
+    if args.compare:
+        return compare(args.compare[0], args.compare[1], args.threshold)
+
+    if not args.verbose:
+        # las advertencias de N+1 se reflejan en la columna "queries"; sin esto inundan la salida
+        logging.getLogger("app.db.instrumentation").setLevel(logging.ERROR)
+
+    if not DB_INSTRUMENTATION_ENABLED:
+        print("⚠️ DB_INSTRUMENTATION_ENABLED=false: no habrá conteo de queries por request")
+
+    counts = None
+    if not args.no_seed:
+        t0 = time.perf_counter()
+        counts = seed(engine, args.scale, args.years)
+        print(f"seed x{args.scale}: {counts} ({time.perf_counter() - t0:.1f}s)")
+
+    if counts is None:
+        counts = count_rows(engine)
+
+    results = asyncio.run(run(args))
+
+    report = {
+        "git": _git_commit(),
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "scale": args.scale,
+        "years": args.years,
+        "rows": counts,
+        "iterations": args.iterations,
+        "python": platform.python_version(),
+        "peak_rss_mb": _peak_rss_mb(),
+        "endpoints": results,
+    }
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"endpoints_{report['git']['sha'][:10]}_x{args.scale}.json")
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"peak RSS: {report['peak_rss_mb']} MB -> {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latencia, queries y memoria por endpoint")
+    parser.add_argument("--scale", type=int, default=1, help="1, 10, 100 ...")
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--no-seed", action="store_true", help="no re-sembrar (usa la DB actual)")
+    parser.add_argument("--iterations", type=int, default=30, help="requests medidos por endpoint")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", nargs="*", help="solo estos endpoints (por nombre)")
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--verbose", action="store_true", help="mostrar advertencias de N+1")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"))
+    parser.add_argument("--threshold", type=float, default=1.2, help="factor máximo de p95 vs base")
+    sys.exit(main(parser.parse_args()))
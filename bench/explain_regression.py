@@ -0,0 +1,210 @@
+"""
+Regresión de planes (EXPLAIN) para las consultas calientes de los routers.
+
+En vez de duplicar las consultas aquí, se ejecutan los endpoints reales y se capturan
+las sentencias SQL que emiten (con sus parámetros). Cada sentencia se pasa por
+EXPLAIN (FORMAT JSON) y se compara contra bench/explain_baseline.json:
+
+- FALLA si aparece un Seq Scan sobre una tabla grande que no estaba en el baseline
+- FALLA si el costo estimado supera baseline * --tolerance
+
+Se identifica cada sentencia por escenario + fingerprint (app/db/slow_queries.fingerprint).
+
+⚠️ Corre contra una DB local desechable: hace TRUNCATE y siembra bench.seed.
+
+Uso (CI):
+    python -m bench.explain_regression                     # compara, exit 1 si hay regresión
+    python -m bench.explain_regression --update-baseline   # regenera el baseline
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from app.main import app
+from app.db.async_session import async_engine
+from app.db.session import engine
+from app.db.slow_queries import fingerprint
+from bench.seed import BENCH_PASSWORD, seed
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "explain_baseline.json")
+
+# Tablas con más filas que esto cuentan como "grandes" (Seq Scan = regresión)
+LARGE_TABLE_ROWS = 10_000
+
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+
+def scenarios(client: TestClient) -> dict:
+    """
+    escenario -> función que ejecuta los requests del escenario.
+    """
+    today = date.today()
+    d_from = (today - timedelta(days=7)).isoformat()
+    d_to = (today + timedelta(days=7)).isoformat()
+    month_from = today.replace(day=1).isoformat()
+    month_to = (today.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+    patient_id = client.get("/patients/").json()[0]["id"]
+
+    # 10:00 de un día hábil futuro: dentro del horario, así el POST pasa las validaciones
+    # baratas y llega a las queries de bloqueos / doble agenda / traslape (21:00 se rechazaba antes)
+    booking_day = today + timedelta(days=1)
+    while booking_day.weekday() >= 5:
+        booking_day += timedelta(days=1)
+
+    return {
+        "overlap_checks": lambda: client.post("/appointments/", json={
+            "patient_id": patient_id,
+            "start_time": f"{booking_day.isoformat()}T10:00:00",
+            "duration_minutes": 60,
+        }),
+        "appointments_list": lambda: client.get(f"/appointments/?date_from={d_from}&date_to={d_to}"),
+        "availability": lambda: client.get(f"/appointments/availability?date_from={today}&date_to={today}"),
+        "calendar_range": lambda: client.get(f"/calendar/events?from_date={month_from}&to_date={month_to.isoformat()}"),
+        "day_slots": lambda: client.get(f"/calendar/day-slots?date_str={today.isoformat()}"),
+        "dashboard_metrics": lambda: client.get(f"/dashboard/metrics?date_from={d_from}&date_to={d_to}"),
+        "dashboard_by_day": lambda: client.get(f"/dashboard/appointments-by-day?date_from={d_from}&date_to={d_to}"),
+        "dashboard_upcoming": lambda: client.get("/dashboard/upcoming?days=7"),
+        "timeline": lambda: client.get(f"/patients/{patient_id}/timeline"),
+        "notes_list": lambda: client.get("/notes/"),
+        "notes_by_patient": lambda: client.get(f"/notes/by-patient/{patient_id}"),
+        "patients_list": lambda: client.get("/patients/"),
+        "clinical_summary": lambda: client.get(f"/clinical/patient/{patient_id}/summary"),
+    }
+
+
+class _Capture:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip()[:6].upper().startswith(EXPLAINABLE):
+            self.statements.append((statement, parameters))
+
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def _explain(raw_conn, statement: str, parameters) -> dict:
+    cursor = raw_conn.cursor()
+    try:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0][0]["Plan"]
+    finally:
+        cursor.close()
+    return plan
+
+
+def collect_plans(large_tables: set) -> dict:
+    capture = _Capture()
+    event.listen(engine, "before_cursor_execute", capture)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    results = {}
+    try:
+        with TestClient(app) as client:
+            r = client.post("/auth/login", data={"username": "psy@bench.local", "password": BENCH_PASSWORD})
+            r.raise_for_status()
+            client.headers["Authorization"] = f"Bearer {r.json()['access_token']}"
+
+            for name, run in scenarios(client).items():
+                capture.statements.clear()
+                response = run()
+                # un request rechazado no llega a las queries que el escenario quiere medir
+                if response.status_code >= 400:
+                    raise RuntimeError(f"{name}: HTTP {response.status_code} {response.text[:200]}")
+                results[name] = list(capture.statements)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = {}
+    raw = engine.raw_connection()
+    try:
+        for name, statements in results.items():
+            for statement, parameters in statements:
+                key = f"{name} :: {fingerprint(statement)}"
+                if key in plans:
+                    continue
+                plan = _explain(raw, statement, parameters)
+                seq_scans = sorted({
+                    n["Relation Name"] for n in _walk(plan)
+                    if n.get("Node Type") == "Seq Scan" and n.get("Relation Name") in large_tables
+                })
+                plans[key] = {"total_cost": plan["Total Cost"], "seq_scans": seq_scans}
+        raw.rollback()
+    finally:
+        raw.close()
+    return plans
+
+
+def compare(plans: dict, baseline: dict, tolerance: float) -> list:
+    failures = []
+    for key, current in sorted(plans.items()):
+        base = baseline.get(key)
+        if base is None:
+            if current["seq_scans"]:
+                failures.append(f"NUEVA con Seq Scan {current['seq_scans']}: {key[:160]}")
+            continue
+
+        new_scans = set(current["seq_scans"]) - set(base["seq_scans"])
+        if new_scans:
+            failures.append(f"Seq Scan nuevo en {sorted(new_scans)}: {key[:160]}")
+
+        if base["total_cost"] > 0 and current["total_cost"] > base["total_cost"] * tolerance:
+            failures.append(
+                f"Costo {base['total_cost']:.1f} -> {current['total_cost']:.1f} "
+                f"(> x{tolerance}): {key[:160]}"
+            )
+    return failures
+
+
+def main(args) -> int:
+    counts = seed(engine, args.scale)
+    print(f"seed x{args.scale}: {counts}")
+
+    with engine.connect() as conn:
+        large_tables = set(conn.execute(text(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND reltuples > :n"
+        ), {"n": LARGE_TABLE_ROWS}).scalars().all())
+
+    plans = collect_plans(large_tables)
+    print(f"{len(plans)} sentencias analizadas (tablas grandes: {sorted(large_tables)})")
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({"scale": args.scale, "plans": plans}, f, indent=2, sort_keys=True, ensure_ascii=False)
+        print(f"baseline actualizado: {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No hay baseline: corre con --update-baseline primero", file=sys.stderr)
+        return 2
+
+    with open(BASELINE_PATH) as f:
+        stored = json.load(f)
+    if stored.get("scale") != args.scale:
+        print(f"⚠️ baseline generado con scale={stored.get('scale')}, comparando con scale={args.scale}")
+
+    failures = compare(plans, stored["plans"], args.tolerance)
+    for failure in failures:
+        print("REGRESIÓN:", failure)
+    if not failures:
+        print("OK: sin regresiones de plan")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regresión de planes EXPLAIN de las consultas calientes")
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--tolerance", type=float, default=1.5, help="factor máximo de costo vs baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,115 @@
+"""
+Benchmark: endpoints principales CON y SIN los índices parciales (WHERE is_active).
+
+Mide cada endpoint con los índices, los elimina, vuelve a medir y los recrea
+(siempre, aunque falle algo). Usa los Index(... postgresql_where=...) declarados en
+app/models, que son los mismos que crea la migración 20261019_hot_indexes.
+
+⚠️ Solo contra una DB local/de benchmark ya poblada: hace DROP INDEX reales.
+
+Uso:
+    pip install -r bench/requirements.txt
+    python -m bench.index_benchmark --email psy@x.com --password pw --runs 20
+"""
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.db.base_class import Base
+from app.db.session import engine
+
+
+def partial_indexes():
+    return [
+        index
+        for table in Base.metadata.sorted_tables
+        for index in table.indexes
+        if index.dialect_options["postgresql"]["where"] is not None
+    ]
+
+
+def _paths(client: TestClient) -> list:
+    today = date.today()
+    d_from = (today - timedelta(days=7)).isoformat()
+    d_to = (today + timedelta(days=7)).isoformat()
+
+    patients = client.get("/patients/").json()
+    patient_id = patients[0]["id"] if patients else 1
+
+    return [
+        f"/appointments/?date_from={d_from}&date_to={d_to}",
+        f"/appointments/availability?date_from={today.isoformat()}&date_to={today.isoformat()}",
+        f"/calendar/events?from_date={d_from}&to_date={d_to}",
+        f"/calendar/day-slots?date_str={today.isoformat()}",
+        f"/dashboard/metrics?date_from={d_from}&date_to={d_to}",
+        "/dashboard/upcoming?days=7",
+        "/patients/",
+        f"/patients/{patient_id}/timeline",
+        f"/notes/by-patient/{patient_id}",
+        "/appointments/blocks/",
+    ]
+
+
+def _measure(client: TestClient, paths: list, runs: int) -> dict:
+    out = {}
+    for path in paths:
+        client.get(path)  # calentamiento
+        samples = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            r = client.get(path)
+            samples.append((time.perf_counter() - t0) * 1000)
+        samples.sort()
+        out[path] = {
+            "status": r.status_code,
+            "median_ms": statistics.median(samples),
+            "p95_ms": samples[min(len(samples) - 1, int(0.95 * len(samples)))],
+        }
+    return out
+
+
+def main(args):
+    indexes = partial_indexes()
+
+    with TestClient(app) as client:
+        r = client.post("/auth/login", data={"username": args.email, "password": args.password})
+        r.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {r.json()['access_token']}"
+
+        paths = _paths(client)
+        with_idx = _measure(client, paths, args.runs)
+
+        try:
+            with engine.begin() as conn:
+                for index in indexes:
+                    conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+                conn.execute(text("ANALYZE"))
+            without_idx = _measure(client, paths, args.runs)
+        finally:
+            with engine.begin() as conn:
+                for index in indexes:
+                    index.create(bind=conn, checkfirst=True)
+                conn.execute(text("ANALYZE"))
+
+    print(f"{'endpoint':<60} {'sin idx (med/p95)':>20} {'con idx (med/p95)':>20} {'x':>6}")
+    for path in paths:
+        a, b = without_idx[path], with_idx[path]
+        speedup = a["median_ms"] / b["median_ms"] if b["median_ms"] else 0.0
+        print(
+            f"{path[:60]:<60} {a['median_ms']:>9.1f}/{a['p95_ms']:<9.1f} "
+            f"{b['median_ms']:>9.1f}/{b['p95_ms']:<9.1f} {speedup:>6.1f}"
+            + ("" if a["status"] == b["status"] == 200 else f"  (status {a['status']}/{b['status']})")
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Endpoints con vs sin índices parciales")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--runs", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,109 @@
+"""
+Chequeo: invalidación de caches en proceso entre DOS procesos de la app.
+
+Levanta dos uvicorn (A y B) contra la misma DB, calienta la cache de clinic_settings
+en B (GET /calendar/day-slots), cambia end_time con PUT /settings en A y mide cuánto
+tarda B en devolver el valor nuevo. Al final restaura el valor original.
+
+    python -m bench.invalidation_check --email psy@x.com --password pw
+    python -m bench.invalidation_check --email psy@x.com --password pw --poll-only
+        (B sin LISTEN: la invalidación llega por polling de cache_versions)
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from datetime import date
+
+import httpx
+
+
+def _start(port: int, extra_env: dict) -> subprocess.Popen:
+    env = {**os.environ, **extra_env}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+def _wait_ready(base: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(base + "/docs", timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{base} no respondió en {timeout}s")
+
+
+def _login(base: str, email: str, password: str) -> dict:
+    r = httpx.post(base + "/auth/login", data={"username": email, "password": password})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def _end_time(base: str, headers: dict) -> str:
+    r = httpx.get(base + "/calendar/day-slots", params={"date_str": date.today().isoformat()}, headers=headers)
+    r.raise_for_status()
+    return r.json()["working_hours"]["end_time"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--port-a", type=int, default=8101)
+    parser.add_argument("--port-b", type=int, default=8102)
+    parser.add_argument("--poll-only", action="store_true", help="B sin LISTEN (fallback por polling)")
+    parser.add_argument("--timeout", type=float, default=15.0)
+    args = parser.parse_args()
+
+    env_b = {"INVALIDATION_LISTEN_ENABLED": "false", "INVALIDATION_POLL_SECONDS": "1"} if args.poll_only else {}
+    procs = [_start(args.port_a, {}), _start(args.port_b, env_b)]
+    base_a = f"http://127.0.0.1:{args.port_a}"
+    base_b = f"http://127.0.0.1:{args.port_b}"
+    try:
+        _wait_ready(base_a)
+        _wait_ready(base_b)
+        # margen para que el LISTEN de ambos quede conectado
+        time.sleep(1.0)
+
+        headers = _login(base_a, args.email, args.password)
+        original = _end_time(base_b, headers)  # calienta la cache de B
+        _end_time(base_b, headers)
+        new_value = "20:30" if original != "20:30" else "21:00"
+
+        # PUT /settings/ espera la configuración completa
+        current = httpx.get(base_a + "/settings/", headers=headers).raise_for_status().json()
+        current.pop("id", None)
+
+        r = httpx.put(base_a + "/settings/", json={**current, "end_time": new_value + ":00"}, headers=headers)
+        r.raise_for_status()
+        t0 = time.monotonic()
+
+        seen = None
+        while time.monotonic() - t0 < args.timeout:
+            seen = _end_time(base_b, headers)
+            if seen == new_value:
+                break
+            time.sleep(0.01)
+        elapsed_ms = (time.monotonic() - t0) * 1000
+
+        mode = "polling" if args.poll_only else "LISTEN/NOTIFY"
+        if seen == new_value:
+            print(f"✅ B vio end_time={new_value} {elapsed_ms:.0f} ms después del PUT en A ({mode})")
+        else:
+            print(f"❌ B sigue con end_time={seen} tras {args.timeout}s ({mode})")
+
+        httpx.put(base_a + "/settings/", json=current, headers=headers).raise_for_status()
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+Load test con tráfico "real" de clínica contra un servidor corriendo (uvicorn/gunicorn).
+
+Cada usuario virtual (VU) es una psicóloga o una asistente (alternados) que hace login
+y luego repite journeys elegidos por peso, con think time entre journeys:
+
+    login            re-login (token nuevo)
+    dashboard        métricas de la semana + próximas citas + citas por día
+    calendar_month   eventos del mes
+    day_slots        slots de un día de las próximas 2 semanas
+    book             day-slots -> elige un slot libre -> POST /appointments/
+    write_note       POST /notes/ (SOAP) de un paciente      (solo psicóloga)
+    timeline         timeline de un paciente
+
+Un 400/409 al agendar (slot ganado por otro VU) cuenta como "rechazo", no como error.
+Error = 5xx, timeout o error de red.
+
+Cada --interval segundos imprime: VUs activos, rps, % error, p50/p95/p99.
+Al final: totales por paso, y opcionalmente --out con la serie de tiempo en JSON.
+
+Modo rampa (--ramp): empieza con --ramp-start VUs y agrega --ramp-step cada
+--ramp-step-seconds hasta que un escalón viola el SLO (p95 > --slo-p95-ms o
+errores > --max-error-rate). Reporta el último escalón sano = punto de saturación.
+Una clínica típica ≈ 2 VUs (psicóloga + asistente).
+
+Uso (contra la DB sembrada con bench.seed, password "bench"):
+    python -m bench.loadtest --base-url http://localhost:8000 --users 50 --duration 120
+    python -m bench.loadtest --ramp --ramp-start 10 --ramp-step 10 --slo-p95-ms 500
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+import httpx
+
+# Mismos usuarios que bench.seed (sin importarlo: el load test no necesita la app ni DATABASE_URL)
+PSYCHOLOGIST_EMAIL = "psy@bench.local"
+ASSISTANT_EMAIL = "asi@bench.local"
+BENCH_PASSWORD = "bench"
+
+JOURNEY_WEIGHTS = {
+    "login": 1,
+    "dashboard": 3,
+    "calendar_month": 3,
+    "day_slots": 4,
+    "book": 2,
+    "write_note": 2,
+    "timeline": 3,
+}
+
+# Journeys que una asistente no hace (notas clínicas)
+PSYCHOLOGIST_ONLY = {"write_note"}
+
+# Arranque de cada VU (login + lista de pacientes): no cuenta para el SLO de la rampa,
+# si no, la ola de logins de cada escalón nuevo domina su p95
+SESSION_START = "session_start"
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+# =========================
+# Registro de resultados
+# =========================
+class Recorder:
+    """
+    Guarda cada request como (t, paso, latencia_ms, resultado) con resultado en
+    ok / rejected / error. Las ventanas se calculan sobre la lista (single-thread, asyncio).
+    """
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.samples = []
+        self.active_users = 0
+
+    def record(self, step: str, latency_ms: float, outcome: str) -> None:
+        self.samples.append((time.perf_counter() - self.t0, step, latency_ms, outcome))
+
+    def window(self, start: float, end: float, exclude=()) -> dict:
+        rows = [s for s in self.samples if start <= s[0] < end and s[1] not in exclude]
+        return self._summary(rows, end - start)
+
+    def by_step(self) -> dict:
+        steps = {}
+        for row in self.samples:
+            steps.setdefault(row[1], []).append(row)
+        elapsed = time.perf_counter() - self.t0
+        return {step: self._summary(rows, elapsed) for step, rows in sorted(steps.items())}
+
+    @staticmethod
+    def _summary(rows: list, seconds: float) -> dict:
+        latencies = sorted(r[2] for r in rows if r[3] != "error")
+        errors = sum(1 for r in rows if r[3] == "error")
+        rejected = sum(1 for r in rows if r[3] == "rejected")
+        return {
+            "requests": len(rows),
+            "rps": round(len(rows) / seconds, 1) if seconds > 0 else 0.0,
+            "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+            "rejected": rejected,
+            "p50_ms": round(_percentile(latencies, 50), 1),
+            "p95_ms": round(_percentile(latencies, 95), 1),
+            "p99_ms": round(_percentile(latencies, 99), 1),
+            "mean_ms": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+        }
+
+
+# =========================
+# Usuario virtual
+# =========================
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, email: str, password: str,
+                 think: float, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.email = email
+        self.password = password
+        self.think = think
+        self.rng = rng
+        self.headers = {}
+        self.patient_ids = []
+
+        journeys = [j for j in JOURNEY_WEIGHTS if email == PSYCHOLOGIST_EMAIL or j not in PSYCHOLOGIST_ONLY]
+        self.journeys = journeys
+        self.weights = [JOURNEY_WEIGHTS[j] for j in journeys]
+
+    async def request(self, step: str, method: str, path: str, ok_statuses=(200, 201), **kwargs) -> Optional[httpx.Response]:
+        t0 = time.perf_counter()
+        try:
+            r = await self.client.request(method, path, headers=self.headers, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(step, (time.perf_counter() - t0) * 1000, "error")
+            return None
+
+        latency = (time.perf_counter() - t0) * 1000
+        if r.status_code in ok_statuses:
+            outcome = "ok"
+        elif r.status_code in (400, 409):
+            outcome = "rejected"
+        else:
+            # 401/403/404/5xx: el escenario está mal o el servidor falló
+            outcome = "error"
+        self.recorder.record(step, latency, outcome)
+        return r
+
+    # -------------------------
+    # Journeys
+    # -------------------------
+    async def login(self, step: str = "login") -> bool:
+        self.headers = {}
+        r = await self.request(step, "POST", "/auth/login",
+                               data={"username": self.email, "password": self.password})
+        if r is None or r.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+        if not self.patient_ids:
+            r = await self.request(SESSION_START, "GET", "/clinical/patients/summary?limit=200")
+            if r is not None and r.status_code == 200:
+                self.patient_ids = [row["patient"]["id"] for row in r.json()]
+        return True
+
+    async def dashboard(self) -> None:
+        today = date.today()
+        d_from, d_to = today - timedelta(days=7), today + timedelta(days=7)
+        await self.request("dashboard_metrics", "GET", f"/dashboard/metrics?date_from={d_from}&date_to={d_to}")
+        await self.request("dashboard_upcoming", "GET", "/dashboard/upcoming?days=7")
+        await self.request("dashboard_by_day", "GET", f"/dashboard/appointments-by-day?date_from={d_from}&date_to={d_to}")
+
+    async def calendar_month(self) -> None:
+        month_from = date.today().replace(day=1)
+        month_to = (month_from + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        await self.request("calendar_month", "GET", f"/calendar/events?from_date={month_from}&to_date={month_to}")
+
+    def _random_day(self) -> date:
+        return date.today() + timedelta(days=self.rng.randint(1, 14))
+
+    async def day_slots(self) -> None:
+        await self.request("day_slots", "GET", f"/calendar/day-slots?date_str={self._random_day()}")
+
+    async def book(self) -> None:
+        day = self._random_day()
+        r = await self.request("day_slots", "GET", f"/calendar/day-slots?date_str={day}")
+        if r is None or r.status_code != 200 or not self.patient_ids:
+            return
+        free = [s["start"] for s in r.json().get("slots", []) if s["status"] == "free"]
+        if not free:
+            return
+        await self.request("book_appointment", "POST", "/appointments/", json={
+            "patient_id": self.rng.choice(self.patient_ids),
+            "start_time": f"{day.isoformat()}T{self.rng.choice(free)}:00",
+            "duration_minutes": 30,
+        })
+
+    async def write_note(self) -> None:
+        if not self.patient_ids:
+            return
+        await self.request("write_note", "POST", "/notes/", json={
+            "patient_id": self.rng.choice(self.patient_ids),
+            "note_type": "soap",
+            "subjective": "Refiere semana estable.",
+            "objective": "Afecto congruente.",
+            "assessment": "Evolución favorable.",
+            "plan": "Continuar tareas.",
+        })
+
+    async def timeline(self) -> None:
+        if not self.patient_ids:
+            return
+        await self.request("timeline", "GET", f"/patients/{self.rng.choice(self.patient_ids)}/timeline")
+
+    async def run(self, stop: asyncio.Event) -> None:
+        self.recorder.active_users += 1
+        try:
+            while not stop.is_set() and not await self.login(SESSION_START):
+                await asyncio.sleep(1)
+
+            while not stop.is_set():
+                journey = self.rng.choices(self.journeys, weights=self.weights)[0]
+                await getattr(self, journey)()
+                if self.think > 0:
+                    # think time exponencial (llegadas tipo Poisson por VU)
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=self.rng.expovariate(1 / self.think))
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self.recorder.active_users -= 1
+
+
+# =========================
+# Orquestación
+# =========================
+def _print_window(recorder: Recorder, start: float, end: float) -> dict:
+    w = recorder.window(start, end)
+    w["t"] = round(end, 1)
+    w["users"] = recorder.active_users
+    print(
+        f"t={w['t']:>6.1f}s users={w['users']:>4} rps={w['rps']:>7.1f} err={w['error_rate'] * 100:>5.1f}% "
+        f"rej={w['rejected']:>4} p50={w['p50_ms']:>7.1f}ms p95={w['p95_ms']:>7.1f}ms p99={w['p99_ms']:>7.1f}ms"
+    )
+    return w
+
+
+def _spawn(args, client, recorder, stop, tasks: list, count: int) -> None:
+    for _ in range(count):
+        idx = len(tasks)
+        email = args.email if args.email else (PSYCHOLOGIST_EMAIL if idx % 2 == 0 else ASSISTANT_EMAIL)
+        vu = VirtualUser(client, recorder, email, args.password, args.think, random.Random(args.seed + idx))
+        tasks.append(asyncio.create_task(vu.run(stop)))
+
+
+async def run_steady(args, client, recorder) -> dict:
+    stop = asyncio.Event()
+    tasks = []
+    _spawn(args, client, recorder, stop, tasks, args.users)
+
+    timeline = []
+    start = 0.0
+    while start < args.duration:
+        await asyncio.sleep(args.interval)
+        end = time.perf_counter() - recorder.t0
+        timeline.append(_print_window(recorder, start, end))
+        start = end
+
+    stop.set()
+    await asyncio.gather(*tasks)
+    return {"mode": "steady", "users": args.users, "timeline": timeline}
+
+
+async def run_ramp(args, client, recorder) -> dict:
+    stop = asyncio.Event()
+    tasks = []
+    steps = []
+    saturation = None
+    users = args.ramp_start
+
+    _spawn(args, client, recorder, stop, tasks, users)
+    while users <= args.max_users:
+        step_start = time.perf_counter() - recorder.t0
+        # ventanas intermedias solo para visibilidad; el escalón se evalúa completo
+        window_start = step_start
+        while time.perf_counter() - recorder.t0 - step_start < args.ramp_step_seconds:
+            await asyncio.sleep(args.interval)
+            now = time.perf_counter() - recorder.t0
+            _print_window(recorder, window_start, now)
+            window_start = now
+
+        step_end = time.perf_counter() - recorder.t0
+        step = recorder.window(step_start, step_end, exclude=(SESSION_START,))
+        step["users"] = users
+        steps.append(step)
+
+        healthy = step["p95_ms"] <= args.slo_p95_ms and step["error_rate"] <= args.max_error_rate
+        print(f"== escalón {users} VUs: rps={step['rps']} p95={step['p95_ms']}ms "
+              f"err={step['error_rate'] * 100:.1f}% -> {'OK' if healthy else 'SATURADO'}")
+        if not healthy:
+            saturation = users
+            break
+
+        _spawn(args, client, recorder, stop, tasks, args.ramp_step)
+        users += args.ramp_step
+
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    healthy_steps = [s for s in steps if s["users"] != saturation]
+    best = healthy_steps[-1] if healthy_steps else None
+    if best is None:
+        print("❌ ni el primer escalón cumple el SLO")
+    elif saturation is None:
+        print(f"✅ sin saturación hasta {best['users']} VUs ({best['rps']} rps); sube --max-users")
+    else:
+        print(f"✅ capacidad: {best['users']} VUs (~{best['users'] // 2} clínicas) a {best['rps']} rps; "
+              f"satura en {saturation} VUs")
+
+    return {
+        "mode": "ramp",
+        "slo_p95_ms": args.slo_p95_ms,
+        "max_error_rate": args.max_error_rate,
+        "steps": steps,
+        "saturation_users": saturation,
+        "capacity_users": best["users"] if best else 0,
+    }
+
+
+async def main(args) -> None:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        if args.ramp:
+            result = await run_ramp(args, client, recorder)
+        else:
+            result = await run_steady(args, client, recorder)
+
+    print("\npor paso:")
+    per_step = recorder.by_step()
+    for step, s in per_step.items():
+        print(f"  {step:<20} n={s['requests']:>6} err={s['error_rate'] * 100:>5.1f}% rej={s['rejected']:>4} "
+              f"p50={s['p50_ms']:>7.1f}ms p95={s['p95_ms']:>7.1f}ms p99={s['p99_ms']:>7.1f}ms")
+
+    if args.out:
+        result["steps_summary"] = per_step
+        result["total"] = recorder.window(0, time.perf_counter() - recorder.t0)
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"-> {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test con journeys de clínica")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", default=None, help="un solo usuario para todos los VUs (default: psicóloga/asistente alternados)")
+    parser.add_argument("--password", default=BENCH_PASSWORD)
+    parser.add_argument("--users", type=int, default=20, help="VUs (modo steady)")
+    parser.add_argument("--duration", type=float, default=60, help="segundos (modo steady)")
+    parser.add_argument("--think", type=float, default=1.0, help="think time medio entre journeys (s)")
+    parser.add_argument("--interval", type=float, default=5, help="segundos por ventana de reporte")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1, help="semilla del RNG (reproducible)")
+    parser.add_argument("--out", default=None, help="JSON con la serie de tiempo")
+    parser.add_argument("--ramp", action="store_true", help="buscar el punto de saturación")
+    parser.add_argument("--ramp-start", type=int, default=10)
+    parser.add_argument("--ramp-step", type=int, default=10)
+    parser.add_argument("--ramp-step-seconds", type=float, default=30)
+    parser.add_argument("--max-users", type=int, default=500)
+    parser.add_argument("--slo-p95-ms", type=float, default=500)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,129 @@
+"""
+Benchmark: RPS de /auth/login vs latencia del dashboard mientras hay una ráfaga de logins.
+
+Tres escenarios, mismo tráfico de dashboard (copia sync de /dashboard/metrics => usa el
+threadpool de requests, como el resto de endpoints sync):
+  - baseline:    solo dashboard
+  - sync login:  login viejo (def + verify_password en el threadpool), montado bajo /_sync
+  - async login: /auth/login actual (bcrypt en PASSWORD_HASHER, pool propio y acotado)
+
+El rate limiter se apaga por defecto (todos los logins salen de la misma IP/email y
+se medirían 429); --with-limiter lo deja activo para ver el rechazo antes de bcrypt.
+
+Uso (con una DB ya poblada y un usuario existente):
+    python -m bench.login_throughput --email psy@x.com --password pw --logins 40 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+from typing import Optional
+
+if "--with-limiter" not in sys.argv:
+    os.environ["LOGIN_RATE_LIMIT_ENABLED"] = "false"
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.core.auth import require_roles
+from app.core.security import create_token_pair, verify_password
+from app.db.deps import get_db
+from app.models.user import User
+from app.routers import dashboard
+from bench.async_vs_sync import _percentile
+
+
+# =========================
+# Login viejo + dashboard sync (solo para el benchmark)
+# =========================
+sync_router = APIRouter(prefix="/_sync")
+
+
+@sync_router.post("/auth/login")
+def login_sync(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = db.query(User).filter(User.email == form_data.username).first()
+    if not user or not verify_password(form_data.password, user.password):
+        raise HTTPException(status_code=401, detail="Credenciales incorrectas")
+    return create_token_pair(user)
+
+
+@sync_router.get("/dashboard/metrics")
+def dashboard_metrics_sync(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(dashboard.ALLOWED_ROLES)),
+    days: Optional[int] = None,
+):
+    return dashboard._get_metrics(db, current_user, None, None, days)
+
+
+app.include_router(sync_router)
+
+
+async def _scenario(client: httpx.AsyncClient, login_path: Optional[str], args) -> dict:
+    stop = asyncio.Event()
+    latencies = []
+    login_status = Counter()
+    form = {"username": args.email, "password": args.password}
+
+    async def dashboard_loop():
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            await client.get("/_sync/dashboard/metrics")
+            latencies.append((time.perf_counter() - t0) * 1000)
+            await asyncio.sleep(args.think_ms / 1000)
+
+    async def login_loop():
+        while not stop.is_set():
+            r = await client.post(login_path, data=form)
+            login_status[r.status_code] += 1
+
+    tasks = [asyncio.create_task(dashboard_loop()) for _ in range(args.dashboard_users)]
+    if login_path:
+        tasks += [asyncio.create_task(login_loop()) for _ in range(args.logins)]
+
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    latencies.sort()
+    return {
+        "dashboard_requests": len(latencies),
+        "dashboard_p50_ms": round(_percentile(latencies, 50), 1),
+        "dashboard_p95_ms": round(_percentile(latencies, 95), 1),
+        "dashboard_p99_ms": round(_percentile(latencies, 99), 1),
+        "login_ok_rps": round(login_status[200] / args.seconds, 1),
+        "login_status": dict(login_status),
+    }
+
+
+async def main(args):
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        r = await client.post("/auth/login", data={"username": args.email, "password": args.password})
+        r.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {r.json()['access_token']}"
+
+        # calentamiento
+        for _ in range(3):
+            await client.get("/_sync/dashboard/metrics")
+
+        for label, login_path in (("baseline", None), ("sync login", "/_sync/auth/login"), ("async login", "/auth/login")):
+            result = await _scenario(client, login_path, args)
+            print(f"{label:>11}: {result}", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="login RPS vs latencia del dashboard")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=40, help="clientes haciendo login en loop")
+    parser.add_argument("--dashboard-users", type=int, default=5)
+    parser.add_argument("--think-ms", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--with-limiter", action="store_true", help="deja activo el rate limit de login")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,66 @@
+"""
+Benchmark: overhead por request de HttpMetricsMiddleware.
+
+Llama directo a una app ASGI mínima (sin red, sin FastAPI) con y sin el middleware,
+y reporta la diferencia en µs por request. Objetivo: < 20 µs.
+
+Uso:
+    python -m bench.metrics_overhead --requests 200000
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.http_metrics import HttpMetrics, HttpMetricsMiddleware
+
+
+class _Route:
+    path = "/appointments/{appointment_id}"
+
+
+async def _bare_app(scope, receive, send):
+    # imita lo que hace el router de Starlette: deja la ruta en el scope
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    return None
+
+
+async def _run(app, n: int) -> float:
+    scope_base = {"type": "http", "method": "GET", "path": "/appointments/1"}
+    t0 = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope_base), _receive, _send)
+    return time.perf_counter() - t0
+
+
+async def main(n: int, rounds: int):
+    wrapped = HttpMetricsMiddleware(_bare_app, metrics=HttpMetrics())
+
+    # calentamiento
+    await _run(_bare_app, 10_000)
+    await _run(wrapped, 10_000)
+
+    bare_best = min([await _run(_bare_app, n) for _ in range(rounds)])
+    wrapped_best = min([await _run(wrapped, n) for _ in range(rounds)])
+
+    bare_us = bare_best / n * 1e6
+    wrapped_us = wrapped_best / n * 1e6
+    print(f"sin middleware: {bare_us:.2f} µs/req")
+    print(f"con middleware: {wrapped_us:.2f} µs/req")
+    print(f"overhead:       {wrapped_us - bare_us:.2f} µs/req")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Overhead por request del middleware de métricas")
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds))
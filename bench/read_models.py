@@ -0,0 +1,133 @@
+"""
+Memoria y tiempo: entidades ORM completas vs proyecciones de app/db/read_models.
+
+Para cada consulta de lectura se ejecuta el mismo filtro dos veces:
+    orm         db.query(Entidad)            (identity map + estado de instrumentación)
+    projection  db.query(*COLUMNAS)          (Row de SQLAlchemy)
+y se mide el pico de memoria asignada (tracemalloc) y el tiempo, con sesión nueva en
+cada corrida (identity map vacío). El tiempo incluye el overhead de tracemalloc.
+
+Corre contra la DB actual; sembrarla antes:
+    python -m bench.seed --scale 10
+    python -m bench.read_models
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from app.db.read_models import (
+    BLOCK_LIST_COLUMNS,
+    CALENDAR_APPOINTMENT_COLUMNS,
+    CALENDAR_BLOCK_COLUMNS,
+    CLINICAL_TIMELINE_COLUMNS,
+    UPCOMING_APPOINTMENT_COLUMNS,
+)
+from app.db.session import SessionLocal
+from app.models.appointment import Appointment
+from app.models.appointment_block import AppointmentBlock
+from app.models.note import Note
+from app.models.patient import Patient
+from app.models.user import User
+
+
+def cases(user_id: int) -> dict:
+    now = datetime.utcnow()
+    year_ago = now - timedelta(days=370)
+
+    def calendar(entity_or_cols):
+        return lambda db: db.query(*entity_or_cols).filter(
+            Appointment.is_active == True,
+            Appointment.user_id == user_id,
+            Appointment.start_time >= year_ago,
+            Appointment.start_time <= now,
+        ).all()
+
+    def calendar_blocks(entity_or_cols):
+        return lambda db: db.query(*entity_or_cols).filter(
+            AppointmentBlock.is_active == True,
+            AppointmentBlock.user_id == user_id,
+            AppointmentBlock.start_time <= now,
+            AppointmentBlock.end_time >= year_ago,
+        ).all()
+
+    def upcoming(entity_or_cols):
+        return lambda db: (
+            db.query(*entity_or_cols)
+            .join(Patient, Patient.id == Appointment.patient_id)
+            .filter(
+                Appointment.is_active == True,
+                Appointment.user_id == user_id,
+                Appointment.start_time >= now - timedelta(days=90),
+                Appointment.start_time <= now + timedelta(days=90),
+            )
+            .all()
+        )
+
+    def blocks(entity_or_cols):
+        return lambda db: db.query(*entity_or_cols).filter(
+            AppointmentBlock.is_active == True,
+            AppointmentBlock.user_id == user_id,
+        ).all()
+
+    def timeline(entity_or_cols):
+        return lambda db: db.query(*entity_or_cols).filter(
+            Note.is_active == True, Note.user_id == user_id,
+        ).all()
+
+    return {
+        "calendar_year_appointments": (calendar((Appointment,)), calendar(CALENDAR_APPOINTMENT_COLUMNS)),
+        "calendar_year_blocks": (calendar_blocks((AppointmentBlock,)), calendar_blocks(CALENDAR_BLOCK_COLUMNS)),
+        "upcoming_180_days": (upcoming((Appointment, Patient.full_name)), upcoming(UPCOMING_APPOINTMENT_COLUMNS)),
+        "blocks_list": (blocks((AppointmentBlock,)), blocks(BLOCK_LIST_COLUMNS)),
+        "clinical_notes_all": (timeline((Note,)), timeline(CLINICAL_TIMELINE_COLUMNS)),
+    }
+
+
+def measure(fn, repeat: int) -> dict:
+    timings = []
+    peak = 0
+    rows = 0
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            result = fn(db)
+            timings.append((time.perf_counter() - t0) * 1000)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            rows = len(result)
+        finally:
+            db.close()
+    return {"rows": rows, "ms": statistics.median(timings), "peak_kb": peak / 1024}
+
+
+def main(args) -> None:
+    db = SessionLocal()
+    try:
+        user_id = db.query(User.id).filter(User.role == "psychologist", User.is_active == True).scalar()
+    finally:
+        db.close()
+
+    # calentamiento (compilación de sentencias, conexiones del pool)
+    for orm_fn, proj_fn in cases(user_id).values():
+        measure(orm_fn, 1)
+        measure(proj_fn, 1)
+
+    print(f"{'consulta':<28} {'filas':>7} {'orm ms':>9} {'proj ms':>9} {'orm KB':>10} {'proj KB':>10} {'memoria':>8}")
+    for name, (orm_fn, proj_fn) in cases(user_id).items():
+        orm = measure(orm_fn, args.repeat)
+        proj = measure(proj_fn, args.repeat)
+        ratio = proj["peak_kb"] / orm["peak_kb"] if orm["peak_kb"] else 0
+        print(
+            f"{name:<28} {orm['rows']:>7} {orm['ms']:>9.1f} {proj['ms']:>9.1f} "
+            f"{orm['peak_kb']:>10.0f} {proj['peak_kb']:>10.0f} {ratio:>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ORM completo vs proyecciones de columnas")
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,287 @@
+"""
+Generador determinista de una clínica sintética (NUNCA contra producción: hace TRUNCATE).
+
+Tenant = psicóloga + asistentes (owner_user_id) + pacientes con ficha de identificación,
+episodios de terapia semanales/quincenales con mezcla realista de estados, notas SOAP
+y bloqueos de agenda (supervisión semanal + vacaciones).
+
+La app asume UNA psicóloga activa por instalación (get_owner_user_id), así que la escala
+(1x, 10x, 100x) multiplica el volumen de su agenda, no el número de psicólogas.
+
+Todo se genera con generate_series + aritmética modular: el mismo dataset en cada corrida
+(las fechas son relativas a la semana actual, para que las ventanas de los endpoints tengan datos).
+
+Uso:
+    python -m bench.seed --scale 10 --years 3
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.security import hash_password
+
+BENCH_PASSWORD = "bench"
+
+PSYCHOLOGIST_EMAIL = "psy@bench.local"
+ADMIN_EMAIL = "admin@bench.local"
+ASSISTANT_EMAIL = "asi@bench.local"
+
+# Por unidad de escala
+PATIENTS_PER_SCALE = 150
+FUTURE_WEEKS = 8
+
+FIRST_NAMES = [
+    "Ana", "Luis", "María", "José", "Sofía", "Carlos", "Valeria", "Jorge", "Camila", "Miguel",
+    "Fernanda", "Diego", "Lucía", "Javier", "Daniela", "Andrés", "Paola", "Ricardo", "Mariana", "Alberto",
+]
+LAST_NAMES = [
+    "García", "Hernández", "López", "Martínez", "González", "Pérez", "Rodríguez", "Sánchez", "Ramírez", "Cruz",
+    "Flores", "Gómez", "Morales", "Vázquez", "Reyes", "Jiménez", "Torres", "Díaz", "Ruiz", "Mendoza",
+]
+OCCUPATIONS = ["Docente", "Ingeniera", "Estudiante", "Comerciante", "Enfermero", "Contadora", "Diseñador", "Abogada"]
+EDUCATION = ["Secundaria", "Preparatoria", "Licenciatura", "Maestría", "Doctorado"]
+MARITAL = ["Soltero(a)", "Casado(a)", "Unión libre", "Divorciado(a)", "Viudo(a)"]
+RELIGION = ["Católica", "Ninguna", "Cristiana", "Otra"]
+CITIES = ["CDMX", "Puebla", "Toluca", "Querétaro", "Guadalajara", "Monterrey"]
+
+SUBJECTIVE = [
+    "Refiere mejor calidad de sueño esta semana.",
+    "Reporta ansiedad anticipatoria ante el trabajo.",
+    "Comenta conflicto familiar reciente.",
+    "Describe menor rumiación y más actividad física.",
+]
+ASSESSMENT = [
+    "Evolución favorable.",
+    "Sintomatología ansiosa moderada.",
+    "Se mantiene estable; adherencia adecuada.",
+    "Requiere reforzar técnicas de regulación.",
+]
+PLAN = [
+    "Continuar registro de pensamientos.",
+    "Practicar respiración diafragmática diaria.",
+    "Activación conductual: 3 actividades agradables.",
+    "Revisar tarea en la próxima sesión.",
+]
+
+
+def reset_tables(conn) -> None:
+    tables = conn.execute(text(
+        "SELECT tablename FROM pg_tables "
+        "WHERE schemaname = 'public' AND tablename <> 'alembic_version'"
+    )).scalars().all()
+    if tables:
+        conn.execute(text("TRUNCATE " + ", ".join(tables) + " RESTART IDENTITY CASCADE"))
+
+
+def count_rows(engine: Engine) -> dict:
+    with engine.connect() as conn:
+        return {
+            table: conn.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+            for table in ("users", "patients", "appointments", "notes", "appointment_blocks")
+        }
+
+
+def seed(engine: Engine, scale: int = 1, years: int = 2) -> dict:
+    """
+    Usuarios (password "bench"): admin@bench.local, psy@bench.local, asi@bench.local
+    (+ asi2..asiN@bench.local a partir de 10x).
+    """
+    n_patients = PATIENTS_PER_SCALE * scale
+    n_assistants = 1 + scale // 10
+    history_weeks = 52 * years
+
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    week0 = today - timedelta(days=today.weekday())  # lunes de la semana actual
+    password = hash_password(BENCH_PASSWORD)
+
+    params = {
+        "n": n_patients,
+        "week0": week0,
+        "history": history_weeks,
+        "future": FUTURE_WEEKS,
+        "first": FIRST_NAMES,
+        "last": LAST_NAMES,
+        "occupations": OCCUPATIONS,
+        "education": EDUCATION,
+        "marital": MARITAL,
+        "religion": RELIGION,
+        "cities": CITIES,
+        "subjective": SUBJECTIVE,
+        "assessment": ASSESSMENT,
+        "plan": PLAN,
+    }
+
+    with engine.begin() as conn:
+        reset_tables(conn)
+
+        # =========================
+        # Usuarios: admin (1), psicóloga (2), asistentes (3..)
+        # =========================
+        conn.execute(text("""
+            INSERT INTO users (email, password, role, is_active) VALUES
+              (:admin, :pw, 'admin', true),
+              (:psy,   :pw, 'psychologist', true)
+        """), {"pw": password, "admin": ADMIN_EMAIL, "psy": PSYCHOLOGIST_EMAIL})
+        conn.execute(text("""
+            INSERT INTO users (email, password, role, is_active, owner_user_id)
+            SELECT CASE WHEN g = 1 THEN :asi ELSE 'asi' || g || '@bench.local' END,
+                   :pw, 'assistant', true, 2
+            FROM generate_series(1, :n) g
+        """), {"pw": password, "asi": ASSISTANT_EMAIL, "n": n_assistants})
+
+        # =========================
+        # Pacientes con ficha de identificación (5% dados de baja)
+        # =========================
+        conn.execute(text("""
+            INSERT INTO patients (
+                full_name, age, expediente_number, alias, phone, birth_date, sex, marital_status,
+                occupation, workplace, work_days, work_schedule, birth_place, education, religion,
+                address, emergency_contact_name, emergency_contact_phone, notes,
+                user_id, is_active, created_at, created_by
+            )
+            SELECT
+                (CAST(:first AS text[]))[1 + g % 20] || ' ' || (CAST(:last AS text[]))[1 + (g / 20) % 20] || ' ' || (CAST(:last AS text[]))[1 + (g / 400) % 20],
+                age,
+                'EXP-' || lpad(g::text, 6, '0'),
+                CASE WHEN g % 3 = 0 THEN (CAST(:first AS text[]))[1 + g % 20] || ' ' || left((CAST(:last AS text[]))[1 + (g / 20) % 20], 1) || '.' END,
+                '55' || lpad(((g * 7919) % 100000000)::text, 8, '0'),
+                (:week0)::date - make_interval(years => age, days => (g * 37) % 365),
+                CASE WHEN g % 2 = 0 THEN 'F' ELSE 'M' END,
+                (CAST(:marital AS text[]))[1 + g % 5],
+                (CAST(:occupations AS text[]))[1 + g % 8],
+                'Empresa ' || (1 + g % 40),
+                'Lunes a viernes',
+                '09:00-18:00',
+                (CAST(:cities AS text[]))[1 + (g / 7) % 6],
+                (CAST(:education AS text[]))[1 + (g / 3) % 5],
+                (CAST(:religion AS text[]))[1 + (g / 11) % 4],
+                'Calle ' || (1 + g % 200) || ' #' || (1 + g % 90) || ', ' || (CAST(:cities AS text[]))[1 + g % 6],
+                (CAST(:first AS text[]))[1 + (g + 7) % 20] || ' ' || (CAST(:last AS text[]))[1 + (g / 20) % 20],
+                '55' || lpad(((g * 104729) % 100000000)::text, 8, '0'),
+                CASE WHEN g % 10 = 0 THEN 'Referido por médico familiar' END,
+                2,
+                g % 20 <> 0,
+                episode_start - interval '3 days',
+                2
+            FROM generate_series(1, :n) g
+            CROSS JOIN LATERAL (SELECT 18 + (g * 7) % 60 AS age) a
+            CROSS JOIN LATERAL (
+                SELECT (:week0)::timestamp + make_interval(weeks => -:history + (g * 37) % (:history + :future)) AS episode_start
+            ) e
+        """), params)
+
+        # =========================
+        # Episodios de terapia:
+        # - inicio repartido en todo el historial, 8..59 sesiones, 1 de cada 4 quincenal
+        # - horario fijo por paciente (lun-vie, 9:00-18:00)
+        # - pasado: 83% completed, 7% no_show, 10% cancelled (soft delete); futuro: scheduled
+        # =========================
+        conn.execute(text("""
+            INSERT INTO appointments (patient_id, user_id, start_time, duration_minutes, status,
+                                      notes, is_active, created_at, created_by, updated_at, updated_by)
+            SELECT p, 2, ts,
+                   CASE WHEN p % 9 = 0 THEN 90 ELSE 60 END,
+                   status,
+                   CASE WHEN n = 0 THEN 'Primera sesión' END,
+                   status <> 'cancelled',
+                   ts - interval '7 days',
+                   CASE WHEN p % 2 = 0 THEN 2 ELSE 3 END,
+                   CASE WHEN status <> 'scheduled' THEN ts + interval '1 hour' END,
+                   CASE WHEN status <> 'scheduled' THEN 2 END
+            FROM generate_series(1, :n) p
+            CROSS JOIN LATERAL (
+                SELECT -:history + (p * 37) % (:history + :future) AS start_week,
+                       8 + (p * 11) % 52 AS sessions,
+                       CASE WHEN p % 4 = 0 THEN 2 ELSE 1 END AS every
+            ) ep
+            CROSS JOIN LATERAL generate_series(0, ep.sessions - 1) n
+            CROSS JOIN LATERAL (
+                SELECT (:week0)::timestamp
+                       + make_interval(weeks => ep.start_week + n * ep.every, days => p % 5, hours => 9 + (p * 3) % 10) AS ts,
+                       (p * 31 + n * 17) % 100 AS h
+            ) t
+            CROSS JOIN LATERAL (
+                SELECT CASE
+                         WHEN t.ts >= :week0 THEN 'scheduled'
+                         WHEN t.h < 7 THEN 'no_show'
+                         WHEN t.h < 17 THEN 'cancelled'
+                         ELSE 'completed'
+                       END AS status
+            ) s
+            WHERE t.ts < (:week0)::timestamp + make_interval(weeks => :future)
+        """), params)
+
+        # =========================
+        # Notas: 70% SOAP, 20% generales, 10% sin nota; 4% borradas
+        # =========================
+        conn.execute(text("""
+            INSERT INTO notes (patient_id, appointment_id, user_id, note_type,
+                               subjective, objective, assessment, plan, content,
+                               is_active, created_at, created_by)
+            SELECT patient_id, id, 2,
+                   CASE WHEN id % 10 < 7 THEN 'soap' ELSE 'general' END,
+                   CASE WHEN id % 10 < 7 THEN (CAST(:subjective AS text[]))[1 + id % 4] END,
+                   CASE WHEN id % 10 < 7 THEN 'Afecto congruente, discurso coherente. Sesión ' || id END,
+                   CASE WHEN id % 10 < 7 THEN (CAST(:assessment AS text[]))[1 + (id / 4) % 4] END,
+                   CASE WHEN id % 10 < 7 THEN (CAST(:plan AS text[]))[1 + (id / 16) % 4] END,
+                   CASE WHEN id % 10 >= 7 THEN 'Seguimiento de la sesión ' || id END,
+                   id % 25 <> 0,
+                   start_time + make_interval(mins => duration_minutes + 15),
+                   2
+            FROM appointments
+            WHERE status = 'completed' AND id % 10 <> 9
+        """), params)
+
+        # =========================
+        # Bloqueos: supervisión (viernes 9-11) + 1 semana de vacaciones cada 26 semanas
+        # =========================
+        conn.execute(text("""
+            INSERT INTO appointment_blocks (user_id, start_time, end_time, reason, is_active, created_at, created_by)
+            SELECT 2,
+                   (:week0)::timestamp + make_interval(weeks => w, days => 4, hours => 9),
+                   (:week0)::timestamp + make_interval(weeks => w, days => 4, hours => 11),
+                   'Supervisión', w % 13 <> 0, (:week0)::timestamp + make_interval(weeks => w - 4), 2
+            FROM generate_series(-:history, :future - 1) w
+            WHERE w % 26 <> 25
+            UNION ALL
+            SELECT 2,
+                   (:week0)::timestamp + make_interval(weeks => w, days => d, hours => 8),
+                   (:week0)::timestamp + make_interval(weeks => w, days => d, hours => 22),
+                   'Vacaciones', true, (:week0)::timestamp + make_interval(weeks => w - 8), 2
+            FROM generate_series(-:history, :future - 1) w
+            CROSS JOIN generate_series(0, 4) d
+            WHERE w % 26 = 25
+        """), params)
+
+
+    # patient_stats + estadísticas del planner
+    from app.core.patient_stats import rebuild_patient_stats
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rebuild_patient_stats(db)
+    finally:
+        db.close()
+
+    # Muestra máxima (300k filas por tabla): a escalas ≤10x ANALYZE lee todo y las
+    # estimaciones del planner son reproducibles entre corridas (explain_regression)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SET default_statistics_target = 1000"))
+        conn.execute(text("ANALYZE"))
+
+    return count_rows(engine)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clínica sintética determinista (TRUNCATE + seed)")
+    parser.add_argument("--scale", type=int, default=1, help="1, 10, 100 ...")
+    parser.add_argument("--years", type=int, default=2, help="años de historial")
+    args = parser.parse_args()
+
+    import app.main  # noqa: F401  (registra todos los modelos)
+    from app.db.session import engine
+
+    print(seed(engine, args.scale, args.years))
@@ -0,0 +1,192 @@
+"""
+Benchmark de serialización de listas grandes (10k filas) de citas, pacientes y notas.
+
+Compara, por tipo de lista, tres caminos montados en una app FastAPI mínima
+(httpx.ASGITransport, sin DB: el costo medido es solo armar + validar + serializar):
+
+    before   lo que hacían los endpoints: dict por fila / objetos ORM + response_model + JSONResponse
+    orjson   igual que before pero con ORJSONResponse (el nuevo default de la app)
+    fast     filas tipo Row validadas una vez con TypeAdapter cacheado + dump_json (fast_list_response)
+
+Uso:
+    python -m bench.serialization --rows 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.core.fast_json import fast_list_response
+from app.models.appointment import Appointment
+from app.models.note import Note
+from app.models.patient import Patient
+from app.models.patient_stats import PatientStats
+from app.db.read_models import (
+    APPOINTMENT_LIST_COLUMNS,
+    NOTE_LIST_COLUMNS,
+    PATIENT_LIST_COLUMNS,
+    PATIENT_STATS_BUNDLE,
+)
+from app.routers.appointments import _appointment_to_response
+from app.schemas.appointment import AppointmentResponse
+from app.schemas.note import NoteResponse
+from app.schemas.patient import PatientResponse
+
+# Row de SQLAlchemy ~ tupla con acceso por atributo (mismas etiquetas que la proyección real)
+AppointmentRow = namedtuple("AppointmentRow", [c.key for c in APPOINTMENT_LIST_COLUMNS])
+NoteRow = namedtuple("NoteRow", [c.key for c in NOTE_LIST_COLUMNS])
+PatientRow = namedtuple("PatientRow", [c.key for c in PATIENT_LIST_COLUMNS] + ["stats"])
+StatsRow = namedtuple("StatsRow", [c.key for c in PATIENT_STATS_BUNDLE.exprs])
+
+BASE = datetime(2026, 1, 5, 9, 0)
+
+
+def make_data(rows: int) -> dict:
+    appointments, appointment_rows = [], []
+    notes, note_rows = [], []
+    patients, patient_rows = [], []
+
+    for i in range(rows):
+        start = BASE + timedelta(hours=i)
+        appt = Appointment(
+            id=i + 1, patient_id=i % 500 + 1, user_id=2, start_time=start, duration_minutes=60,
+            status="completed", notes="Seguimiento" if i % 3 == 0 else None, is_active=True,
+            created_at=start - timedelta(days=7), updated_at=start, created_by=2, updated_by=2,
+        )
+        appointments.append((appt, f"Paciente {i % 500}"))
+        appointment_rows.append(AppointmentRow(
+            appt.id, appt.patient_id, appt.user_id, appt.start_time, appt.duration_minutes, appt.status,
+            appt.notes, f"Paciente {i % 500}", appt.is_active, appt.created_at, appt.updated_at,
+            appt.created_by, appt.updated_by,
+        ))
+
+        note = Note(
+            id=i + 1, patient_id=i % 500 + 1, appointment_id=i + 1, user_id=2, note_type="soap",
+            subjective="Refiere mejor calidad de sueño esta semana.", objective="Afecto congruente.",
+            assessment="Evolución favorable.", plan="Continuar registro de pensamientos.", content=None,
+            is_active=True, created_at=start + timedelta(hours=1), updated_at=None,
+        )
+        notes.append(note)
+        note_rows.append(NoteRow(*(getattr(note, c.key) for c in NOTE_LIST_COLUMNS)))
+
+        # todas las columnas asignadas, como una instancia cargada de la DB
+        patient = Patient(**{c.key: None for c in PATIENT_LIST_COLUMNS})
+        for key, value in {
+            "id": i + 1, "full_name": f"Paciente {i}", "age": 30 + i % 40, "expediente_number": f"EXP-{i:06d}",
+            "phone": "5512345678", "birth_date": date(1990, 1, 1) + timedelta(days=i % 9000), "sex": "F",
+            "occupation": "Docente", "address": "Calle 1 #2, CDMX", "user_id": 2, "is_active": True,
+            "created_at": BASE,
+        }.items():
+            setattr(patient, key, value)
+        patient.stats = PatientStats(
+            patient_id=i + 1, user_id=2, sessions_attended=i % 40, no_shows=i % 4, notes_count=i % 30,
+            last_visit=BASE, next_visit=None, updated_at=BASE,
+        )
+        patients.append(patient)
+        patient_rows.append(PatientRow(
+            *(getattr(patient, c.key) for c in PATIENT_LIST_COLUMNS),
+            StatsRow(*(getattr(patient.stats, c.key) for c in PATIENT_STATS_BUNDLE.exprs)),
+        ))
+
+    return {
+        "appointments": (appointments, appointment_rows),
+        "notes": (notes, note_rows),
+        "patients": (patients, patient_rows),
+    }
+
+
+def build_app(data: dict) -> FastAPI:
+    app = FastAPI()
+    appointments, appointment_rows = data["appointments"]
+    notes, note_rows = data["notes"]
+    patients, patient_rows = data["patients"]
+
+    def _appointment_dicts():
+        return [_appointment_to_response(appt, patient_name=name) for appt, name in appointments]
+
+    # before: dict por fila (citas) / ORM (notas, pacientes) + response_model + json.dumps
+    @app.get("/before/appointments", response_model=List[AppointmentResponse], response_class=JSONResponse)
+    def before_appointments():
+        return _appointment_dicts()
+
+    @app.get("/before/notes", response_model=List[NoteResponse], response_class=JSONResponse)
+    def before_notes():
+        return notes
+
+    @app.get("/before/patients", response_model=List[PatientResponse], response_class=JSONResponse)
+    def before_patients():
+        return patients
+
+    # orjson: solo cambia el render final
+    @app.get("/orjson/appointments", response_model=List[AppointmentResponse], response_class=ORJSONResponse)
+    def orjson_appointments():
+        return _appointment_dicts()
+
+    @app.get("/orjson/notes", response_model=List[NoteResponse], response_class=ORJSONResponse)
+    def orjson_notes():
+        return notes
+
+    @app.get("/orjson/patients", response_model=List[PatientResponse], response_class=ORJSONResponse)
+    def orjson_patients():
+        return patients
+
+    # fast: Row -> TypeAdapter (1 validación) -> dump_json
+    @app.get("/fast/appointments", response_model=List[AppointmentResponse])
+    def fast_appointments():
+        return fast_list_response(AppointmentResponse, appointment_rows)
+
+    @app.get("/fast/notes", response_model=List[NoteResponse])
+    def fast_notes():
+        return fast_list_response(NoteResponse, note_rows)
+
+    @app.get("/fast/patients", response_model=List[PatientResponse])
+    def fast_patients():
+        return fast_list_response(PatientResponse, patient_rows)
+
+    return app
+
+
+async def main(args) -> None:
+    t0 = time.perf_counter()
+    data = make_data(args.rows)
+    print(f"{args.rows} filas por lista generadas en {time.perf_counter() - t0:.1f}s")
+
+    transport = httpx.ASGITransport(app=build_app(data))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for kind in ("appointments", "patients", "notes"):
+            results = {}
+            bodies = {}
+            for path in ("before", "orjson", "fast"):
+                url = f"/{path}/{kind}"
+                await client.get(url)  # calentamiento (compilación de schemas)
+                timings = []
+                for _ in range(args.repeat):
+                    t0 = time.perf_counter()
+                    r = await client.get(url)
+                    timings.append((time.perf_counter() - t0) * 1000)
+                    r.raise_for_status()
+                results[path] = statistics.median(timings)
+                bodies[path] = r.json()
+
+            same = bodies["before"] == bodies["orjson"] == bodies["fast"]
+            base = results["before"]
+            print(
+                f"{kind:<13} before={base:>8.1f}ms  "
+                f"orjson={results['orjson']:>8.1f}ms (x{base / results['orjson']:.1f})  "
+                f"fast={results['fast']:>8.1f}ms (x{base / results['fast']:.1f})  "
+                f"{'mismo JSON' if same else '⚠️ JSON distinto'}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serialización de listas grandes: before vs orjson vs fast path")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -1,5 +1,6 @@
 // src/api/auth.js
 import api from "./axios";
+import { getRefreshToken, getToken } from "../utils/token";
 
 // FastAPI OAuth2PasswordRequestForm => FORM URL ENCODED (NO JSON)
 export async function loginRequest(email, password) {
@@ -11,6 +12,23 @@ export async function loginRequest(email, password) {
     headers: { "Content-Type": "application/x-www-form-urlencoded" },
   });
 
-  // ✅ FastAPI devuelve access_token
-  return data; // { access_token, token_type }
-}
\ No newline at end of file
+  // ✅ FastAPI devuelve access_token + refresh_token
+  return data; // { access_token, refresh_token, token_type, expires_in, email, role }
+}
+
+// ✅ Revoca access + refresh en el backend (si falla, igual se limpia la sesión local)
+export async function logoutRequest() {
+  // tokens leídos ya: el interceptor de request corre después de que logout() limpió localStorage
+  const token = getToken();
+  if (!token) return;
+
+  try {
+    await api.post(
+      "/auth/logout",
+      { refresh_token: getRefreshToken() },
+      { headers: { Authorization: `Bearer ${token}` } }
+    );
+  } catch {
+    // sesión ya vencida / sin red: no bloquea el logout
+  }
+}
@@ -1,5 +1,6 @@
 // src/api/axios.js
 import axios from "axios";
+import { clearToken, getRefreshToken, getToken, setRefreshToken, setToken } from "../utils/token";
 
 /**
  * 1) Lee VITE_API_URL desde Railway.
@@ -42,24 +43,79 @@ api.interceptors.request.use(
   (error) => Promise.reject(error)
 );
 
-// ✅ Response interceptor: manejo de 401
+// =========================
+// ✅ Sesión: refresh token (el access token dura minutos)
+// =========================
+// Un solo refresh a la vez: las requests que reciben 401 mientras tanto esperan la misma promesa
+let refreshing = null;
+
+function endSession() {
+  clearToken();
+  localStorage.removeItem("access_token");
+  localStorage.removeItem("user");
+
+  if (window.location.pathname !== "/login") {
+    window.location.href = "/login";
+  }
+}
+
+/**
+ * POST /auth/refresh => guarda el par nuevo y devuelve el access token.
+ * El backend rota el refresh token (el usado queda revocado): si otra pestaña ya lo
+ * rotó, el nuestro da 401 pero localStorage ya tiene el nuevo => se usa ese.
+ */
+export function refreshSession() {
+  if (!refreshing) {
+    const refreshToken = getRefreshToken();
+
+    refreshing = (async () => {
+      if (!refreshToken) throw new Error("Sin refresh token");
+      try {
+        // axios "pelado": sin los interceptores de `api` (no hay loop de 401)
+        const { data } = await axios.post(`${API_URL}/auth/refresh`, { refresh_token: refreshToken });
+        setToken(data.access_token);
+        setRefreshToken(data.refresh_token);
+        return data.access_token;
+      } catch (error) {
+        const current = getRefreshToken();
+        if (current && current !== refreshToken) return getToken();
+        throw error;
+      }
+    })().finally(() => {
+      refreshing = null;
+    });
+  }
+  return refreshing;
+}
+
+// ✅ Response interceptor: 401 => refresh + reintento (1 vez); si no se puede => login
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
     const status = error?.response?.status;
+    const original = error?.config;
+    // login con credenciales malas también da 401: ahí no hay sesión que renovar
+    const isAuthCall = /\/auth\/(login|refresh)$/.test(original?.url || "");
 
-    if (status === 401) {
-      localStorage.removeItem("token");
-      localStorage.removeItem("access_token");
-      localStorage.removeItem("user");
-
-      if (window.location.pathname !== "/login") {
-        window.location.href = "/login";
+    if (status === 401 && original && !original._retried && !isAuthCall && getRefreshToken()) {
+      original._retried = true;
+      try {
+        const token = await refreshSession();
+        original.headers = original.headers ?? {};
+        original.headers.Authorization = `Bearer ${token}`;
+        return api(original);
+      } catch {
+        endSession();
+        return Promise.reject(error);
       }
     }
 
+    if (status === 401) {
+      endSession();
+    }
+
     return Promise.reject(error);
   }
 );
 
-export default api;
\ No newline at end of file
+export default api;
@@ -1,34 +1,13 @@
-const API_BASE =
-  import.meta.env.VITE_API_URL ||
-  import.meta.env.VITE_BACKEND_URL ||
-  "http://localhost:8000";
-
-function getToken() {
-  // Ajusta si tu app guarda con otro key:
-  return localStorage.getItem("token") || localStorage.getItem("access_token") || "";
-}
+import api from "./axios";
 
+// ✅ vía axios: token + refresh en 401 (el access token dura minutos)
 async function httpGet(path) {
-  const token = getToken();
-
-  const res = await fetch(`${API_BASE}${path}`, {
-    method: "GET",
-    headers: {
-      "Content-Type": "application/json",
-      Authorization: token ? `Bearer ${token}` : "",
-    },
-  });
-
-  if (!res.ok) {
-    let detail = "Request failed";
-    try {
-      const data = await res.json();
-      detail = data?.detail || detail;
-    } catch {}
-    throw new Error(detail);
+  try {
+    const { data } = await api.get(path);
+    return data;
+  } catch (error) {
+    throw new Error(error?.response?.data?.detail || "Request failed");
   }
-
-  return res.json();
 }
 
 export const CalendarAPI = {
@@ -2,8 +2,8 @@
 import { useMemo, useState } from "react";
 import { AuthContext } from "./authContext";
 
-import { loginRequest } from "../api/auth";
-import { getToken, setToken, clearToken } from "../utils/token";
+import { loginRequest, logoutRequest } from "../api/auth";
+import { getToken, setToken, setRefreshToken, clearToken } from "../utils/token";
 
 // ✅ Decodifica JWT sin librerías (safe)
 function parseJwt(token) {
@@ -62,6 +62,8 @@ export function AuthProvider({ children }) {
     if (!token) throw new Error("Login response did not include token");
 
     setToken(token);
+    // ✅ el access token dura minutos: axios.js lo renueva con este al recibir 401
+    setRefreshToken(data.refresh_token);
     setTokenState(token);
 
     // ✅ 1) si backend manda role úsalo
@@ -83,6 +85,8 @@ export function AuthProvider({ children }) {
   }
 
   function logout() {
+    // revoca en backend sin esperar (lee los tokens antes de limpiarlos)
+    logoutRequest();
     clearToken();
     setTokenState(null);
     setRole("");
@@ -1,5 +1,6 @@
 // src/utils/token.js
 const KEY = "token";
+const REFRESH_KEY = "refresh_token";
 
 export function setToken(token) {
   localStorage.setItem(KEY, token);
@@ -9,6 +10,17 @@ export function getToken() {
   return localStorage.getItem(KEY);
 }
 
+// ✅ Refresh token: el access token dura minutos, este renueva la sesión (POST /auth/refresh)
+export function setRefreshToken(token) {
+  if (token) localStorage.setItem(REFRESH_KEY, token);
+  else localStorage.removeItem(REFRESH_KEY);
+}
+
+export function getRefreshToken() {
+  return localStorage.getItem(REFRESH_KEY);
+}
+
 export function clearToken() {
   localStorage.removeItem(KEY);
-}
\ No newline at end of file
+  localStorage.removeItem(REFRESH_KEY);
+}
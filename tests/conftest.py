@@ -0,0 +1,143 @@
+"""
+Fixtures compartidas.
+
+- Los tests unitarios (sin DB) no usan nada de aquí.
+- Los de integración piden `client` / `db` / `make_patient`: corren contra la DB de
+  DATABASE_URL (con migraciones aplicadas) y se saltan si no está configurada o no responde.
+  Lo que crean lo borran al terminar.
+"""
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+
+# ✅ sin hilos de fondo ni rate limit durante los tests (antes de importar la app)
+os.environ.setdefault("EVENTS_ENABLED", "false")
+os.environ.setdefault("INVALIDATION_LISTEN_ENABLED", "false")
+os.environ.setdefault("NO_SHOW_SWEEPER_ENABLED", "false")
+os.environ.setdefault("LOGIN_RATE_LIMIT_ENABLED", "false")
+
+TEST_PATIENT_PREFIX = "pytest "
+
+
+@pytest.fixture(scope="session")
+def app():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL no configurada")
+
+    from sqlalchemy.exc import OperationalError
+
+    from app.main import app as fastapi_app
+    from app.db.session import engine
+
+    try:
+        engine.connect().close()
+    except OperationalError:
+        pytest.skip("La DB de DATABASE_URL no responde")
+    return fastapi_app
+
+
+@pytest.fixture
+def db(app):
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def rollback_db(app):
+    """Sesión dentro de una transacción que se revierte al final (sus commit son savepoints)."""
+    from sqlalchemy.orm import Session
+
+    from app.db.session import engine
+
+    with engine.connect() as conn:
+        outer = conn.begin()
+        session = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            yield session
+        finally:
+            session.close()
+            outer.rollback()
+
+
+@pytest.fixture(scope="session")
+def psychologist(app):
+    """La psicóloga activa (la app asume una sola por clínica)."""
+    from app.db.session import SessionLocal
+    from app.models.user import User
+
+    with SessionLocal() as session:
+        user = (
+            session.query(User)
+            .filter(User.role == "psychologist", User.is_active == True)
+            .order_by(User.id)
+            .first()
+        )
+        if user is None:
+            pytest.skip("No hay psicóloga activa en la DB")
+        session.expunge(user)
+        return user
+
+
+@pytest.fixture
+def client(app, psychologist):
+    from fastapi.testclient import TestClient
+
+    from app.core.security import create_token_pair
+
+    token = create_token_pair(psychologist)["access_token"]
+    # sin `with`: no corre el lifespan (pollers, sweeper, etc.)
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+@pytest.fixture
+def make_patient(db, psychologist):
+    """Crea pacientes de prueba; al terminar borra sus citas, series, notas y stats."""
+    from app.models.patient import Patient
+
+    created = []
+
+    def _make(name: str = "paciente") -> Patient:
+        patient = Patient(full_name=f"{TEST_PATIENT_PREFIX}{name}", age=30, user_id=psychologist.id)
+        db.add(patient)
+        db.commit()
+        created.append(patient.id)
+        return patient
+
+    yield _make
+
+    if created:
+        _delete_patients(db, created)
+
+
+def _delete_patients(db, patient_ids) -> None:
+    from sqlalchemy import delete, select
+
+    from app.models.appointment import Appointment
+    from app.models.appointment_series import AppointmentSeries, AppointmentSeriesException
+    from app.models.note import Note
+    from app.models.patient import Patient
+    from app.models.patient_stats import PatientStats
+
+    db.rollback()
+    series_ids = select(AppointmentSeries.id).where(AppointmentSeries.patient_id.in_(patient_ids))
+    db.execute(delete(Note).where(Note.patient_id.in_(patient_ids)))
+    db.execute(delete(AppointmentSeriesException).where(AppointmentSeriesException.series_id.in_(series_ids)))
+    db.execute(delete(Appointment).where(Appointment.patient_id.in_(patient_ids)))
+    db.execute(delete(AppointmentSeries).where(AppointmentSeries.patient_id.in_(patient_ids)))
+    db.execute(delete(PatientStats).where(PatientStats.patient_id.in_(patient_ids)))
+    db.execute(delete(Patient).where(Patient.id.in_(patient_ids)))
+    db.commit()
+
+
+def next_weekday(days_ahead: int = 7, hour: int = 10) -> datetime:
+    """Día hábil futuro a la hora dada (hora local naive, dentro del horario de atención)."""
+    day = date.today() + timedelta(days=days_ahead)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return datetime(day.year, day.month, day.day, hour, 0)
@@ -0,0 +1,24 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.core import agenda
+from app.core.agenda_version import agenda_id_for_user
+
+
+class FakeAsyncDb:
+    async def run_sync(self, fn, *args):
+        return fn(None, *args)
+
+
+def _user(role, user_id=3, owner_user_id=None):
+    return SimpleNamespace(id=user_id, role=role, owner_user_id=owner_user_id)
+
+
+def test_etag_agenda_matches_router_agenda(monkeypatch):
+    monkeypatch.setattr(agenda, "active_psychologist_ids", lambda db: (7, 9))
+
+    # owner_user_id no cambia la agenda: el ETag sigue la misma que leen los routers
+    for user in (_user("assistant", owner_user_id=42), _user("assistant"), _user("psychologist")):
+        assert asyncio.run(agenda_id_for_user(FakeAsyncDb(), user)) == agenda.get_target_user_id(None, user)
+
+    assert asyncio.run(agenda_id_for_user(FakeAsyncDb(), _user("admin"))) is None
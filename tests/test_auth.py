@@ -0,0 +1,77 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from jose import jwt
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("DATABASE_URL no configurada", allow_module_level=True)
+
+from app.core.auth import ALGORITHM, SECRET_KEY
+from app.core.security import REFRESH_TOKEN_TYPE, create_token_pair, decode_token
+
+
+def _list_patients(client, token):
+    return client.get("/patients/", headers={"Authorization": f"Bearer {token}"})
+
+
+def _legacy_token(email, **claims):
+    # formato viejo: sin "typ" / "jti", email en 'sub'
+    return jwt.encode({"sub": email, **claims}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+@pytest.fixture
+def revoked_jtis(db):
+    """jti revocados por el test: se borran al terminar."""
+    from sqlalchemy import delete
+
+    from app.models.revoked_token import RevokedToken
+
+    jtis = []
+    yield jtis
+    if jtis:
+        db.execute(delete(RevokedToken).where(RevokedToken.jti.in_(jtis)))
+        db.commit()
+
+
+def test_raw_email_is_not_a_token(client, psychologist):
+    assert _list_patients(client, psychologist.email).status_code == 401
+
+
+def test_legacy_jwt_without_exp_is_rejected(client, psychologist):
+    assert _list_patients(client, _legacy_token(psychologist.email)).status_code == 401
+
+
+def test_legacy_jwt_valid_until_exp(client, psychologist):
+    now = datetime.now(timezone.utc)
+    assert _list_patients(client, _legacy_token(psychologist.email, exp=now + timedelta(days=1))).status_code == 200
+    assert _list_patients(client, _legacy_token(psychologist.email, exp=now - timedelta(minutes=1))).status_code == 401
+
+
+def test_legacy_jwt_rejected_when_disabled(client, psychologist, monkeypatch):
+    from app.core import auth
+
+    monkeypatch.setattr(auth, "ALLOW_LEGACY_TOKENS", False)
+    exp = datetime.now(timezone.utc) + timedelta(days=1)
+    assert _list_patients(client, _legacy_token(psychologist.email, exp=exp)).status_code == 401
+
+
+def test_refresh_rotates_and_rejects_reuse(client, psychologist, revoked_jtis):
+    pair = create_token_pair(psychologist)
+    revoked_jtis.append(decode_token(pair["refresh_token"], REFRESH_TOKEN_TYPE)["jti"])
+
+    r = client.post("/auth/refresh", json={"refresh_token": pair["refresh_token"]})
+    assert r.status_code == 200, r.text
+    rotated = r.json()
+    revoked_jtis.append(decode_token(rotated["refresh_token"], REFRESH_TOKEN_TYPE)["jti"])
+
+    assert rotated["refresh_token"] != pair["refresh_token"]
+    assert _list_patients(client, rotated["access_token"]).status_code == 200
+
+    # el refresh ya usado no vuelve a servir
+    r = client.post("/auth/refresh", json={"refresh_token": pair["refresh_token"]})
+    assert r.status_code == 401
+
+    # un access token no sirve como refresh
+    r = client.post("/auth/refresh", json={"refresh_token": rotated["access_token"]})
+    assert r.status_code == 401
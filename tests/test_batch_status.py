@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from app.core.recurrence import occurrence_key
+from tests.conftest import next_weekday
+
+
+def test_batch_status_accepts_virtual_occurrences(client, make_patient):
+    patient = make_patient("lote")
+    start = next_weekday(days_ahead=130, hour=10)
+
+    r = client.post("/appointments/series", json={
+        "patient_id": patient.id, "start_time": start.isoformat(), "occurrences": 3,
+    })
+    assert r.status_code == 200, r.text
+    series_id = r.json()["series_id"]
+
+    r = client.post("/appointments/", json={
+        "patient_id": patient.id, "start_time": start.replace(hour=12).isoformat(), "duration_minutes": 60,
+    })
+    assert r.status_code == 200, r.text
+    real_id = r.json()["id"]
+
+    first = occurrence_key(series_id, start)
+    second = occurrence_key(series_id, start + timedelta(days=7))
+    r = client.post("/appointments/batch-status", json={"items": [
+        {"id": first, "action": "complete"},
+        {"id": real_id, "action": "cancel"},
+        {"id": second, "action": "no_show"},          # futura => rechazada
+        {"id": first, "action": "cancel"},            # repetida
+        {"id": "s999999:2030-01-07T10:00:00", "action": "complete"},
+        {"id": 999999999, "action": "complete"},
+    ]})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    results = body["results"]
+
+    assert body["updated"] == 2
+    assert results[0]["ok"] and results[0]["status"] == "completed"
+    assert isinstance(results[0]["appointment_id"], int)
+    assert results[1]["ok"] and results[1]["appointment_id"] == real_id
+    assert not results[2]["ok"] and results[2]["status_code"] == 400
+    assert results[2]["appointment_id"] is None
+    assert not results[3]["ok"] and results[3]["detail"] == "Cita repetida en el lote"
+    assert [res["status_code"] for res in results[4:]] == [404, 404]
+
+    r = client.get("/appointments/", params={"patient_id": patient.id})
+    by_start = {a["start_time"][:16]: a for a in r.json()}
+    assert by_start[start.isoformat()[:16]]["id"] == results[0]["appointment_id"]
+    assert by_start[start.isoformat()[:16]]["status"] == "completed"
+
+    # la ocurrencia rechazada no se materializó: sigue virtual
+    second_row = by_start[(start + timedelta(days=7)).isoformat()[:16]]
+    assert second_row["id"] == second and second_row["is_virtual"]
@@ -0,0 +1,21 @@
+import pytest
+
+from app.core.compression import choose_encoding
+
+AVAILABLE = ("zstd", "br", "gzip")
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, deflate, br", "br"),                 # preferencia del servidor, no del cliente
+    ("gzip", "gzip"),
+    ("GZIP", "gzip"),
+    ("br;q=0, gzip;q=0.5", "gzip"),
+    ("*", "zstd"),
+    ("*;q=0, gzip", "gzip"),
+    ("zstd;q=0, *", "br"),
+    ("identity", None),
+    ("gzip;q=abc", None),
+    ("", None),
+])
+def test_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding, AVAILABLE) == expected
@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("app.db.session exige DATABASE_URL al importarse", allow_module_level=True)
+
+from app.core.conditional_get import etag_matches  # noqa: E402
+
+ETAG = 'W/"a1b2c3"'
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    ('W/"a1b2c3"', True),
+    ('"a1b2c3"', True),                          # comparación débil: W/ no importa
+    ('"zzz", W/"a1b2c3"', True),
+    (' "zzz" ,"a1b2c3" ', True),
+    ("*", True),
+    ('"zzz"', False),
+    ('W/"a1b2c"', False),
+    ("", False),
+    (None, False),
+])
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches(if_none_match, ETAG) is expected
@@ -0,0 +1,83 @@
+"""
+Invalidación de caches entre procesos (ver bench/invalidation_check.py para la versión
+con dos uvicorn). El "otro proceso" es un InvalidationBus propio con su LocalCache:
+solo se entera por NOTIFY o por el polling de cache_versions, nunca por after_commit.
+"""
+import os
+import time
+from datetime import time as dtime
+
+import pytest
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("app.db.session exige DATABASE_URL al importarse", allow_module_level=True)
+
+from app.core.caches import CLINIC_SETTINGS_ENTITY  # noqa: E402
+from app.db.invalidation import INVALIDATION_CHANNEL, InvalidationBus, InvalidationPoller, LocalCache  # noqa: E402
+from app.db.notify import PgListener  # noqa: E402
+from app.db.session import DATABASE_URL, SessionLocal  # noqa: E402
+from app.models.clinic_settings import ClinicSettings  # noqa: E402
+from app.routers.appointments import _load_settings  # noqa: E402
+
+
+@pytest.fixture
+def change_settings(db):
+    """Cambia end_time por la sesión de la app (publica la invalidación); al final lo restaura."""
+    settings = _load_settings(db)
+    original = settings.end_time
+
+    def _change():
+        row = db.query(ClinicSettings).filter(ClinicSettings.id == settings.id).one()
+        row.end_time = dtime(20, 30) if row.end_time != dtime(20, 30) else dtime(21, 0)
+        db.commit()
+
+    yield _change
+
+    row = db.query(ClinicSettings).filter(ClinicSettings.id == settings.id).one()
+    row.end_time = original
+    db.commit()
+
+
+def _other_process():
+    bus = InvalidationBus()
+    cache = bus.register(LocalCache(CLINIC_SETTINGS_ENTITY))
+    cache.get_or_load("global", lambda: "viejo")
+    return bus, cache
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def test_notify_evicts_other_process_cache(change_settings):
+    bus, cache = _other_process()
+    listener = PgListener(DATABASE_URL, handlers={INVALIDATION_CHANNEL: bus.handle_notify}, poll_seconds=0.1)
+    listener.start()
+    try:
+        assert listener.connected.wait(5), "LISTEN no conectó"
+        generation = cache._generation
+
+        change_settings()
+
+        assert _wait_for(lambda: cache._generation > generation), "no llegó el NOTIFY"
+        assert cache.get("global") is None
+    finally:
+        listener.stop()
+
+
+def test_poller_evicts_other_process_cache(change_settings):
+    bus, cache = _other_process()
+    poller = InvalidationPoller(SessionLocal, bus=bus, listener=None)
+    poller.poll_once()  # línea base
+    generation = cache._generation
+
+    change_settings()
+
+    assert poller.poll_once() >= 1
+    assert cache._generation > generation
+    assert cache.get("global") is None
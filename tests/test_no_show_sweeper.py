@@ -0,0 +1,80 @@
+import os
+from datetime import timedelta
+
+import pytest
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("app.db.session exige DATABASE_URL al importarse", allow_module_level=True)
+
+from app.core.local_time import local_now  # noqa: E402
+from app.core.no_show_sweeper import sweep_no_shows  # noqa: E402
+from app.models.appointment import Appointment  # noqa: E402
+from app.models.appointment_series import AppointmentSeries, AppointmentSeriesException  # noqa: E402
+from app.models.patient import Patient  # noqa: E402
+
+
+def _patient(db, psychologist, name):
+    patient = Patient(full_name=f"pytest {name}", age=30, user_id=psychologist.id)
+    db.add(patient)
+    db.flush()
+    return patient
+
+
+def _appointment(db, patient, start):
+    appt = Appointment(
+        patient_id=patient.id, user_id=patient.user_id, start_time=start,
+        duration_minutes=60, status="scheduled",
+    )
+    db.add(appt)
+    return appt
+
+
+def test_sweeper_uses_local_time(rollback_db, psychologist):
+    db = rollback_db
+    patient = _patient(db, psychologist, "sweeper")
+    now = local_now().replace(second=0, microsecond=0)
+
+    upcoming = _appointment(db, patient, now + timedelta(hours=1))
+    overdue = _appointment(db, patient, now - timedelta(hours=4))
+    db.commit()
+
+    assert sweep_no_shows(db, grace_minutes=120) is not None
+
+    db.expire_all()
+    assert db.get(Appointment, upcoming.id).status == "scheduled"
+    assert db.get(Appointment, overdue.id).status == "no_show"
+
+
+def test_sweeper_links_series_occurrences_to_their_rows(rollback_db, psychologist):
+    db = rollback_db
+    start = local_now().replace(hour=10, minute=0, second=0, microsecond=0) - timedelta(days=40)
+
+    series_by_patient = {}
+    for i in range(3):
+        patient = _patient(db, psychologist, f"serie {i}")
+        # horarios distintos por serie: una fila mal emparejada se nota en start_time
+        series_start = start + timedelta(hours=i)
+        series = AppointmentSeries(
+            patient_id=patient.id, user_id=psychologist.id, start_time=series_start,
+            last_start_time=series_start + timedelta(days=14), duration_minutes=60,
+            frequency="weekly", occurrences=3,
+        )
+        db.add(series)
+        db.flush()
+        series_by_patient[patient.id] = series
+    db.commit()
+
+    result = sweep_no_shows(db, grace_minutes=120)
+    assert result["series_occurrences"] >= 9
+
+    rows = (
+        db.query(AppointmentSeriesException, Appointment)
+        .join(Appointment, Appointment.id == AppointmentSeriesException.appointment_id)
+        .filter(AppointmentSeriesException.series_id.in_([s.id for s in series_by_patient.values()]))
+        .all()
+    )
+    assert len(rows) == 9
+    for exception, appt in rows:
+        assert appt.status == "no_show"
+        assert appt.start_time == exception.occurrence_start
+        assert series_by_patient[appt.patient_id].id == exception.series_id
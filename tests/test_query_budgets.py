@@ -0,0 +1,93 @@
+"""
+Presupuestos de queries por endpoint (assert_max_queries): lecturas y cambio de estado.
+
+Los datos tienen varias citas / pacientes / notas a propósito: un N+1 (1 query por fila)
+rompe el presupuesto aunque el endpoint siga respondiendo bien. Se mide con cache
+caliente (settings, psicóloga dueña): la primera request de cada endpoint no cuenta.
+"""
+from datetime import timedelta
+
+import pytest
+
+from app.db.instrumentation import assert_max_queries
+from tests.conftest import next_weekday
+
+DAY = next_weekday(days_ahead=140, hour=9)
+
+
+@pytest.fixture
+def agenda(client, make_patient, db, psychologist):
+    from app.models.appointment import Appointment
+    from app.models.note import Note
+
+    patients = [make_patient(f"presupuesto {i}") for i in range(4)]
+    for i, patient in enumerate(patients):
+        appt = Appointment(
+            patient_id=patient.id, user_id=psychologist.id, start_time=DAY + timedelta(hours=i),
+            duration_minutes=60, status="scheduled",
+        )
+        db.add(appt)
+        db.flush()
+        for kind in ("soap", "free"):
+            db.add(Note(patient_id=patient.id, appointment_id=appt.id, user_id=psychologist.id,
+                        note_type=kind, content="pytest"))
+    db.commit()
+
+    r = client.post("/appointments/series", json={
+        "patient_id": patients[0].id, "start_time": (DAY + timedelta(hours=6)).isoformat(), "occurrences": 4,
+    })
+    assert r.status_code == 200, r.text
+    return patients
+
+
+def _requests(patients):
+    day = DAY.date()
+    return {
+        "calendar_events": ("/calendar/events", {
+            "from_date": day.replace(day=1).isoformat(), "to_date": (day + timedelta(days=30)).isoformat(),
+        }),
+        "calendar_day_slots": ("/calendar/day-slots", {"date_str": day.isoformat()}),
+        "dashboard_metrics": ("/dashboard/metrics", {
+            "date_from": day.isoformat(), "date_to": (day + timedelta(days=13)).isoformat(),
+        }),
+        "dashboard_upcoming": ("/dashboard/upcoming", {}),
+        "appointments_list": ("/appointments/", {"patient_id": patients[0].id}),
+        "patient_timeline": (f"/patients/{patients[0].id}/timeline", {}),
+        "appointments_availability": ("/appointments/availability", {
+            "date_from": day.isoformat(), "date_to": (day + timedelta(days=13)).isoformat(),
+        }),
+    }
+
+
+@pytest.mark.parametrize("name, budget", [
+    ("calendar_events", 5),
+    ("calendar_day_slots", 6),
+    ("dashboard_metrics", 11),
+    ("dashboard_upcoming", 3),
+    ("appointments_list", 4),
+    ("patient_timeline", 4),
+    ("appointments_availability", 4),
+])
+def test_read_endpoint_query_budget(client, agenda, name, budget):
+    path, params = _requests(agenda)[name]
+
+    assert client.get(path, params=params).status_code == 200  # calienta caches
+
+    with assert_max_queries(budget):
+        r = client.get(path, params=params)
+    assert r.status_code == 200, r.text
+
+
+def test_status_endpoint_query_budget(client, agenda, db, psychologist):
+    from app.models.appointment import Appointment
+
+    appt_id = db.query(Appointment.id).filter(
+        Appointment.patient_id == agenda[1].id, Appointment.user_id == psychologist.id,
+    ).scalar()
+    assert client.get(f"/appointments/{appt_id}").status_code == 200  # calienta caches
+
+    # cita + paciente (joinedload), UPDATE, versión de agenda, stats, evento, refresh
+    with assert_max_queries(6):
+        r = client.put(f"/appointments/{appt_id}/complete")
+    assert r.status_code == 200, r.text
+    assert r.json()["patient_name"] == agenda[1].full_name
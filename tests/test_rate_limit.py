@@ -0,0 +1,81 @@
+import pytest
+from starlette.requests import Request
+
+from app.core import rate_limit
+from app.core.rate_limit import TokenBucketLimiter, client_ip
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_burst_then_wait_until_next_token(clock):
+    limiter = TokenBucketLimiter("test", capacity=3, refill_per_minute=6)  # 1 token cada 10 s
+
+    assert [limiter.take("ip") for _ in range(3)] == [0, 0, 0]
+    assert limiter.take("ip") == pytest.approx(10.0)
+
+    clock[0] += 4
+    assert limiter.take("ip") == pytest.approx(6.0)
+
+    clock[0] += 6
+    assert limiter.take("ip") == 0
+
+
+def test_keys_are_independent_and_refill_is_capped(clock):
+    limiter = TokenBucketLimiter("test", capacity=2, refill_per_minute=60)
+
+    assert limiter.take("a") == limiter.take("a") == 0
+    assert limiter.take("a") > 0
+    assert limiter.take("b") == 0
+
+    clock[0] += 3600  # una hora sin intentos no acumula más que capacity
+    assert [limiter.take("a") for _ in range(2)] == [0, 0]
+    assert limiter.take("a") > 0
+
+
+def test_lru_bounds_the_number_of_keys(clock):
+    limiter = TokenBucketLimiter("test", capacity=1, refill_per_minute=1, max_keys=2)
+
+    limiter.take("a")
+    limiter.take("b")
+    limiter.take("c")  # expulsa "a" (la menos reciente)
+
+    assert list(limiter._buckets) == ["b", "c"]
+    assert limiter.take("a") == 0  # vuelve con el bucket lleno
+
+
+def test_zero_refill_still_reports_a_wait(clock):
+    limiter = TokenBucketLimiter("test", capacity=1, refill_per_minute=0)
+    assert limiter.take("ip") == 0
+    assert limiter.take("ip") == 60.0
+
+
+# =========================
+# IP del cliente detrás de proxies
+# =========================
+def _request(peer="10.0.0.1", forwarded=()):
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded]
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+
+@pytest.mark.parametrize("forwarded, hops, expected", [
+    (["203.0.113.7"], 1, "203.0.113.7"),
+    (["1.2.3.4, 203.0.113.7"], 1, "203.0.113.7"),        # 1.2.3.4 lo inventó el cliente
+    (["1.2.3.4", "203.0.113.7"], 1, "203.0.113.7"),      # varios headers = una sola lista
+    (["203.0.113.7, 10.1.1.1"], 2, "203.0.113.7"),
+    (["203.0.113.7"], 2, "10.0.0.1"),                    # no pasó por todos los proxies
+    ([], 1, "10.0.0.1"),
+    (["203.0.113.7"], 0, "10.0.0.1"),                    # sin proxy: se ignora el header
+])
+def test_client_ip_uses_trusted_hop(forwarded, hops, expected):
+    assert client_ip(_request(forwarded=forwarded), trusted_hops=hops) == expected
+
+
+def test_clients_behind_the_proxy_get_separate_buckets(clock):
+    limiter = TokenBucketLimiter("test", capacity=1, refill_per_minute=1)
+    assert limiter.take(client_ip(_request(forwarded=["203.0.113.7"]), trusted_hops=1)) == 0
+    assert limiter.take(client_ip(_request(forwarded=["198.51.100.2"]), trusted_hops=1)) == 0
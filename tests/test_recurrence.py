@@ -0,0 +1,144 @@
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.recurrence import (
+    MAX_SERIES_OCCURRENCES,
+    VirtualOccurrence,
+    expand_recurrence,
+    is_series_occurrence,
+    iter_series_window,
+    occurrence_key,
+    parse_occurrence_key,
+)
+from tests.conftest import next_weekday
+
+MX_OFFSET = timezone(timedelta(hours=-6))  # America/Mexico_City (sin horario de verano)
+
+
+def _series(start: datetime, occurrences: int = 4, frequency: str = "weekly"):
+    step = timedelta(days=7 if frequency == "weekly" else 14)
+    return SimpleNamespace(
+        id=7,
+        start_time=start,
+        last_start_time=start + step * (occurrences - 1),
+        frequency=frequency,
+    )
+
+
+# =========================
+# expand_recurrence
+# =========================
+def test_expand_recurrence_by_occurrences():
+    start = datetime(2026, 3, 2, 10, 0)
+    assert expand_recurrence(start, "biweekly", occurrences=3) == [
+        start, start + timedelta(days=14), start + timedelta(days=28),
+    ]
+
+
+def test_expand_recurrence_until_is_inclusive():
+    start = datetime(2026, 3, 2, 10, 0)
+    starts = expand_recurrence(start, "weekly", until=date(2026, 3, 16))
+    assert starts == [start, start + timedelta(days=7), start + timedelta(days=14)]
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"frequency": "daily", "occurrences": 3},
+    {"frequency": "weekly"},
+    {"frequency": "weekly", "until": date(2026, 3, 1)},
+    {"frequency": "weekly", "occurrences": MAX_SERIES_OCCURRENCES + 1},
+])
+def test_expand_recurrence_rejects_invalid_rules(kwargs):
+    with pytest.raises(HTTPException) as exc:
+        expand_recurrence(datetime(2026, 3, 2, 10, 0), **kwargs)
+    assert exc.value.status_code == 400
+
+
+# =========================
+# Ventanas (naive local vs aware)
+# =========================
+def test_iter_series_window_skips_to_window():
+    series = _series(datetime(2026, 3, 2, 10, 0))
+    window = list(iter_series_window(series, datetime(2026, 3, 10), datetime(2026, 3, 20)))
+    assert window == [datetime(2026, 3, 16, 10, 0)]
+
+
+def test_iter_series_window_accepts_aware_window():
+    series = _series(datetime(2026, 3, 2, 10, 0))
+    # 16:00 UTC == 10:00 en Ciudad de México
+    start = datetime(2026, 3, 9, 16, 0, tzinfo=timezone.utc)
+    window = list(iter_series_window(series, start, start + timedelta(hours=1)))
+    assert window == [datetime(2026, 3, 9, 10, 0)]
+
+
+def test_is_series_occurrence_accepts_aware_start():
+    series = _series(datetime(2026, 3, 2, 10, 0))
+    assert is_series_occurrence(series, datetime(2026, 3, 9, 10, 0, tzinfo=MX_OFFSET))
+    assert not is_series_occurrence(series, datetime(2026, 3, 9, 10, 0, tzinfo=timezone.utc))
+
+
+# =========================
+# Ids de ocurrencias virtuales
+# =========================
+def test_occurrence_key_round_trip():
+    start = datetime(2026, 3, 9, 10, 0)
+    key = occurrence_key(12, start)
+    assert key == "s12:2026-03-09T10:00:00"
+    assert parse_occurrence_key(key) == (12, start)
+
+
+@pytest.mark.parametrize("key", ["123", "null", "s:2026-03-09T10:00:00", "s12:mañana"])
+def test_parse_occurrence_key_rejects_other_ids(key):
+    assert parse_occurrence_key(key) is None
+
+
+def test_virtual_occurrence_has_stable_id():
+    kwargs = dict(series_id=3, patient_id=1, user_id=2, start_time=datetime(2026, 3, 9, 10, 0), duration_minutes=60)
+    assert VirtualOccurrence(**kwargs).id == VirtualOccurrence(**kwargs).id == "s3:2026-03-09T10:00:00"
+
+
+# =========================
+# Integración: la agenda usa el id virtual para completar / cancelar
+# =========================
+def test_status_endpoints_materialize_virtual_occurrence(client, make_patient):
+    patient = make_patient("serie")
+    start = next_weekday(days_ahead=120, hour=10)
+
+    r = client.post("/appointments/series", json={
+        "patient_id": patient.id,
+        # aware: la ventana de validación no debe compararse contra series naive (500)
+        "start_time": start.replace(tzinfo=MX_OFFSET).isoformat(),
+        "occurrences": 3,
+    })
+    assert r.status_code == 200, r.text
+    created = r.json()["created"]
+    assert [c["id"] for c in created] == [
+        occurrence_key(r.json()["series_id"], start + timedelta(days=7 * i)) for i in range(3)
+    ]
+
+    r = client.put(f"/appointments/{created[1]['id']}/complete")
+    assert r.status_code == 200, r.text
+    assert isinstance(r.json()["id"], int)
+    assert r.json()["status"] == "completed"
+
+    r = client.delete(f"/appointments/{created[2]['id']}")
+    assert r.status_code == 200, r.text
+
+    # el id virtual viejo sigue apuntando a la cita ya materializada (no crea otra)
+    r = client.put(f"/appointments/{created[1]['id']}/complete")
+    assert r.status_code == 400
+    assert "completed" in r.json()["detail"]
+
+    r = client.get("/appointments/", params={"patient_id": patient.id})
+    assert r.status_code == 200, r.text
+    by_start = {a["start_time"][:16]: a for a in r.json()}
+    assert isinstance(by_start[start.isoformat()[:16]]["id"], str)
+    assert by_start[(start + timedelta(days=7)).isoformat()[:16]]["status"] == "completed"
+    assert (start + timedelta(days=14)).isoformat()[:16] not in by_start
+
+
+def test_unknown_virtual_id_is_404(client):
+    assert client.put("/appointments/s999999:2030-01-07T10:00:00/complete").status_code == 404
+    assert client.put("/appointments/null/complete").status_code == 404
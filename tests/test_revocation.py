@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import app.models.patient_stats  # noqa: F401  (registra PatientStats: select() configura los mappers)
+from app.core import revocation
+from app.core.config import REVOCATION_GAP_SECONDS
+from app.core.revocation import RevocationList
+
+
+class FakeDb:
+    """Devuelve las filas que se le encolan, una lista por llamada a execute()."""
+
+    def __init__(self):
+        self.batches = []
+        self.statements = []
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+        rows = self.batches.pop(0) if self.batches else []
+        return SimpleNamespace(all=lambda: rows)
+
+
+def _row(row_id, jti=None, user_id=1):
+    now = datetime.now(timezone.utc)
+    return SimpleNamespace(
+        id=row_id, jti=jti, user_id=user_id, revoked_at=now, expires_at=now + timedelta(days=1),
+    )
+
+
+def _gap_ids(stmt):
+    """ids pedidos explícitamente (IN) en la relectura."""
+    params = stmt.compile().params
+    return sorted(v for value in params.values() if isinstance(value, list) for v in value)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [datetime.now(timezone.utc).timestamp()]
+    monkeypatch.setattr(revocation.time, "time", lambda: now[0])
+    return now
+
+
+def test_initial_load_leaves_no_gaps(clock):
+    db = FakeDb()
+    db.batches = [[_row(5, "a"), _row(9, "b")]]
+    rl = RevocationList()
+
+    rl.refresh(db)
+
+    assert rl._last_id == 9
+    assert rl._gaps == {}
+    assert rl.is_revoked("a", 1, 0) and rl.is_revoked("b", 1, 0)
+
+
+def test_skipped_ids_are_requested_again_until_seen(clock):
+    db = FakeDb()
+    rl = RevocationList()
+    db.batches = [[_row(1, "a")], [_row(2, "b"), _row(5, "e")]]
+    rl.refresh(db)
+    rl.refresh(db)
+
+    # 3 y 4: transacciones con id menor que aún no hacían commit
+    assert sorted(rl._gaps) == [3, 4]
+
+    db.batches = [[_row(4, "d")]]
+    rl.refresh(db)
+
+    assert _gap_ids(db.statements[-1]) == [3, 4]
+    assert sorted(rl._gaps) == [3]
+    assert rl.is_revoked("d", 1, 0)
+    assert rl._last_id == 5
+
+
+def test_gaps_expire_after_revocation_gap_seconds(clock):
+    db = FakeDb()
+    rl = RevocationList()
+    db.batches = [[_row(1, "a")], [_row(3, "c")]]
+    rl.refresh(db)
+    rl.refresh(db)
+    assert list(rl._gaps) == [2]
+
+    clock[0] += REVOCATION_GAP_SECONDS + 1
+    rl.refresh(db)
+
+    assert rl._gaps == {}
+    rl.refresh(db)
+    assert _gap_ids(db.statements[-1]) == []
+
+
+def test_large_id_jumps_are_not_tracked_as_gaps(clock):
+    db = FakeDb()
+    rl = RevocationList()
+    db.batches = [[_row(1, "a")], [_row(1 + revocation._MAX_GAP_RANGE + 5, "z")]]
+    rl.refresh(db)
+    rl.refresh(db)
+
+    assert rl._gaps == {}
+
+
+def test_user_revocation_covers_tokens_issued_before(clock):
+    db = FakeDb()
+    rl = RevocationList()
+    row = _row(1, None, user_id=42)
+    db.batches = [[row]]
+    rl.refresh(db)
+
+    revoked_at = row.revoked_at.timestamp()
+    assert rl.is_revoked("otro", 42, revoked_at - 1)
+    assert not rl.is_revoked("otro", 42, revoked_at + 1)
+    assert not rl.is_revoked("otro", 7, revoked_at - 1)
@@ -0,0 +1,35 @@
+import pytest
+
+from app.db.slow_queries import explain_command, fingerprint
+
+
+@pytest.mark.parametrize("statement", [
+    "SELECT pg_notify(%(channel)s, %(payload)s)",
+    "SELECT pg_try_advisory_xact_lock(%(key)s)",
+    "SELECT pg_advisory_lock(1)",
+    "SELECT appointments.id FROM appointments WHERE appointments.id = %(id)s FOR UPDATE",
+    "SELECT * FROM agenda_versions FOR NO KEY UPDATE SKIP LOCKED",
+    "select * from patients for share",
+    "SELECT nextval('appointments_id_seq')",
+])
+def test_side_effect_selects_are_not_analyzed(statement):
+    assert explain_command(statement) == "EXPLAIN "
+
+
+@pytest.mark.parametrize("statement", [
+    "SELECT appointments.id FROM appointments WHERE appointments.start_time >= %(start)s",
+    "SELECT notes.updated_at FROM notes",                 # 'update' dentro de otra palabra
+])
+def test_plain_selects_use_analyze(statement):
+    assert explain_command(statement) == "EXPLAIN (ANALYZE, BUFFERS) "
+
+
+def test_keyword_inside_literal_is_not_analyzed():
+    # conservador: ante la duda, plan estimado
+    assert explain_command("SELECT 'FOR UPDATE' AS texto") == "EXPLAIN "
+
+
+def test_fingerprint_collapses_params_and_in_lists():
+    a = fingerprint("SELECT * FROM t WHERE id IN (%(id_1_1)s, %(id_1_2)s) AND x = 'a' LIMIT 10")
+    b = fingerprint("SELECT  *  FROM t WHERE id IN (%(id_1_1)s) AND x = 'bb' LIMIT 50")
+    assert a == b == "SELECT * FROM t WHERE id IN (?) AND x = ? LIMIT ?"
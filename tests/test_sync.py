@@ -0,0 +1,25 @@
+import os
+
+import pytest
+from fastapi import HTTPException
+
+if not os.getenv("DATABASE_URL"):
+    pytest.skip("app.db.session exige DATABASE_URL al importarse", allow_module_level=True)
+
+from app.routers.sync import _format_cursor, _parse_cursor  # noqa: E402
+
+
+def test_parse_cursor():
+    assert _parse_cursor("2:15,0:7") == {2: 15, 0: 7}
+
+
+def test_cursor_round_trip():
+    versions = {3: 40, 0: 2, 2: 15}
+    assert _parse_cursor(_format_cursor(versions)) == versions
+
+
+@pytest.mark.parametrize("since", ["", "2", "2:x", "2:1:3", "a:1", "2:1,", "2:1;3:4"])
+def test_parse_cursor_rejects_garbage(since):
+    with pytest.raises(HTTPException) as exc:
+        _parse_cursor(since)
+    assert exc.value.status_code == 400